@@ -0,0 +1,112 @@
+"""
+流量表性能测试
+对比旧的列表扫描汇总算法与哈希流量表在合成流量上的耗时，并校验结果一致
+
+用法: python benchmarks/flow_table_bench.py [数据包数] [流数]
+"""
+import os
+import random
+import sys
+import time
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from src.utils.flow_table import FlowTable
+
+
+def legacy_summarize(flows):
+    """旧版 NetworkAnalyzerTab.summarize_packets 的实现（逐列表线性扫描）"""
+    def reverse_socket(socket):
+        return [socket[0], socket[2], socket[1], socket[3], socket[4]]
+
+    def find(socket, flow_list):
+        for entry in flow_list:
+            if entry[0] == socket[0] and entry[1] == socket[1] and entry[2] == socket[2]:
+                yield entry
+
+    def increment(socket, flow_list, counter_position):
+        for entry in find(socket, flow_list):
+            if len(entry) == counter_position - 1:
+                entry.append(1)
+            elif len(entry) >= counter_position:
+                entry[counter_position - 1] += 1
+        for entry in find(socket, flow_list):
+            entry[4] = int(entry[4]) + int(socket[4])
+        for entry in find(socket, flow_list):
+            for flag in socket[3]:
+                if flag not in entry[3]:
+                    entry[3] = entry[3] + flag
+
+    flows_with_count = []
+    flows_without_count = []
+    for flow in flows:
+        short_flow = [flow[0], flow[1], flow[2]]
+        reverse_short_flow = [flow[0], flow[2], flow[1]]
+        if short_flow not in flows_without_count:
+            if reverse_short_flow not in flows_without_count:
+                flows_with_count.append(flow.copy() + [1])
+                flows_without_count.append(short_flow)
+            else:
+                increment(reverse_socket(flow), flows_with_count, 7)
+        else:
+            increment(flow, flows_with_count, 6)
+    return flows_with_count
+
+
+def generate_flows(packet_count, flow_count, seed=1):
+    """生成合成数据包列表，格式与 read_pcap 的输出一致"""
+    rng = random.Random(seed)
+    endpoints = []
+    for _ in range(flow_count):
+        protocol = rng.choice(('TCP', 'TCP', 'UDP'))
+        client = f"10.{rng.randrange(256)}.{rng.randrange(256)}.{rng.randrange(1, 255)}:{rng.randrange(1024, 65536)}"
+        server = f"192.168.{rng.randrange(256)}.{rng.randrange(1, 255)}:{rng.choice((53, 80, 443, 8080))}"
+        endpoints.append((protocol, client, server))
+
+    tcp_flags = ('S', 'SA', 'A', 'PA', 'FA', 'R')
+    packets = []
+    for _ in range(packet_count):
+        protocol, client, server = rng.choice(endpoints)
+        src, dst = (client, server) if rng.random() < 0.6 else (server, client)
+        flags = rng.choice(tcp_flags) if protocol == 'TCP' else '--'
+        packets.append([protocol, src, dst, flags, str(rng.randrange(40, 1500))])
+    return packets
+
+
+def normalize(rows):
+    """统一行格式用于比较（旧实现缺省反向计数且大小可能为字符串）"""
+    result = []
+    for row in rows:
+        row = list(row) + [0] * (7 - len(row))
+        row[4] = int(row[4])
+        result.append(row)
+    return result
+
+
+def main():
+    packet_count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    flow_count = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    packets = generate_flows(packet_count, flow_count)
+    print(f"合成数据: {packet_count:,} 个数据包, {flow_count:,} 条流")
+
+    start = time.perf_counter()
+    table = FlowTable()
+    table.update(packets)
+    new_rows = table.to_rows()
+    new_cost = time.perf_counter() - start
+    print(f"哈希流量表: {new_cost:.3f}s ({packet_count / new_cost:,.0f} 包/秒)")
+
+    start = time.perf_counter()
+    old_rows = legacy_summarize(packets)
+    old_cost = time.perf_counter() - start
+    print(f"旧版列表扫描: {old_cost:.3f}s ({packet_count / old_cost:,.0f} 包/秒)")
+
+    if normalize(old_rows) != normalize(new_rows):
+        print("❌ 结果不一致")
+        sys.exit(1)
+    print(f"✅ 结果一致，加速 {old_cost / new_cost:.1f} 倍")
+
+
+if __name__ == '__main__':
+    main()
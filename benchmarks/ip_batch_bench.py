@@ -0,0 +1,62 @@
+"""
+IP批量定位性能测试
+测量从日志文本中提取并去重IPv4地址、使用本地数据库批量查询的吞吐量，
+并与 XdbSearcher 逐个查询的结果比对
+
+用法: python benchmarks/ip_batch_bench.py [地址数]
+"""
+import os
+import random
+import socket
+import sys
+import time
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from XdbSearchIP.xdbSearcher import XdbSearcher
+
+from src.utils.ip_geo import (count_ipv4_addresses, get_segment_index, load_xdb_content, lookup_local,
+                              parse_region)
+
+
+def generate_log(ips):
+    """生成防火墙日志样式的文本，每个地址出现一到三次，夹杂端口和版本号等数字"""
+    rng = random.Random(2)
+    lines = []
+    for ip in ips:
+        for _ in range(rng.randint(1, 3)):
+            lines.append(f"Oct 18 10:{rng.randint(0, 59):02d}:01 fw01 %%10FILTER/6/ZONE_DP: "
+                         f"src={ip}:{rng.randint(1024, 65535)} dst=10.1.{rng.randint(0, 255)}.1:443 "
+                         f"ver=1.2.3 deny")
+    rng.shuffle(lines)
+    return '\n'.join(lines)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    rng = random.Random(1)
+    ips = {socket.inet_ntoa(rng.getrandbits(32).to_bytes(4, 'big')) for _ in range(count)}
+    text = generate_log(sorted(ips))
+    print(f"日志: {text.count(chr(10)) + 1:,} 行，{len(text) / 1024 / 1024:.1f} MB")
+
+    start = time.perf_counter()
+    counts = count_ipv4_addresses(text)
+    elapsed = time.perf_counter() - start
+    print(f"提取并去重: {len(counts):,} 个地址，{elapsed:.2f}s")
+
+    get_segment_index()
+    unique = list(counts)
+    start = time.perf_counter()
+    results = lookup_local(unique)
+    elapsed = time.perf_counter() - start
+    print(f"本地批量查询: {elapsed:.2f}s，{len(unique) / elapsed:,.0f} 个/秒")
+
+    expected_ips = ips <= counts.keys() and all(ip in ips or ip.startswith('10.1.') for ip in counts)
+    searcher = XdbSearcher(contentBuff=load_xdb_content())
+    same = expected_ips and results == [parse_region(searcher.searchByIPStr(ip)) for ip in unique]
+    print("✅ 提取和查询结果一致" if same else "❌ 提取或查询结果不一致")
+
+
+if __name__ == '__main__':
+    main()
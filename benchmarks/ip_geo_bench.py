@@ -0,0 +1,79 @@
+"""
+ip2region本地查询性能测试
+对比每次查询都新建文件查询器的原有方式、基于内存的 XdbSearcher 与段缓存，
+分别测试随机地址和集中在少数网段的地址，并校验查询结果一致
+
+用法: python benchmarks/ip_geo_bench.py [查询次数]
+"""
+import os
+import random
+import socket
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from XdbSearchIP.xdbSearcher import XdbSearcher
+
+from src.utils.ip_geo import SegmentIndex, get_xdb_path, load_xdb_content, search_local
+
+
+def legacy_search(ip):
+    """原有方式：每次查询新建基于文件的查询器，查询后关闭"""
+    searcher = XdbSearcher(dbfile=get_xdb_path())
+    try:
+        return searcher.searchByIPStr(ip)
+    finally:
+        searcher.close()
+
+
+def clustered_ips(count, rng):
+    """集中在200个 /24 网段中的地址，模拟日志中反复出现的同一批来源"""
+    networks = [rng.getrandbits(24) << 8 for _ in range(200)]
+    return [socket.inet_ntoa((rng.choice(networks) | rng.getrandbits(8)).to_bytes(4, 'big'))
+            for _ in range(count)]
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    rng = random.Random(1)
+    ips = [socket.inet_ntoa(rng.getrandbits(32).to_bytes(4, 'big')) for _ in range(count)]
+    legacy_count = min(count, 5000)
+
+    start = time.perf_counter()
+    expected = [legacy_search(ip) for ip in ips[:legacy_count]]
+    legacy = (time.perf_counter() - start) / legacy_count
+    print(f"原有方式: {legacy * 1e6:.1f} 微秒/次（{legacy_count:,} 次）")
+
+    start = time.perf_counter()
+    # 段缓存之前的方式：整个文件读入内存后由 XdbSearcher 查询
+    searcher = XdbSearcher(contentBuff=load_xdb_content())
+    print(f"首次加载xdb文件: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    same = True
+    for name, sample in (("随机地址", ips), ("集中网段", clustered_ips(count, rng))):
+        start = time.perf_counter()
+        shared_results = [searcher.searchByIPStr(ip) for ip in sample]
+        shared = (time.perf_counter() - start) / count
+
+        # 每组使用新的段缓存，不受上一组的影响
+        index = SegmentIndex(load_xdb_content())
+        start = time.perf_counter()
+        results = [index.search(int.from_bytes(socket.inet_aton(ip), 'big')) for ip in sample]
+        cached = (time.perf_counter() - start) / count
+        stats = index.stats()
+        print(f"{name}: 内存查询器 {shared * 1e6:.1f} 微秒/次，段缓存 {cached * 1e6:.1f} 微秒/次"
+              f"（相对原有方式 {legacy / cached:.1f} 倍，命中率 {stats['hits'] / count:.0%}，"
+              f"缓存 {stats['segments']:,} 段）")
+        same = same and results == shared_results
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        threaded = list(executor.map(search_local, ips))
+    same = same and threaded[:legacy_count] == expected and threaded == [searcher.searchByIPStr(ip) for ip in ips]
+    print("✅ 查询结果一致（含4个线程并发查询）" if same else "❌ 查询结果不一致")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+"""
+在线IP定位查询性能测试
+在本机启动模拟各接口的HTTP服务（一个响应缓慢、一个返回错误、两个正常），
+对比逐个尝试接口并每次新建连接的原有方式与并发请求、最先返回者胜出的方式，
+并检查接口排序是否收敛到最快的可用接口
+
+用法: python benchmarks/ip_remote_bench.py [查询次数]
+"""
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import requests
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from src.utils import ip_geo
+
+# 模拟接口的行为：接口名称 -> (响应延迟秒数, HTTP状态码)
+STUB_BEHAVIOR = {
+    'realip.cc': (1.5, 200),
+    'api.ip.sb': (0.05, 500),
+    'ip2location.io': (0.02, 200),
+    'pconline': (0.2, 200),
+}
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """按路径中的接口名称延迟后返回包含该接口全部字段的JSON"""
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        name = url.path.strip('/')
+        delay, status = STUB_BEHAVIOR[name]
+        time.sleep(delay)
+        provider = next(p for p in ip_geo.REMOTE_PROVIDERS if p['name'] == name)
+        ip = parse_qs(url.query)['ip'][0]
+        body = json.dumps({key: ip if key == 'ip' else f"{name}-{key}" for key in provider['fields']})
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body.encode())
+
+    def log_message(self, format, *args):
+        pass
+
+
+def legacy_query(ip):
+    """原有方式：按定义顺序逐个请求，每次请求新建连接"""
+    for provider in ip_geo.REMOTE_PROVIDERS:
+        try:
+            response = requests.get(provider['url'].format(ip=ip), headers=ip_geo.REQUEST_HEADERS,
+                                    timeout=ip_geo.REQUEST_TIMEOUT)
+            if response.status_code == 200:
+                data = response.json()
+                return provider['name'], {key: data[key] for key in provider['fields']}
+        except Exception:
+            continue
+    return None
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    for provider in ip_geo.REMOTE_PROVIDERS:
+        provider['url'] = f"{base}/{provider['name']}?ip={{ip}}"
+
+    ips = [f"203.0.113.{i % 250 + 1}" for i in range(count)]
+
+    start = time.perf_counter()
+    legacy = [legacy_query(ip) for ip in ips]
+    legacy_elapsed = (time.perf_counter() - start) / count
+    print(f"原有方式: {legacy_elapsed * 1000:.0f} ms/次（{count} 次），均使用 {legacy[0][0]}")
+
+    start = time.perf_counter()
+    first = ip_geo.query_remote(ips[0], use_cache=False)
+    print(f"并发查询首次: {(time.perf_counter() - start) * 1000:.0f} ms，使用 {first['provider']['name']}")
+
+    start = time.perf_counter()
+    results = [ip_geo.query_remote(ip, use_cache=False) for ip in ips]
+    elapsed = (time.perf_counter() - start) / count
+    print(f"并发查询: {elapsed * 1000:.0f} ms/次（{count} 次），相对原有方式 {legacy_elapsed / elapsed:.1f} 倍")
+
+    # 等待被放弃的慢速请求结束，不计入批量模式的耗时
+    time.sleep(STUB_BEHAVIOR['realip.cc'][0])
+    start = time.perf_counter()
+    batch = [ip_geo.query_remote(ip, 1, use_cache=False) for ip in ips]
+    print(f"按排序逐个查询（批量模式）: {(time.perf_counter() - start) / count * 1000:.0f} ms/次")
+
+    ranking = [provider['name'] for provider in ip_geo.ranked_providers()]
+    print(f"接口排序: {' > '.join(ranking)}")
+    for name, stats in ip_geo.provider_stats().items():
+        print(f"  {name}: 平均耗时 {stats['latency'] * 1000:.0f} ms，成功率 {stats['success']:.0%}，"
+              f"请求 {stats['requests']} 次")
+
+    valid = all(result and result['data']['ip'] == ip for ip, result in zip(ips + ips, results + batch))
+    print("✅ 查询结果有效，排序首位为最快的可用接口" if valid and ranking[0] == 'ip2location.io'
+          else "❌ 查询结果无效或排序不正确")
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
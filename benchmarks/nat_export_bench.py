@@ -0,0 +1,128 @@
+"""
+NAT解析结果导出性能测试
+对比原先逐个单元格设置样式、合并单元格并二次遍历计算列宽的导出方式，
+与只写模式的流式导出以及CSV导出的耗时和峰值内存
+
+用法: python benchmarks/nat_export_bench.py [命令数量]
+"""
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from openpyxl import Workbook, load_workbook
+from openpyxl.styles import Alignment, Font, PatternFill
+
+from benchmarks.nat_parser_bench import generate_huawei_config
+from src.utils.nat_parser import NATParser
+from src.utils.table_export import ExportSheet, export_tables
+
+HEADERS = ["名称", "协议", "全局IP", "全局端口", "内部IP", "内部端口", "原始命令"]
+KEYS = ['name', 'protocol', 'global_ip', 'global_port', 'inside_ip', 'inside_port', 'command']
+
+
+def legacy_export(file_path, data, failed_entries):
+    """原先的导出实现（华为格式）"""
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "NAT Server配置"
+
+    for col, header in enumerate(HEADERS, 1):
+        cell = ws.cell(row=1, column=col)
+        cell.value = header
+        cell.font = Font(bold=True)
+        cell.fill = PatternFill(start_color='E0E0E0', end_color='E0E0E0', fill_type='solid')
+        cell.alignment = Alignment(horizontal='center')
+
+    current_row = 2
+    for item in data:
+        for col, key in enumerate(KEYS, 1):
+            cell = ws.cell(row=current_row, column=col)
+            cell.value = item.get(key, '-')
+            cell.alignment = Alignment(horizontal='left')
+            if key == 'command':
+                cell.alignment = Alignment(horizontal='left', wrap_text=True)
+        current_row += 1
+
+    if failed_entries:
+        current_row += 1
+        cell = ws.cell(row=current_row, column=1)
+        cell.value = "解析失败条目："
+        cell.font = Font(bold=True)
+        cell.fill = PatternFill(start_color='FFE0E0', end_color='FFE0E0', fill_type='solid')
+        ws.merge_cells(start_row=current_row, start_column=1, end_row=current_row, end_column=len(HEADERS))
+        current_row += 1
+        for entry in failed_entries:
+            cell = ws.cell(row=current_row, column=1)
+            cell.value = entry
+            ws.merge_cells(start_row=current_row, start_column=1, end_row=current_row, end_column=len(HEADERS))
+            cell.alignment = Alignment(horizontal='left')
+            current_row += 1
+
+    for column in ws.columns:
+        max_length = 0
+        for cell in column:
+            try:
+                if len(str(cell.value)) > max_length:
+                    max_length = len(str(cell.value))
+            except:
+                pass
+        ws.column_dimensions[column[0].column_letter].width = min(max_length + 2, 50)
+    ws.column_dimensions[chr(ord('A') + len(HEADERS) - 1)].width = 120
+
+    wb.save(file_path)
+
+
+def streaming_export(file_path, data, failed_entries):
+    sheet = ExportSheet(
+        title="NAT Server配置",
+        headers=HEADERS,
+        columns=[[item.get(key, '-') for item in data] for key in KEYS],
+        wrap_columns=(len(KEYS) - 1,),
+        widths={len(KEYS) - 1: 120},
+        appendix_title="解析失败条目：",
+        appendix=failed_entries
+    )
+    export_tables(file_path, [sheet])
+
+
+def measure(name, func, file_path, data, failed_entries):
+    """先计时，再在 tracemalloc 下重复一次统计峰值内存，避免跟踪开销影响计时"""
+    start = time.perf_counter()
+    func(file_path, data, failed_entries)
+    cost = time.perf_counter() - start
+    tracemalloc.start()
+    func(file_path, data, failed_entries)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{name}: {cost:.2f}s，峰值内存 {peak / 1024 / 1024:.0f}MB，"
+          f"文件 {os.path.getsize(file_path) / 1024 / 1024:.1f}MB")
+    return cost
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    data, failed_entries = NATParser.parse_config(generate_huawei_config(count), "huawei")
+    print(f"导出 {len(data):,} 条记录，{len(failed_entries):,} 条失败条目")
+
+    directory = tempfile.gettempdir()
+    legacy_path = os.path.join(directory, 'nat_export_legacy.xlsx')
+    streaming_path = os.path.join(directory, 'nat_export_streaming.xlsx')
+    legacy = measure("原实现", legacy_export, legacy_path, data, failed_entries)
+    streaming = measure("只写模式", streaming_export, streaming_path, data, failed_entries)
+    measure("CSV", streaming_export, os.path.join(directory, 'nat_export.csv'), data, failed_entries)
+    print(f"只写模式相对原实现 {legacy / streaming:.2f} 倍")
+
+    # 校验两种xlsx导出的单元格取值一致
+    expected = [row for row in load_workbook(legacy_path, read_only=True).active.iter_rows(values_only=True)]
+    actual = [row for row in load_workbook(streaming_path, read_only=True).active.iter_rows(values_only=True)]
+    strip = lambda rows: [tuple(value for value in row if value is not None) for row in rows]
+    print("✅ 单元格取值一致" if strip(expected) == strip(actual) else "❌ 单元格取值不一致")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""
+NAT配置多进程解析性能测试
+生成华为/H3C混合的配置目录，测量1到N个工作进程的耗时，并校验与逐个文件顺序解析的结果一致
+
+用法: python benchmarks/nat_parallel_bench.py [文件数量] [每个文件的命令数量] [最大进程数]
+"""
+import os
+import sys
+import tempfile
+import time
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from benchmarks.nat_parser_bench import generate_h3c_config, generate_huawei_config
+from src.utils.nat_parallel import parse_config_dir
+from src.utils.nat_parser import NATParser
+
+
+def write_configs(directory, file_count, command_count):
+    """生成配置目录，偶数序号为华为配置，奇数序号为H3C配置，每隔两个文件省略 sysname"""
+    os.makedirs(directory, exist_ok=True)
+    expected = []
+    for i in range(file_count):
+        if i % 2 == 0:
+            device_type = "huawei"
+            header = "!Software Version V500R005C20SPC500\n#\n"
+            commands = generate_huawei_config(command_count, seed=i)
+        else:
+            device_type = "h3c"
+            header = "#\n version 7.1.064, Release 9323P1201\n#\n"
+            commands = generate_h3c_config(command_count, seed=i)
+        device = f"FW-{i:04d}" if i % 3 else f"device_{i:04d}"
+        sysname = f" sysname {device}\n#\n" if i % 3 else ""
+        text = header + sysname + " interface GigabitEthernet1/0/1\n" + commands + "\n#\nreturn\n"
+        with open(os.path.join(directory, f"device_{i:04d}.cfg"), 'w', encoding='utf-8') as f:
+            f.write(text)
+        expected.append((device, device_type, text))
+    return expected
+
+
+def main():
+    file_count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    command_count = int(sys.argv[2]) if len(sys.argv) > 2 else 5000
+    max_workers = int(sys.argv[3]) if len(sys.argv) > 3 else (os.cpu_count() or 1)
+    directory = os.path.join(tempfile.gettempdir(), f'nat_parallel_bench_{file_count}_{command_count}')
+    print(f"生成配置目录: {directory} ({file_count} 个文件，每个 {command_count:,} 条命令)")
+    configs = write_configs(directory, file_count, command_count)
+
+    start = time.perf_counter()
+    expected_data = []
+    expected_failed = []
+    for device, device_type, text in configs:
+        data, failed_entries = NATParser.parse_config(text, device_type)
+        for item in data:
+            item['device'] = device
+            item['device_type'] = device_type
+        expected_data.extend(data)
+        expected_failed.extend((device, line) for line in failed_entries)
+    baseline = time.perf_counter() - start
+    print(f"单进程顺序解析: {baseline:.2f}s，{len(expected_data):,} 条记录")
+
+    workers = 1
+    while workers <= max_workers:
+        start = time.perf_counter()
+        result = parse_config_dir(directory, workers)
+        cost = time.perf_counter() - start
+        same = result['data'] == expected_data and result['failed_entries'] == expected_failed
+        status = "✅" if same else "❌ 结果不一致"
+        mode = "（当前进程内解析）" if workers == 1 else ""
+        print(f"{workers:>2} 个进程{mode}: {cost:.2f}s，相对顺序解析 {baseline / cost:.2f} 倍 {status}")
+        workers *= 2
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,315 @@
+"""
+NAT Server命令解析性能测试
+生成随机的华为/H3C nat server 配置，对比词法单元解析与原有正则表达式解析的耗时和结果
+
+用法: python benchmarks/nat_parser_bench.py [命令数量] [huawei|h3c]
+"""
+import os
+import random
+import re
+import sys
+import time
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from src.utils.nat_parser import NATParser
+
+
+def generate_huawei_config(count, seed=1):
+    """生成包含四种命令格式、带引号名称和后缀的华为配置"""
+    rng = random.Random(seed)
+    lines = []
+    for i in range(count):
+        name = f'"server {i}"' if rng.random() < 0.3 else f"server{i}"
+        global_ip = f"202.100.{rng.randrange(256)}.{rng.randrange(256)}"
+        inside_ip = f"10.{rng.randrange(256)}.{rng.randrange(256)}.{rng.randrange(256)}"
+        kind = rng.random()
+        if kind < 0.5:
+            protocol = rng.choice(('tcp', 'udp'))
+            zone = " zone untrust" if rng.random() < 0.3 else ""
+            ports = rng.choice(((" www", " 8080"), (f" {rng.randrange(1, 65536)}", f" {rng.randrange(1, 65536)}"), ("", "")))
+            suffix = rng.choice(("", " no-reverse", " reversible", f" acl {rng.randrange(2000, 4000)}"))
+            lines.append(f"nat server {name}{zone} protocol {protocol} global {global_ip}{ports[0]} "
+                         f"inside {inside_ip}{ports[1]}{suffix}")
+        elif kind < 0.7:
+            lines.append(f"nat server {name} {rng.randrange(100)} protocol tcp global {global_ip} 443 "
+                         f"inside {inside_ip} 443 no-reverse")
+        elif kind < 0.85:
+            lines.append(f"nat server {name} {rng.randrange(100)} global {global_ip} inside {inside_ip}")
+        elif kind < 0.99:
+            lines.append(f"nat server {name} global {global_ip} inside {inside_ip} no-reverse")
+        else:
+            lines.append(f"nat server {name} global {global_ip}")
+    return "\n".join(lines)
+
+
+def generate_h3c_config(count, seed=1):
+    """生成包含端口、端口范围、rule、description、vrrp 等参数的H3C配置"""
+    rng = random.Random(seed)
+    lines = []
+    for i in range(count):
+        global_ip = f"202.100.{rng.randrange(256)}.{rng.randrange(256)}"
+        inside_ip = f"10.{rng.randrange(256)}.{rng.randrange(256)}.{rng.randrange(256)}"
+        kind = rng.random()
+        if kind < 0.5:
+            port = rng.randrange(1, 65000)
+            command = (f"nat server protocol {rng.choice(('tcp', 'udp'))} global {global_ip} {port} "
+                       f"inside {inside_ip} {rng.randrange(1, 65536)}")
+        elif kind < 0.7:
+            port = rng.randrange(1, 65000)
+            command = (f"nat server protocol tcp global {global_ip} {port} {port + 10} "
+                       f"inside {inside_ip} {port} {port + 10}")
+        else:
+            command = f"nat server global {global_ip} inside {inside_ip}"
+        if rng.random() < 0.5:
+            command += f" rule ServerRule_{i}"
+        if rng.random() < 0.3:
+            # 部分描述中含有连续空格和制表符，须原样保留
+            separator = rng.choice((' ', '  ', '\t', ' \t '))
+            command += f" description server{separator}{i} for test"
+        if rng.random() < 0.2:
+            command += " counting"
+        if rng.random() < 0.2:
+            command += " reversible"
+        if rng.random() < 0.2:
+            command += f" vrrp {rng.randrange(1, 256)}"
+        lines.append(f" {command}")
+    return "\n".join(lines)
+
+
+def legacy_parse_config(text, device_type):
+    """原实现的配置解析流程"""
+    parse_command = legacy_parse_huawei_command if device_type == "huawei" else legacy_parse_h3c_command
+    data, failed_entries = [], []
+    for line in text.split('\n'):
+        line = line.strip()
+        if line.startswith('nat server'):
+            parsed = parse_command(line)
+            if parsed:
+                data.append(parsed)
+            else:
+                failed_entries.append(line)
+    return data, failed_entries
+
+
+def legacy_parse_huawei_command(command):
+    """原实现：占位符替换带引号的标识符后依次尝试四个正则表达式"""
+    # 预处理命令，处理带引号的标识符
+    processed_command = command
+    quoted_names = re.findall(r'"([^"]+)"', command)
+
+    # 临时替换带引号的标识符，以便正则表达式处理
+    for i, quoted_name in enumerate(quoted_names):
+        placeholder = f"QUOTED_NAME_{i}"
+        processed_command = processed_command.replace(f'"{quoted_name}"', placeholder)
+
+    # 尝试多种模式匹配
+    result = None
+
+    # 模式1: 两个标识符格式 - nat server id1 id2 protocol ...
+    pattern1 = r'nat server\s+(\S+)\s+(\S+)(?:\s+zone\s+\S+)?\s+protocol\s+(\S+)\s+global\s+(\S+)(?:\s+(\S+))?\s+inside\s+(\S+)(?:\s+(\S+))?(?:\s+no-reverse|\s+acl\s+\d+|\s+reversible)*'
+    match = re.match(pattern1, processed_command)
+    if match:
+        id1 = match.group(1)
+        id2 = match.group(2)
+        protocol = match.group(3)
+        global_ip = match.group(4)
+        global_port = match.group(5).strip() if match.group(5) else 'any'
+        inside_ip = match.group(6)
+        inside_port = match.group(7).strip() if match.group(7) else 'any'
+
+        # 还原带引号的标识符
+        for i, quoted_name in enumerate(quoted_names):
+            placeholder = f"QUOTED_NAME_{i}"
+            if id1 == placeholder:
+                id1 = quoted_name
+
+        # 将第一个标识符作为名称
+        name = id1
+
+        result = {
+            'name': name,
+            'protocol': protocol,
+            'global_ip': global_ip,
+            'global_port': global_port,
+            'inside_ip': inside_ip,
+            'inside_port': inside_port,
+            'command': command
+        }
+
+    # 模式2: 单个标识符 + protocol 格式 - nat server id protocol ...
+    if not result:
+        pattern2 = r'nat server\s+(\S+)(?:\s+zone\s+\S+)?\s+protocol\s+(\S+)\s+global\s+(\S+)(?:\s+(\S+))?\s+inside\s+(\S+)(?:\s+(\S+))?(?:\s+no-reverse|\s+acl\s+\d+|\s+reversible)*'
+        match = re.match(pattern2, processed_command)
+        if match:
+            name = match.group(1)
+            protocol = match.group(2)
+            global_ip = match.group(3)
+            global_port = match.group(4).strip() if match.group(4) else 'any'
+            inside_ip = match.group(5)
+            inside_port = match.group(6).strip() if match.group(6) else 'any'
+
+            # 还原带引号的标识符
+            for i, quoted_name in enumerate(quoted_names):
+                placeholder = f"QUOTED_NAME_{i}"
+                if name == placeholder:
+                    name = quoted_name
+
+            result = {
+                'name': name,
+                'protocol': protocol,
+                'global_ip': global_ip,
+                'global_port': global_port,
+                'inside_ip': inside_ip,
+                'inside_port': inside_port,
+                'command': command
+            }
+
+    # 模式3: 两个标识符但没有protocol关键字 - nat server id1 id2 global ... inside ...
+    if not result:
+        pattern3 = r'nat server\s+(\S+)\s+(\S+)\s+global\s+(\S+)\s+inside\s+(\S+)(?:\s+no-reverse|\s+acl\s+\d+|\s+reversible)*'
+        match = re.match(pattern3, processed_command)
+        if match:
+            id1 = match.group(1)
+            global_ip = match.group(3)
+            inside_ip = match.group(4)
+
+            # 还原带引号的标识符
+            for i, quoted_name in enumerate(quoted_names):
+                placeholder = f"QUOTED_NAME_{i}"
+                if id1 == placeholder:
+                    id1 = quoted_name
+
+            # 将第一个标识符作为名称
+            name = id1
+
+            result = {
+                'name': name,
+                'protocol': 'any',
+                'global_ip': global_ip,
+                'global_port': 'any',
+                'inside_ip': inside_ip,
+                'inside_port': 'any',
+                'command': command
+            }
+
+    # 模式4: 简化格式 - nat server id global ... inside ...
+    if not result:
+        pattern4 = r'nat server\s+(\S+)\s+global\s+(\S+)\s+inside\s+(\S+)(?:\s+no-reverse|\s+acl\s+\d+|\s+reversible)*'
+        match = re.match(pattern4, processed_command)
+        if match:
+            name = match.group(1)
+            global_ip = match.group(2)
+            inside_ip = match.group(3)
+
+            # 还原带引号的标识符
+            for i, quoted_name in enumerate(quoted_names):
+                placeholder = f"QUOTED_NAME_{i}"
+                if name == placeholder:
+                    name = quoted_name
+
+            result = {
+                'name': name,
+                'protocol': 'any',
+                'global_ip': global_ip,
+                'global_port': 'any',
+                'inside_ip': inside_ip,
+                'inside_port': 'any',
+                'command': command
+            }
+
+    return result
+
+
+def legacy_parse_h3c_command(command):
+    """原实现：每个参数分别执行一次正则表达式搜索"""
+    # 尝试多种模式匹配
+    result = None
+
+    # 提取命令中的关键参数
+    protocol_match = re.search(r'protocol\s+(\S+)', command)
+    protocol = protocol_match.group(1) if protocol_match else 'any'
+
+    global_ip_match = re.search(r'global\s+(\S+)', command)
+    global_ip = global_ip_match.group(1) if global_ip_match else None
+
+    inside_ip_match = re.search(r'inside\s+(\S+)', command)
+    inside_ip = inside_ip_match.group(1) if inside_ip_match else None
+
+    rule_match = re.search(r'rule\s+(\S+)', command)
+    rule = rule_match.group(1) if rule_match else '-'
+
+    description_match = re.search(r'description\s+(.+?)(?:\s+counting|\s+reversible|$)', command)
+    description = description_match.group(1) if description_match else '-'
+
+    vrrp_match = re.search(r'vrrp\s+(\d+)', command)
+    vrrp = vrrp_match.group(1) if vrrp_match else '-'
+
+    # 如果缺少必要的参数，返回None
+    if not global_ip or not inside_ip:
+        return None
+
+    # 提取端口信息
+    # 模式1: 单端口
+    global_port = 'any'
+    inside_port = 'any'
+
+    # 检查是否有端口信息
+    if protocol != 'any':
+        # 尝试匹配双端口格式
+        double_port_match = re.search(r'global\s+\S+\s+(\d+)\s+(\d+)\s+inside\s+\S+\s+(\d+)\s+(\d+)', command)
+        if double_port_match:
+            global_port_start = double_port_match.group(1)
+            global_port_end = double_port_match.group(2)
+            inside_port_start = double_port_match.group(3)
+            inside_port_end = double_port_match.group(4)
+            global_port = f"{global_port_start}-{global_port_end}"
+            inside_port = f"{inside_port_start}-{inside_port_end}"
+        else:
+            # 尝试匹配单端口格式
+            single_port_match = re.search(r'global\s+\S+\s+(\d+)\s+inside\s+\S+\s+(\d+)', command)
+            if single_port_match:
+                global_port = single_port_match.group(1)
+                inside_port = single_port_match.group(2)
+
+    # 构建结果
+    result = {
+        'protocol': protocol,
+        'global_ip': global_ip,
+        'global_port': global_port,
+        'inside_ip': inside_ip,
+        'inside_port': inside_port,
+        'vrrp': vrrp,
+        'rule': rule,
+        'description': description,
+        'command': command
+    }
+
+    return result
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    device_type = sys.argv[2] if len(sys.argv) > 2 else "huawei"
+    generate = generate_huawei_config if device_type == "huawei" else generate_h3c_config
+    text = generate(count)
+
+    start = time.perf_counter()
+    data, failed = NATParser.parse_config(text, device_type)
+    new_cost = time.perf_counter() - start
+    print(f"词法单元解析: {new_cost:.2f}s，{count / new_cost:,.0f} 条/秒，成功 {len(data):,} 条")
+
+    start = time.perf_counter()
+    legacy_data, legacy_failed = legacy_parse_config(text, device_type)
+    legacy_cost = time.perf_counter() - start
+    print(f"正则表达式解析: {legacy_cost:.2f}s，{count / legacy_cost:,.0f} 条/秒")
+
+    if data != legacy_data or failed != legacy_failed:
+        print("❌ 结果不一致")
+        sys.exit(1)
+    print(f"✅ 结果一致（{len(failed)} 条解析失败），加速 {legacy_cost / new_cost:.1f} 倍")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+"""
+PCAP多进程分析性能测试
+在合成抓包文件上测量1到N个工作进程的耗时，并校验与单进程顺序汇总的结果一致
+
+用法: python benchmarks/pcap_parallel_bench.py [数据包数] [最大进程数]
+"""
+import os
+import sys
+import tempfile
+import time
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from benchmarks.pcap_decoder_bench import write_pcap
+from src.utils.flow_table import FlowTable
+from src.utils.pcap_parallel import analyze_pcap_parallel
+from src.utils.pcap_reader import PcapReader
+
+
+def main():
+    packet_count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    max_workers = int(sys.argv[2]) if len(sys.argv) > 2 else (os.cpu_count() or 1)
+    path = os.path.join(tempfile.gettempdir(), f'pcap_parallel_bench_{packet_count}.pcap')
+    if not os.path.exists(path):
+        print(f"生成合成抓包文件: {path} ({packet_count:,} 个数据包)")
+        write_pcap(path, packet_count, flow_count=20000)
+    file_size = os.path.getsize(path)
+    print(f"文件大小: {file_size / 1024 / 1024:.1f}MB")
+
+    start = time.perf_counter()
+    expected = FlowTable()
+    with PcapReader(path) as reader:
+        expected.update(reader)
+    baseline = time.perf_counter() - start
+    expected_rows = expected.to_rows()
+    print(f"单进程顺序汇总: {baseline:.2f}s ({file_size / 1024 / 1024 / baseline:.1f}MB/s)")
+
+    workers = 1
+    while workers <= max_workers:
+        start = time.perf_counter()
+        table, _ = analyze_pcap_parallel(path, workers)
+        cost = time.perf_counter() - start
+        status = "✅" if table.to_rows() == expected_rows else "❌ 结果不一致"
+        print(f"{workers:>2} 个进程: {cost:.2f}s ({file_size / 1024 / 1024 / cost:.1f}MB/s), "
+              f"相对顺序汇总 {baseline / cost:.2f} 倍 {status}")
+        workers *= 2
+
+
+if __name__ == '__main__':
+    main()
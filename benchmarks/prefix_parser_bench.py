@@ -0,0 +1,101 @@
+"""
+批量前缀解析性能测试
+生成随机的路由条目（含少量范围和错误条目），对比向量化批量解析与逐条 parse_ip_range，
+并检查 IPUtils.iter_addresses 对IPv4与IPv6范围生成的地址版本
+
+用法: python benchmarks/prefix_parser_bench.py [条目数量]
+"""
+import os
+import random
+import sys
+import time
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from netaddr import IPRange
+
+from src.utils.ip_utils import IPUtils
+from src.utils.prefix_parser import parse_prefixes
+from src.utils.route_summary import summarize_ranges
+from src.utils.text_utils import TextUtils
+
+
+def generate_entries(count, seed=1):
+    """生成随机路由条目"""
+    rng = random.Random(seed)
+    entries = []
+    for _ in range(count):
+        ip = '.'.join(str(rng.randrange(256)) for _ in range(4))
+        kind = rng.random()
+        if kind < 0.6:
+            entries.append(f"{ip}/{rng.randrange(8, 33)}")
+        elif kind < 0.98:
+            entries.append(ip)
+        elif kind < 0.99:
+            entries.append(f"{ip}-{rng.randrange(256)}")
+        else:
+            entries.append(rng.choice(('1.2.3.256', '1.2.3', 'abc', '1.2.3.4/33')))
+    return entries
+
+
+# 双栈范围：IPv4、数值在32位以内的IPv6、跨越低64位进位的IPv6
+DUAL_STACK_RANGES = (
+    ('10.0.0.254', '10.0.1.1'),
+    ('::1', '::3'),
+    ('2001:db8::ffff:ffff:ffff:fffe', '2001:db8:0:1::1'),
+)
+
+
+def check_dual_stack():
+    """iter_addresses 逐个生成的地址须与 netaddr 遍历范围的结果及版本一致"""
+    ranges = [IPRange(first, last) for first, last in DUAL_STACK_RANGES]
+    generated = [(str(ip), ip.version) for ip in IPUtils.iter_addresses(ranges)]
+    expected = [(str(ip), ip.version) for ip_range in ranges for ip in ip_range]
+    return generated == expected
+
+
+def legacy_parse(entries):
+    """原实现：逐条创建netaddr对象"""
+    starts, ends, failed = [], [], []
+    for entry in entries:
+        try:
+            network = TextUtils.parse_ip_range(entry)
+        except ValueError as e:
+            failed.append((entry, str(e)))
+            continue
+        if network:
+            starts.append(network.first)
+            ends.append(network.last)
+    return starts, ends, failed
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500000
+    entries = generate_entries(count)
+
+    start = time.perf_counter()
+    parsed = parse_prefixes(entries)
+    parse_cost = time.perf_counter() - start
+    summarized = summarize_ranges(parsed.starts, parsed.ends)
+    total_cost = time.perf_counter() - start
+    print(f"批量解析: {parse_cost:.2f}s，解析+汇总: {total_cost:.2f}s，{len(summarized):,} 条")
+
+    start = time.perf_counter()
+    starts, ends, failed = legacy_parse(entries)
+    legacy_cost = time.perf_counter() - start
+    print(f"逐条解析: {legacy_cost:.2f}s")
+
+    if list(parsed.starts) != starts or list(parsed.ends) != ends or parsed.failed != failed:
+        print("❌ 结果不一致")
+        sys.exit(1)
+    print(f"✅ 结果一致（{len(failed)} 条解析失败），解析加速 {legacy_cost / parse_cost:.1f} 倍")
+
+    if not check_dual_stack():
+        print("❌ IPv4/IPv6范围逐个生成的地址不一致")
+        sys.exit(1)
+    print("✅ IPv4/IPv6范围逐个生成的地址一致")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+"""
+路由汇总性能测试
+生成随机前缀与IP范围，对比整数区间汇总与 netaddr.cidr_merge 的耗时和结果，
+并检查10万个输入在最多16条路由时的非精确汇总能否在1秒内完成
+
+用法: python benchmarks/route_summary_bench.py [前缀数量] [IP版本(4或6)]
+"""
+import os
+import random
+import sys
+import time
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from netaddr import IPAddress, IPNetwork, IPRange, cidr_merge
+
+from src.utils.route_summary import IPV4_BITS, IPV6_BITS, summarize_intervals, summarize_with_budget
+
+# 各IP版本的随机前缀长度，偏向可合并的相邻网段
+PREFIX_LENGTHS = {
+    4: (16, 18, 20, 22, 23, 24, 24, 24, 28, 32),
+    6: (32, 40, 44, 46, 47, 48, 48, 48, 56, 64),
+}
+# 非精确汇总的耗时要求：输入数量、最多路由条数、秒数
+BUDGET_CHECK = (100000, 16, 1.0)
+
+
+def generate_networks(count, seed=1, version=4):
+    """生成随机的CIDR与IP范围"""
+    rng = random.Random(seed)
+    bits = IPV6_BITS if version == 6 else IPV4_BITS
+    networks = []
+    for _ in range(count):
+        if rng.random() < 0.1:
+            first = rng.getrandbits(bits)
+            last = min(first + rng.randrange(1, 5000), (1 << bits) - 1)
+            networks.append(IPRange(IPAddress(first, version), IPAddress(last, version)))
+        else:
+            prefixlen = rng.choice(PREFIX_LENGTHS[version])
+            network = rng.getrandbits(prefixlen) << (bits - prefixlen)
+            networks.append(IPNetwork((network, prefixlen), version=version))
+    return networks
+
+
+def legacy_summarize(networks):
+    """原实现：IPRange 展开为CIDR后调用 cidr_merge"""
+    ip_networks = []
+    for net in networks:
+        if isinstance(net, IPRange):
+            ip_networks.extend(net.cidrs())
+        else:
+            ip_networks.append(net)
+    return cidr_merge(ip_networks)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    version = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    bits = IPV6_BITS if version == 6 else IPV4_BITS
+    print(f"生成 {count:,} 个随机IPv{version}网段...")
+    networks = generate_networks(count, version=version)
+
+    start = time.perf_counter()
+    intervals = [(net.first, net.last) for net in networks]
+    summarized = summarize_intervals(intervals, bits)
+    new_cost = time.perf_counter() - start
+    print(f"整数区间汇总: {new_cost:.2f}s，{len(summarized):,} 条")
+
+    for max_routes in (1, 16, 256):
+        start = time.perf_counter()
+        chosen = summarize_with_budget(summarized, max_routes, bits)
+        cost = time.perf_counter() - start
+        extra = sum(extra for _, extra in chosen)
+        print(f"非精确汇总(最多 {max_routes} 条): {cost:.2f}s，额外包含 {extra:,} 个IP")
+
+    start = time.perf_counter()
+    legacy = legacy_summarize(networks)
+    legacy_cost = time.perf_counter() - start
+    print(f"cidr_merge: {legacy_cost:.2f}s，{len(legacy):,} 条")
+
+    if [str(net) for net in summarized] != [str(net.cidr) for net in legacy]:
+        print("❌ 结果不一致")
+        sys.exit(1)
+    print(f"✅ 结果一致，加速 {legacy_cost / new_cost:.1f} 倍")
+
+    inputs, max_routes, limit = BUDGET_CHECK
+    if count != inputs:
+        networks = generate_networks(inputs, version=version)
+        summarized = summarize_intervals([(net.first, net.last) for net in networks], bits)
+    start = time.perf_counter()
+    summarize_with_budget(summarized, max_routes, bits)
+    cost = time.perf_counter() - start
+    if cost >= limit:
+        print(f"❌ {inputs:,} 个输入最多 {max_routes} 条的非精确汇总耗时 {cost:.2f}s，超过 {limit:.0f}s")
+        sys.exit(1)
+    print(f"✅ {inputs:,} 个输入最多 {max_routes} 条的非精确汇总耗时 {cost:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -335,6 +335,7 @@ def get_pyinstaller_args() -> List[str]:
         '--hidden-import=src.gui.tabs.subnet_calculator_tab',
         '--hidden-import=src.gui.tabs.ip_calculator_tab',
         '--hidden-import=src.gui.tabs.route_summary_tab',
+        '--hidden-import=src.gui.tabs.route_lookup_tab',
         '--hidden-import=src.gui.tabs.mask_converter_tab',
         '--hidden-import=src.gui.tabs.nat_parser_tab',
         '--hidden-import=src.gui.tabs.vsr_config_tab',
@@ -344,8 +345,22 @@ def get_pyinstaller_args() -> List[str]:
         '--hidden-import=src.utils.ip_utils',
         '--hidden-import=src.utils.text_utils',
         '--hidden-import=src.utils.nat_parser',
+        '--hidden-import=src.utils.nat_parallel',
+        '--hidden-import=src.utils.nat_conflict',
+        '--hidden-import=src.utils.table_export',
+        '--hidden-import=src.utils.ip_geo',
+        '--hidden-import=src.utils.geo_cache',
         '--hidden-import=src.utils.logger',
         '--hidden-import=src.utils.async_utils',
+        '--hidden-import=src.utils.flow_table',
+        '--hidden-import=src.utils.pcap_reader',
+        '--hidden-import=src.utils.pcap_analysis',
+        '--hidden-import=src.utils.pcap_parallel',
+        '--hidden-import=src.utils.flow_search',
+        '--hidden-import=src.utils.prefix_parser',
+        '--hidden-import=src.utils.route_summary',
+        '--hidden-import=src.utils.prefix_trie',
+        '--hidden-import=src.utils.route_lookup',
     ])
 
     return args
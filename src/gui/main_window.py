@@ -144,6 +144,7 @@ class NetworkToolGUI(QMainWindow):
             {"name": "子网计算", "module": "src.gui.tabs.subnet_calculator_tab", "class": "SubnetCalculatorTab"},
             {"name": "IP定位", "module": "src.gui.tabs.ip_calculator_tab", "class": "IPCalculatorTab"},
             {"name": "路由汇总", "module": "src.gui.tabs.route_summary_tab", "class": "RouteSummaryTab"},
+            {"name": "路由查询", "module": "src.gui.tabs.route_lookup_tab", "class": "RouteLookupTab"},
             {"name": "掩码转换", "module": "src.gui.tabs.mask_converter_tab", "class": "MaskConverterTab"},
             {"name": "NAT解析", "module": "src.gui.tabs.nat_parser_tab", "class": "NatParserTab"},
             {"name": "VSR配置", "module": "src.gui.tabs.vsr_config_tab", "class": "VSRConfigTab"},
@@ -1,18 +1,100 @@
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QGroupBox,
                            QLineEdit, QPushButton, QLabel, QTableWidget,
-                           QTableWidgetItem, QHeaderView, QProgressBar)
+                           QTableWidgetItem, QHeaderView, QProgressBar, QTabWidget,
+                           QTextEdit, QCheckBox, QTableView, QAbstractItemView,
+                           QFileDialog, QMessageBox)
 from PyQt6.QtGui import QFont
-from PyQt6.QtCore import Qt
-import requests
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex
+import os
+import time
 from . import get_public_ip, IPFetcher
 from src.utils.async_utils import AsyncTaskManager
-from src.config import AppConfig
+from src.utils.ip_geo import (query_remote, search_local, remote_columns, lookup_local,
+                              lookup_remote, count_ipv4_addresses, count_ipv4_addresses_in_file)
+from src.utils.geo_cache import get_geo_cache
+from src.utils.logger import logger
+from src.utils.table_export import ExportSheet, export_tables
 from src.gui.styles import StyleManager
 
+# 批量查询时每批发送到表格的行数
+BATCH_ROWS = 20000
+
+
+class GeoResultModel(QAbstractTableModel):
+    """
+    批量定位结果表模型
+
+    本地查询的结果分批追加，在线查询的结果按行更新；单元格文本在视图请求时
+    生成，数十万个地址也无需逐个创建表格项。
+    """
+
+    HEADERS = ["IP地址", "次数", "国家", "省份", "城市", "运营商", "来源"]
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        # 每行为 [IP地址, 次数, 国家, 省份, 城市, 运营商, 来源]
+        self._rows = []
+
+    def clear(self):
+        self.beginResetModel()
+        self._rows = []
+        self.endResetModel()
+
+    def append_rows(self, rows):
+        """在表格末尾追加一批行"""
+        if not rows:
+            return
+        first = len(self._rows)
+        self.beginInsertRows(QModelIndex(), first, first + len(rows) - 1)
+        self._rows.extend(rows)
+        self.endInsertRows()
+
+    def update_rows(self, updates):
+        """
+        用在线查询的结果更新已有的行
+
+        Args:
+            updates: 行号 -> (国家, 省份, 城市, 运营商, 来源)，为空的项保留本地查询的结果
+        """
+        if not updates:
+            return
+        for row, values in updates.items():
+            target = self._rows[row]
+            for column, value in enumerate(values, 2):
+                if value:
+                    target[column] = value
+        self.dataChanged.emit(self.index(min(updates), 2),
+                              self.index(max(updates), len(self.HEADERS) - 1))
+
+    def columns(self):
+        """按列整理的表格内容（副本），用于导出"""
+        return [list(column) for column in zip(*self._rows)] if self._rows else [[] for _ in self.HEADERS]
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+        if orientation == Qt.Orientation.Horizontal:
+            return self.HEADERS[section]
+        return str(section + 1)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or role != Qt.ItemDataRole.DisplayRole:
+            return None
+        return str(self._rows[index.row()][index.column()])
+
+
 class IPCalculatorTab(QWidget):
     """IP定位查询选项卡"""
     def __init__(self):
         super().__init__()
+        # 批量查询时选择的文件，为None时查询输入框中的文本
+        self.batch_file = None
         # 创建异步任务管理器
         self.task_manager = AsyncTaskManager()
         self.setup_ui()
@@ -32,7 +114,31 @@ class IPCalculatorTab(QWidget):
 
     def setup_ui(self):
         """设置UI界面"""
-        layout = QVBoxLayout(self)
+        main_layout = QVBoxLayout(self)
+        self.tabs = QTabWidget()
+        main_layout.addWidget(self.tabs)
+
+        single_page = QWidget()
+        self.setup_single_page(single_page)
+        self.tabs.addTab(single_page, "单个查询")
+
+        batch_page = QWidget()
+        self.setup_batch_page(batch_page)
+        self.tabs.addTab(batch_page, "批量查询")
+
+        # 单个查询和批量查询共用在线结果缓存
+        cache_layout = QHBoxLayout()
+        self.cache_label = QLabel()
+        cache_layout.addWidget(self.cache_label, 1)
+        clear_cache_button = QPushButton("清空缓存")
+        clear_cache_button.clicked.connect(self.clear_cache)
+        cache_layout.addWidget(clear_cache_button)
+        main_layout.addLayout(cache_layout)
+        self.update_cache_stats()
+
+    def setup_single_page(self, page):
+        """单个地址查询页面"""
+        layout = QVBoxLayout(page)
 
         # 创建输入区域
         input_group = QGroupBox("IP地址")
@@ -77,6 +183,71 @@ class IPCalculatorTab(QWidget):
         self.error_label.hide()
         layout.addWidget(self.error_label)
 
+    def setup_batch_page(self, page):
+        """批量查询页面"""
+        layout = QVBoxLayout(page)
+
+        input_group = QGroupBox("IP地址列表")
+        input_layout = QVBoxLayout()
+
+        # 较大的地址列表或日志文件直接从磁盘读取，不载入输入框
+        file_layout = QHBoxLayout()
+        open_button = QPushButton("打开文件")
+        open_button.clicked.connect(self.open_batch_file)
+        file_layout.addWidget(open_button)
+        self.batch_file_label = QLabel()
+        file_layout.addWidget(self.batch_file_label, 1)
+        input_layout.addLayout(file_layout)
+
+        self.batch_input = QTextEdit()
+        self.batch_input.setPlaceholderText("在此粘贴IP地址列表或日志内容，自动提取其中的IPv4地址并去重...")
+        self.batch_input.textChanged.connect(self.on_batch_text_changed)
+        input_layout.addWidget(self.batch_input)
+
+        button_layout = QHBoxLayout()
+        self.remote_checkbox = QCheckBox("在线补充查询")
+        self.remote_checkbox.setToolTip("本地查询完成后并发调用在线接口，用在线结果补充或替换本地结果")
+        button_layout.addWidget(self.remote_checkbox)
+        button_layout.addStretch()
+        self.batch_query_button = QPushButton("查询")
+        self.batch_query_button.clicked.connect(self.start_batch_query)
+        button_layout.addWidget(self.batch_query_button)
+        self.batch_stop_button = QPushButton("停止")
+        self.batch_stop_button.setEnabled(False)
+        self.batch_stop_button.clicked.connect(lambda: self.task_manager.cancel_task("ip_batch"))
+        button_layout.addWidget(self.batch_stop_button)
+        self.batch_export_button = QPushButton("导出结果")
+        self.batch_export_button.clicked.connect(self.export_batch_results)
+        button_layout.addWidget(self.batch_export_button)
+        input_layout.addLayout(button_layout)
+
+        input_group.setLayout(input_layout)
+        layout.addWidget(input_group)
+
+        result_group = QGroupBox("查询结果")
+        result_layout = QVBoxLayout()
+
+        self.batch_progress = QProgressBar()
+        self.batch_progress.setRange(0, 100)
+        self.batch_progress.setVisible(False)
+        result_layout.addWidget(self.batch_progress)
+
+        self.batch_stats_label = QLabel()
+        result_layout.addWidget(self.batch_stats_label)
+
+        self.geo_model = GeoResultModel(self)
+        self.batch_table = QTableView()
+        self.batch_table.setModel(self.geo_model)
+        self.batch_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        self.batch_table.verticalHeader().setVisible(False)
+        self.batch_table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        self.batch_table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.batch_table.setAlternatingRowColors(True)
+        result_layout.addWidget(self.batch_table)
+
+        result_group.setLayout(result_layout)
+        layout.addWidget(result_group, 1)
+
     def query_ip_info(self):
         """查询IP信息"""
         ip = self.ip_query_input.text().strip()
@@ -102,129 +273,20 @@ class IPCalculatorTab(QWidget):
 
     def perform_ip_query(self, ip):
         """执行IP查询（在后台线程中运行）"""
-        headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'}
         data_source = None
         fields = None
 
-        # 尝试多个API，按优先级顺序
-        apis = [
-            {
-                'url': f'https://realip.cc/?ip={ip}',
-                'handler': lambda data: {
-                    'fields': {
-                        'ip': 'IP地址',
-                        'country': '国家',
-                        'province': '省份',
-                        'city': '城市',
-                        'isp': '运营商',
-                        'time_zone': '时区',
-                        'latitude': '纬度',
-                        'longitude': '经度'
-                    },
-                    'data': {
-                        'ip': data['ip'],
-                        'country': data['country'],
-                        'province': data['province'],
-                        'city': data['city'],
-                        'isp': data['isp'],
-                        'time_zone': data['time_zone'],
-                        'latitude': data['latitude'],
-                        'longitude': data['longitude']
-                    }
-                }
-            },
-            {
-                'url': f'https://api.ip.sb/geoip/{ip}',
-                'handler': lambda data: {
-                    'fields': {
-                        'ip': 'IP地址',
-                        'country': '国家',
-                        'region': '地区',
-                        'city': '城市',
-                        'isp': '运营商',
-                        'timezone': '时区',
-                        'latitude': '纬度',
-                        'longitude': '经度'
-                    },
-                    'data': {
-                        'ip': data['ip'],
-                        'country': data['country'],
-                        'region': data['region'],
-                        'city': data['city'],
-                        'isp': data['isp'],
-                        'timezone': data['timezone'],
-                        'latitude': data['latitude'],
-                        'longitude': data['longitude']
-                    }
-                }
-            },
-            {
-                'url': f'https://api.ip2location.io/?ip={ip}',
-                'handler': lambda data: {
-                    'fields': {
-                        'ip': 'IP地址',
-                        'country_name': '国家',
-                        'region_name': '地区',
-                        'city_name': '城市',
-                        'time_zone': '时区',
-                        'latitude': '纬度',
-                        'longitude': '经度'
-                    },
-                    'data': {
-                        'ip': data['ip'],
-                        'country_name': data['country_name'],
-                        'region_name': data['region_name'],
-                        'city_name': data['city_name'],
-                        'time_zone': data['time_zone'],
-                        'latitude': data['latitude'],
-                        'longitude': data['longitude']
-                    }
-                }
-            },
-            {
-                'url': f'https://whois.pconline.com.cn/ipJson.jsp?ip={ip}&json=true',
-                'handler': lambda data: {
-                    'fields': {
-                        'ip': 'IP地址',
-                        'addr': '地理位置',
-                        'pro': '省份',
-                        'city': '城市',
-                        'region': '地区'
-                    },
-                    'data': {
-                        'ip': data['ip'],
-                        'addr': data['addr'],
-                        'pro': data['pro'],
-                        'city': data['city'],
-                        'region': data['region']
-                    }
-                }
-            }
-        ]
-
-        for api in apis:
-            try:
-                response = requests.get(api['url'], headers=headers, timeout=5)
-                if response.status_code == 200:
-                    data = response.json()
-                    print(f"\n{api['url']} API响应:")
-                    print(data)
-                    result = api['handler'](data)
-                    fields = result['fields']
-                    data_source = result['data']
-                    break
-            except Exception as e:
-                print(f"API {api['url']} 调用失败: {str(e)}")
-                continue
+        # 按优先级依次尝试在线接口
+        result = query_remote(ip)
+        if result:
+            fields = result['provider']['fields']
+            data_source = result['data']
 
         # 所有API都失败时使用ip2region本地查询
         if not data_source:
-            from XdbSearchIP import XdbSearcher
-            db_path = AppConfig.get_ip_db_path()
             try:
-                # 使用文件缓存方式查询
-                searcher = XdbSearcher(dbfile=db_path)
-                region_str = searcher.searchByIPStr(ip)
+                # 共享的查询器首次使用时将数据库整体读入内存
+                region_str = search_local(ip)
                 fields = {
                     'ip': 'IP地址',
                     'region': '地理位置'
@@ -238,13 +300,11 @@ class IPCalculatorTab(QWidget):
             except Exception as e:
                 print(f"ip2region查询失败: {str(e)}")
                 raise
-            finally:
-                if 'searcher' in locals():
-                    searcher.close()
 
         if not data_source:
             raise Exception("所有查询方式均失败")
 
+        get_geo_cache().flush()
         return {
             'fields': fields,
             'data': data_source
@@ -254,6 +314,7 @@ class IPCalculatorTab(QWidget):
         """处理查询结果（在主线程中运行）"""
         # 隐藏进度条
         self.progress_bar.setVisible(False)
+        self.update_cache_stats()
 
         # 恢复查询按钮状态
         self.query_button.setEnabled(True)
@@ -295,8 +356,203 @@ class IPCalculatorTab(QWidget):
         except Exception as e:
             self.show_error(f"处理结果出错: {str(e)}")
 
+    def update_cache_stats(self):
+        """显示在线结果缓存的命中统计"""
+        stats = get_geo_cache().stats()
+        self.cache_label.setText(
+            f"在线结果缓存：命中 {stats['hits']:,} 次，未命中 {stats['misses']:,} 次，"
+            f"内存中 {stats['entries']:,} 条"
+        )
+
+    def clear_cache(self):
+        """清空内存和磁盘中的在线结果缓存"""
+        get_geo_cache().clear()
+        self.update_cache_stats()
+
     def show_error(self, message: str):
         """显示错误信息"""
         self.error_label.setText(message)
         self.error_label.show()
         self.result_table.setRowCount(0)  # 清空表格
+
+    def on_batch_text_changed(self):
+        """输入框内容变化时改为查询输入的文本"""
+        if self.batch_file is not None:
+            self.batch_file = None
+            self.batch_file_label.clear()
+
+    def open_batch_file(self):
+        """选择地址列表或日志文件"""
+        file_path, _ = QFileDialog.getOpenFileName(
+            self,
+            "打开文件",
+            "",
+            "Text Files (*.txt *.csv *.log);;All Files (*.*)"
+        )
+        if not file_path:
+            return
+
+        self.batch_input.blockSignals(True)
+        self.batch_input.clear()
+        self.batch_input.blockSignals(False)
+
+        self.batch_file = file_path
+        self.batch_file_label.setText(file_path)
+
+    def start_batch_query(self):
+        """在后台批量查询"""
+        text = self.batch_input.toPlainText()
+        if self.batch_file is None and not text.strip():
+            QMessageBox.warning(self, "查询警告", "请输入IP地址列表或打开文件！")
+            return
+
+        self.geo_model.clear()
+        self.batch_query_button.setEnabled(False)
+        self.batch_stop_button.setEnabled(True)
+        self.batch_export_button.setEnabled(False)
+        self.batch_progress.setValue(0)
+        self.batch_progress.setVisible(True)
+        self.batch_stats_label.setText("正在提取IP地址...")
+        self.task_manager.run_progress_task(
+            "ip_batch",
+            self.batch_query_task,
+            self.handle_batch_result,
+            self.handle_batch_progress,
+            text,
+            self.batch_file,
+            self.remote_checkbox.isChecked()
+        )
+
+    @staticmethod
+    def batch_query_task(task, text, file_path, use_remote):
+        """
+        提取并去重地址，先用本地数据库全部查询，再按需并发在线查询（在后台线程中运行）
+
+        本地结果每 BATCH_ROWS 行发送一次，在线结果每轮等待结束后发送一次，
+        表格随查询逐步填充。
+
+        Returns:
+            dict: 地址数、出现次数、各阶段耗时以及是否被取消
+        """
+        start_time = time.perf_counter()
+        counts = count_ipv4_addresses_in_file(file_path) if file_path else count_ipv4_addresses(text)
+        ips = list(counts)
+        total = len(ips)
+        extract_elapsed = time.perf_counter() - start_time
+
+        for offset in range(0, total, BATCH_ROWS):
+            if task.is_cancelled():
+                break
+            chunk = ips[offset:offset + BATCH_ROWS]
+            rows = [[ip, counts[ip], *geo, "本地"] for ip, geo in zip(chunk, lookup_local(chunk))]
+            task.report_progress({"stage": "本地", "rows": rows, "done": offset + len(chunk), "total": total})
+        local_elapsed = time.perf_counter() - start_time - extract_elapsed
+
+        resolved = 0
+        if use_remote and not task.is_cancelled():
+            done = 0
+
+            def report_remote(results):
+                nonlocal done, resolved
+                done += len(results)
+                updates = {index: remote_columns(result) + (result['provider']['name'],)
+                           for index, result in results if result}
+                resolved += len(updates)
+                task.report_progress({"stage": "在线", "updates": updates, "done": done, "total": total})
+
+            lookup_remote(ips, report_remote, task.is_cancelled)
+
+        result = {
+            "unique": total,
+            "occurrences": sum(counts.values()),
+            "extract_elapsed": extract_elapsed,
+            "local_elapsed": local_elapsed,
+            "remote": use_remote,
+            "resolved": resolved,
+            "elapsed": time.perf_counter() - start_time,
+            "cancelled": task.is_cancelled()
+        }
+        logger.info(
+            f"IP批量定位{'已停止' if result['cancelled'] else '完成'}: {total} 个地址，"
+            f"本地查询耗时 {local_elapsed:.2f}s，总耗时 {result['elapsed']:.2f}s"
+        )
+        return result
+
+    def handle_batch_progress(self, progress):
+        """将查询结果逐批加入表格"""
+        if "rows" in progress:
+            self.geo_model.append_rows(progress["rows"])
+        if "updates" in progress:
+            self.geo_model.update_rows(progress["updates"])
+        self.batch_progress.setValue(progress["done"] * 100 // max(progress["total"], 1))
+        self.batch_stats_label.setText(f"{progress['stage']}查询: {progress['done']:,} / {progress['total']:,}")
+        if "updates" in progress:
+            self.update_cache_stats()
+
+    def handle_batch_result(self, result, error):
+        """显示批量查询的统计信息"""
+        self.batch_query_button.setEnabled(True)
+        self.batch_stop_button.setEnabled(False)
+        self.batch_export_button.setEnabled(True)
+        self.batch_progress.setVisible(False)
+        self.update_cache_stats()
+        if error:
+            self.batch_stats_label.setText(f"查询出错: {error}")
+            return
+
+        text = (f"共 {result['unique']:,} 个地址（出现 {result['occurrences']:,} 次），"
+                f"提取耗时 {result['extract_elapsed']:.2f}s，本地查询耗时 {result['local_elapsed']:.2f}s")
+        if result["remote"]:
+            text += f"，在线查询成功 {result['resolved']:,} 个，总耗时 {result['elapsed']:.1f}s"
+        if result["cancelled"]:
+            text += "（已停止）"
+        self.batch_stats_label.setText(text)
+
+    def export_batch_results(self):
+        """导出批量查询结果到Excel或CSV文件"""
+        if not self.geo_model.rowCount():
+            QMessageBox.warning(self, "导出警告", "没有可导出的数据！")
+            return
+
+        default_path = os.path.join(os.path.expanduser("~"), "Desktop", "IP定位.xlsx")
+        file_path, selected_filter = QFileDialog.getSaveFileName(
+            self,
+            "保存文件",
+            default_path,
+            "Excel Files (*.xlsx);;CSV Files (*.csv);;Text Files (*.txt)"
+        )
+
+        if not file_path:
+            return
+        if not os.path.splitext(file_path)[1]:
+            file_path += selected_filter[selected_filter.rfind('*') + 1:-1] or '.xlsx'
+
+        self.batch_query_button.setEnabled(False)
+        self.batch_export_button.setEnabled(False)
+        self.batch_progress.setValue(0)
+        self.batch_progress.setVisible(True)
+        self.task_manager.run_progress_task(
+            "ip_export",
+            self.export_batch_task,
+            self.handle_export_result,
+            self.batch_progress.setValue,
+            file_path,
+            self.geo_model.columns()
+        )
+
+    @staticmethod
+    def export_batch_task(task, file_path, columns):
+        """在后台线程中流式写入导出文件"""
+        sheets = [ExportSheet(title="IP定位", headers=GeoResultModel.HEADERS, columns=columns)]
+        completed = export_tables(file_path, sheets, task.report_progress, task.is_cancelled)
+        return {"file_path": file_path, "completed": completed}
+
+    def handle_export_result(self, result, error):
+        """导出完成后提示结果"""
+        self.batch_query_button.setEnabled(True)
+        self.batch_export_button.setEnabled(True)
+        self.batch_progress.setVisible(False)
+        if error:
+            QMessageBox.critical(self, "导出错误", f"导出过程中发生错误：\n{error}")
+        elif result["completed"]:
+            QMessageBox.information(self, "导出成功", f"数据已成功导出到:\n{result['file_path']}")
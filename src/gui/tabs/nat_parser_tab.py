@@ -1,18 +1,178 @@
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QGroupBox,
                            QTextEdit, QPushButton, QButtonGroup, QRadioButton,
-                           QTableWidget, QTableWidgetItem, QHeaderView,
-                           QFileDialog, QMessageBox)
-from openpyxl import Workbook
-from openpyxl.styles import PatternFill, Font, Alignment
+                           QTableView, QHeaderView, QAbstractItemView, QLabel,
+                           QProgressBar, QFileDialog, QMessageBox, QTabWidget)
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex
 import os
+import time
 
+from src.utils.async_utils import AsyncTaskManager
+from src.utils.logger import logger
+from src.utils.nat_conflict import describe_rule, find_conflicts
+from src.utils.nat_parallel import parse_config_dir
 from src.utils.nat_parser import NATParser
+from src.utils.table_export import ExportSheet, export_tables
+
+# 读取配置文件时每隔多少行报告一次进度并检查取消
+PROGRESS_INTERVAL = 65536
+
+
+class NatResultModel(QAbstractTableModel):
+    """
+    NAT解析结果表模型
+
+    解析成功的条目在前，解析失败的命令在后；单元格文本在视图请求时生成，
+    大型配置文件的结果无需逐个创建表格项。
+    """
+
+    # 各设备类型显示的列：(表头, 字段)，字段为元组时取第一个存在的字段
+    COLUMNS = {
+        "huawei": [("名称", 'name'), ("协议", 'protocol'), ("全局IP", 'global_ip'),
+                   ("全局端口", 'global_port'), ("内部IP", 'inside_ip'), ("内部端口", 'inside_port')],
+        "h3c": [("名称", 'rule'), ("协议", 'protocol'), ("全局IP", 'global_ip'),
+                ("全局端口", 'global_port'), ("内部IP", 'inside_ip'), ("内部端口", 'inside_port'),
+                ("VRRP", 'vrrp'), ("描述", 'description')],
+        # 批量解析目录时华为与H3C的记录显示在同一表格中
+        "batch": [("设备", 'device'), ("名称", ('name', 'rule')), ("协议", 'protocol'),
+                  ("全局IP", 'global_ip'), ("全局端口", 'global_port'), ("内部IP", 'inside_ip'),
+                  ("内部端口", 'inside_port'), ("VRRP", 'vrrp'), ("描述", 'description')],
+    }
+
+    @staticmethod
+    def field_value(item, key):
+        """取记录的字段值，缺少时为 '-'"""
+        if isinstance(key, tuple):
+            return next((item[k] for k in key if k in item), '-')
+        return item.get(key, '-')
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._columns = self.COLUMNS["huawei"]
+        self._data = []
+        self._failed = []
+
+    def set_results(self, device_type, data, failed_entries):
+        """
+        设置显示的数据
+
+        Args:
+            device_type: 设备类型（huawei/h3c/batch），决定显示的列
+            data: 解析成功的条目
+            failed_entries: 解析失败的命令
+        """
+        self.beginResetModel()
+        self._columns = self.COLUMNS.get(device_type, self.COLUMNS["huawei"])
+        self._data = data
+        self._failed = failed_entries
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._data) + len(self._failed)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._columns)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+        if orientation == Qt.Orientation.Horizontal:
+            return self._columns[section][0]
+        return str(section + 1)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or role != Qt.ItemDataRole.DisplayRole:
+            return None
+        row, column = index.row(), index.column()
+        if row < len(self._data):
+            return str(self.field_value(self._data[row], self._columns[column][1]))
+        # 解析失败的条目显示在表格底部
+        if column == 0:
+            return "解析失败"
+        if column == 1:
+            return self._failed[row - len(self._data)]
+        return None
+
+
+class ConflictModel(QAbstractTableModel):
+    """冲突检查结果表模型"""
+
+    HEADERS = ['类型', '设备', '地址', '协议', '端口', '规则数', '涉及规则']
+    # 涉及规则列最多显示的规则数
+    MAX_RULES_SHOWN = 10
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._conflicts = []
+        self._data = []
+
+    def set_results(self, conflicts, data):
+        """
+        设置冲突列表
+
+        Args:
+            conflicts: find_conflicts 的结果
+            data: 冲突中规则下标对应的解析结果
+        """
+        self.beginResetModel()
+        self._conflicts = conflicts
+        self._data = data
+        self.endResetModel()
+
+    @staticmethod
+    def summary_values(conflict):
+        """冲突除涉及规则外各列的取值"""
+        return [conflict.kind_name, conflict.device, conflict.ip, conflict.protocol,
+                conflict.ports, len(conflict.rules)]
+
+    @staticmethod
+    def rule_lines(conflict, data, max_rules=None):
+        """涉及规则的摘要列表，max_rules 限制列出的规则数"""
+        rules = conflict.rules if max_rules is None else conflict.rules[:max_rules]
+        lines = [describe_rule(data[rule]) for rule in rules]
+        if len(rules) < len(conflict.rules):
+            lines.append(f"等 {len(conflict.rules)} 条")
+        return lines
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._conflicts)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+        if orientation == Qt.Orientation.Horizontal:
+            return self.HEADERS[section]
+        return str(section + 1)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        conflict = self._conflicts[index.row()]
+        column = index.column()
+        if role == Qt.ItemDataRole.DisplayRole:
+            if column == 6:
+                return '; '.join(self.rule_lines(conflict, self._data, self.MAX_RULES_SHOWN))
+            return str(self.summary_values(conflict)[column])
+        if role == Qt.ItemDataRole.ToolTipRole and column == 6:
+            # 悬停时列出全部规则
+            return '\n'.join(self.rule_lines(conflict, self._data))
+        return None
+
+
 class NatParserTab(QWidget):
     def __init__(self):
         super().__init__()
         self.current_data = []
         self.failed_entries = []
         self.current_device_type = None
+        self.conflicts = []
+        # 当前解析的配置文件，为None时解析输入框中的文本
+        self.config_file = None
+        # 当前批量解析的配置目录，各文件的厂商自动识别
+        self.config_dir = None
+        self.task_manager = AsyncTaskManager()
         self.setup_ui()
 
     def setup_ui(self):
@@ -44,9 +204,28 @@ class NatParserTab(QWidget):
         # 创建输入区域
         input_group = QGroupBox("NAT Server配置")
         input_layout = QVBoxLayout()
+
+        # 大型配置文件直接从磁盘逐行解析，不载入输入框
+        file_layout = QHBoxLayout()
+        open_button = QPushButton("打开配置文件")
+        open_button.clicked.connect(self.open_config_file)
+        file_layout.addWidget(open_button)
+        open_dir_button = QPushButton("批量解析目录")
+        open_dir_button.setToolTip("自动识别目录中各配置文件的厂商，使用多个CPU核心并行解析")
+        open_dir_button.clicked.connect(self.open_config_dir)
+        file_layout.addWidget(open_dir_button)
+        self.file_label = QLabel()
+        file_layout.addWidget(self.file_label, 1)
+        input_layout.addLayout(file_layout)
+
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setRange(0, 100)
+        self.progress_bar.setVisible(False)
+        input_layout.addWidget(self.progress_bar)
+
         self.nat_input = QTextEdit()
-        self.nat_input.setPlaceholderText("在此粘贴NAT Server配置命令...")
-        self.nat_input.textChanged.connect(self.parse_nat_config)
+        self.nat_input.setPlaceholderText("在此粘贴NAT Server配置命令，或打开配置文件...")
+        self.nat_input.textChanged.connect(self.on_text_changed)
         input_layout.addWidget(self.nat_input)
         input_group.setLayout(input_layout)
         layout.addWidget(input_group)
@@ -55,158 +234,337 @@ class NatParserTab(QWidget):
         result_group = QGroupBox("解析结果")
         result_layout = QVBoxLayout()
 
-        # 添加导出按钮
-        export_button = QPushButton("导出到Excel")
-        export_button.clicked.connect(self.export_to_excel)
-        result_layout.addWidget(export_button)
+        # 添加导出按钮，导出在后台进行
+        export_layout = QHBoxLayout()
+        self.export_button = QPushButton("导出到Excel")
+        self.export_button.clicked.connect(self.export_to_excel)
+        export_layout.addWidget(self.export_button)
+        self.export_progress = QProgressBar()
+        self.export_progress.setRange(0, 100)
+        self.export_progress.setVisible(False)
+        export_layout.addWidget(self.export_progress, 1)
+        result_layout.addLayout(export_layout)
+
+        # 解析结果与冲突检查分两页显示
+        self.result_tabs = QTabWidget()
 
         # 创建结果表格
-        self.result_table = QTableWidget()
+        self.model = NatResultModel(self)
+        self.result_table = QTableView()
+        self.result_table.setModel(self.model)
         self.result_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
         self.result_table.verticalHeader().setVisible(False)
-        self.result_table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.result_table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        self.result_table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
         self.result_table.setAlternatingRowColors(True)
-        result_layout.addWidget(self.result_table)
+        self.result_tabs.addTab(self.result_table, "映射表")
+
+        self.conflict_model = ConflictModel(self)
+        self.conflict_table = QTableView()
+        self.conflict_table.setModel(self.conflict_model)
+        header = self.conflict_table.horizontalHeader()
+        header.setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
+        header.setStretchLastSection(True)
+        self.conflict_table.verticalHeader().setVisible(False)
+        self.conflict_table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        self.conflict_table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.conflict_table.setAlternatingRowColors(True)
+        self.result_tabs.addTab(self.conflict_table, "冲突检查")
+
+        result_layout.addWidget(self.result_tabs)
 
         result_group.setLayout(result_layout)
         layout.addWidget(result_group)
 
+    def on_text_changed(self):
+        """输入框内容变化时改为解析输入的文本"""
+        if self.config_file is not None or self.config_dir is not None:
+            self.task_manager.stop_task("nat_file")
+            self.progress_bar.setVisible(False)
+            self.config_file = None
+            self.config_dir = None
+            self.file_label.clear()
+        self.parse_nat_config()
+
     def parse_nat_config(self):
         """解析NAT配置并显示结果"""
+        if self.config_dir is not None:
+            # 批量解析时厂商自动识别，与设备类型选择无关
+            return
+        self.current_device_type = "huawei" if self.huawei_radio.isChecked() else "h3c"
+        if self.config_file is not None:
+            self.parse_config_file(self.config_file)
+            return
+
         text = self.nat_input.toPlainText()
         if not text.strip():
-            self.result_table.setRowCount(0)
             self.current_data = []
             self.failed_entries = []
             self.current_device_type = None
+            self.display_results([], [], [])
             return
 
-        self.current_device_type = "huawei" if self.huawei_radio.isChecked() else "h3c"
         data, failed_entries = NATParser.parse_config(text, self.current_device_type)
 
         self.current_data = data
         self.failed_entries = failed_entries
         self.display_results(data, failed_entries)
 
-    def display_results(self, data, failed_entries):
-        """显示解析结果"""
-        # 根据设备类型设置表头
-        if self.current_device_type == "huawei":
-            headers = ["名称", "协议", "全局IP", "全局端口", "内部IP", "内部端口"]
-            keys = ['name', 'protocol', 'global_ip', 'global_port', 'inside_ip', 'inside_port']
-        else:  # h3c
-            headers = ["名称", "协议", "全局IP", "全局端口", "内部IP", "内部端口", "VRRP", "描述"]
-            keys = ['rule', 'protocol', 'global_ip', 'global_port', 'inside_ip', 'inside_port', 'vrrp', 'description']
-
-        self.result_table.setColumnCount(len(headers))
-        self.result_table.setHorizontalHeaderLabels(headers)
-
-        # 显示数据
-        if data:
-            self.result_table.setRowCount(len(data))
-            for row, item in enumerate(data):
-                # 显示所有字段
-                for col, key in enumerate(keys):
-                    self.result_table.setItem(row, col, QTableWidgetItem(str(item.get(key, '-'))))
-        else:
-            self.result_table.setRowCount(0)
-
-        # 如果有解析失败的条目，添加到表格底部
-        if failed_entries:
-            start_row = self.result_table.rowCount()
-            self.result_table.setRowCount(start_row + len(failed_entries))
-            for i, entry in enumerate(failed_entries, start_row):
-                self.result_table.setItem(i, 0, QTableWidgetItem("解析失败"))
-                self.result_table.setItem(i, 1, QTableWidgetItem(entry))
+    def open_config_file(self):
+        """选择配置文件并在后台逐行解析"""
+        file_path, _ = QFileDialog.getOpenFileName(
+            self,
+            "打开配置文件",
+            "",
+            "Config Files (*.cfg *.txt *.conf *.log);;All Files (*.*)"
+        )
+        if not file_path:
+            return
+
+        # 清空输入框，之后的解析以文件为准
+        self.nat_input.blockSignals(True)
+        self.nat_input.clear()
+        self.nat_input.blockSignals(False)
+
+        self.config_file = file_path
+        self.config_dir = None
+        self.parse_nat_config()
+
+    def open_config_dir(self):
+        """选择配置目录并在多个进程中批量解析"""
+        directory = QFileDialog.getExistingDirectory(self, "选择配置文件目录")
+        if not directory:
+            return
+
+        self.nat_input.blockSignals(True)
+        self.nat_input.clear()
+        self.nat_input.blockSignals(False)
+
+        self.config_file = None
+        self.config_dir = directory
+        self.file_label.setText(f"正在解析: {directory}")
+        self.progress_bar.setValue(0)
+        self.progress_bar.setVisible(True)
+        self.task_manager.run_progress_task(
+            "nat_file",
+            self.parse_config_dir_task,
+            self.handle_dir_result,
+            self.handle_file_progress,
+            directory
+        )
+
+    @staticmethod
+    def parse_config_dir_task(task, directory):
+        """在后台线程中调度多进程解析，进度换算为百分比"""
+        def report_progress(progress):
+            task.report_progress(progress['offset'] * 100 // max(progress['total'], 1))
+
+        start_time = time.perf_counter()
+        result = parse_config_dir(
+            directory,
+            os.cpu_count() or 1,
+            progress_callback=report_progress,
+            is_cancelled=task.is_cancelled
+        )
+        result['directory'] = directory
+        result['elapsed'] = time.perf_counter() - start_time
+        result['conflicts'] = find_conflicts(result['data'])
+        logger.info(
+            f"NAT配置批量解析{'已取消' if result['cancelled'] else '完成'}: {directory}，"
+            f"{len(result['files'])} 个文件，跳过 {len(result['errors'])} 个，{len(result['data'])} 条记录，"
+            f"耗时 {result['elapsed']:.2f}s"
+        )
+        return result
+
+    def parse_config_file(self, file_path):
+        """在后台任务中解析配置文件"""
+        self.file_label.setText(f"正在解析: {file_path}")
+        self.progress_bar.setValue(0)
+        self.progress_bar.setVisible(True)
+        self.task_manager.run_progress_task(
+            "nat_file",
+            self.parse_config_file_task,
+            self.handle_file_result,
+            self.handle_file_progress,
+            file_path,
+            self.current_device_type
+        )
+
+    @staticmethod
+    def parse_config_file_task(task, file_path, device_type):
+        """
+        在后台线程中逐行读取并解析配置文件
+
+        Returns:
+            dict: 解析成功的条目、失败的命令、文件路径以及是否被取消
+        """
+        size = os.path.getsize(file_path) or 1
+
+        def read_lines(f):
+            """逐行读取文件，定期报告进度并检查取消"""
+            read = 0
+            for count, line in enumerate(f, 1):
+                read += len(line)
+                if count % PROGRESS_INTERVAL == 0:
+                    if task.is_cancelled():
+                        return
+                    task.report_progress(read * 100 // size)
+                yield line
+
+        data = []
+        failed_entries = []
+        with open(file_path, 'rb') as f:
+            for parsed, line in NATParser.iter_config(read_lines(f), device_type):
+                if parsed:
+                    data.append(parsed)
+                else:
+                    failed_entries.append(line)
+
+        return {
+            "data": data,
+            "failed_entries": failed_entries,
+            "file_path": file_path,
+            "device_type": device_type,
+            "conflicts": find_conflicts(data),
+            "cancelled": task.is_cancelled()
+        }
+
+    def handle_file_progress(self, percent):
+        """更新文件解析进度"""
+        self.progress_bar.setValue(percent)
+
+    def handle_file_result(self, result, error):
+        """显示配置文件的解析结果"""
+        self.progress_bar.setVisible(False)
+        if error:
+            self.file_label.setText(f"解析失败: {error}")
+            return
+        if result["cancelled"]:
+            return
+
+        self.current_data = result["data"]
+        self.failed_entries = result["failed_entries"]
+        self.current_device_type = result["device_type"]
+        self.file_label.setText(
+            f"{result['file_path']}（解析成功 {len(self.current_data):,} 条，"
+            f"失败 {len(self.failed_entries):,} 条）"
+        )
+        self.display_results(self.current_data, self.failed_entries, result["conflicts"])
+
+    def handle_dir_result(self, result, error):
+        """显示目录批量解析的结果"""
+        self.progress_bar.setVisible(False)
+        if error:
+            self.file_label.setText(f"解析失败: {error}")
+            return
+        if result["cancelled"]:
+            return
+
+        self.current_device_type = "batch"
+        self.current_data = result["data"]
+        # 失败条目标注来源设备，跳过的文件列在最前
+        self.failed_entries = [f"[{path}] 无法读取，已跳过: {error}" for path, error in result["errors"]]
+        self.failed_entries.extend(f"[{device}] {line}" for device, line in result["failed_entries"])
+
+        vendors = [device_type for _, device_type, _ in result["files"]]
+        skipped = f"，跳过 {len(result['errors'])}" if result["errors"] else ""
+        self.file_label.setText(
+            f"{result['directory']}（{len(vendors)} 个文件：华为 {vendors.count('huawei')}，"
+            f"H3C {vendors.count('h3c')}，无NAT配置 {vendors.count(None)}{skipped}；"
+            f"解析成功 {len(self.current_data):,} 条，失败 {len(result['failed_entries']):,} 条，"
+            f"耗时 {result['elapsed']:.1f}s）"
+        )
+        self.display_results(self.current_data, self.failed_entries, result["conflicts"])
+
+    def display_results(self, data, failed_entries, conflicts=None):
+        """显示解析结果与冲突检查结果，未提供冲突列表时现场检查"""
+        if conflicts is None:
+            conflicts = find_conflicts(data)
+        self.conflicts = conflicts
+        self.model.set_results(self.current_device_type, data, failed_entries)
+        self.conflict_model.set_results(conflicts, data)
+        # 只有批量解析时才区分设备
+        self.conflict_table.setColumnHidden(1, self.current_device_type != "batch")
+        self.result_tabs.setTabText(1, f"冲突检查 ({len(conflicts)})" if conflicts else "冲突检查")
 
     def export_to_excel(self):
-        """导出数据到Excel文件"""
+        """导出数据到Excel或CSV文件"""
         if not self.current_data and not self.failed_entries:
             QMessageBox.warning(self, "导出警告", "没有可导出的数据！")
             return
 
         # 获取保存路径
         default_path = os.path.join(os.path.expanduser("~"), "Desktop", "映射表.xlsx")
-        file_path, _ = QFileDialog.getSaveFileName(
+        file_path, selected_filter = QFileDialog.getSaveFileName(
             self,
-            "保存Excel文件",
+            "保存文件",
             default_path,
-            "Excel Files (*.xlsx)"
+            "Excel Files (*.xlsx);;CSV Files (*.csv);;Text Files (*.txt)"
         )
 
         if not file_path:
             return
+        if not os.path.splitext(file_path)[1]:
+            file_path += selected_filter[selected_filter.rfind('*') + 1:-1] or '.xlsx'
+
+        self.export_button.setEnabled(False)
+        self.export_progress.setValue(0)
+        self.export_progress.setVisible(True)
+        self.task_manager.run_progress_task(
+            "nat_export",
+            self.export_task,
+            self.handle_export_result,
+            self.export_progress.setValue,
+            file_path,
+            self.current_device_type,
+            self.current_data,
+            self.failed_entries,
+            self.conflicts
+        )
 
-        try:
-            wb = Workbook()
-            ws = wb.active
-            ws.title = "NAT Server配置"
-
-            # 根据设备类型选择表头
-            if self.current_device_type == "huawei":
-                headers = ["名称", "协议", "全局IP", "全局端口", "内部IP", "内部端口", "原始命令"]
-                keys = ['name', 'protocol', 'global_ip', 'global_port', 'inside_ip', 'inside_port', 'command']
-            else:  # h3c
-                headers = ["名称", "协议", "全局IP", "全局端口", "内部IP", "内部端口", "VRRP", "描述", "原始命令"]
-                keys = ['rule', 'protocol', 'global_ip', 'global_port', 'inside_ip', 'inside_port', 'vrrp', 'description', 'command']
-
-            # 写入表头
-            for col, header in enumerate(headers, 1):
-                cell = ws.cell(row=1, column=col)
-                cell.value = header
-                cell.font = Font(bold=True)
-                cell.fill = PatternFill(start_color='E0E0E0', end_color='E0E0E0', fill_type='solid')
-                cell.alignment = Alignment(horizontal='center')
-
-            # 写入成功解析的数据
-            current_row = 2
-            for item in self.current_data:
-                for col, key in enumerate(keys, 1):
-                    cell = ws.cell(row=current_row, column=col)
-                    cell.value = item.get(key, '-')
-                    cell.alignment = Alignment(horizontal='left')
-                    if key == 'command':
-                        cell.alignment = Alignment(horizontal='left', wrap_text=True)
-                current_row += 1
-
-            # 写入解析失败的条目
-            if self.failed_entries:
-                # 添加一个空行
-                current_row += 1
-
-                # 添加"解析失败条目"标题行
-                cell = ws.cell(row=current_row, column=1)
-                cell.value = "解析失败条目："
-                cell.font = Font(bold=True)
-                cell.fill = PatternFill(start_color='FFE0E0', end_color='FFE0E0', fill_type='solid')
-                ws.merge_cells(start_row=current_row, start_column=1, end_row=current_row, end_column=len(headers))
-                current_row += 1
-
-                # 写入失败条目
-                for entry in self.failed_entries:
-                    cell = ws.cell(row=current_row, column=1)
-                    cell.value = entry
-                    ws.merge_cells(start_row=current_row, start_column=1, end_row=current_row, end_column=len(headers))
-                    cell.alignment = Alignment(horizontal='left')
-                    current_row += 1
-
-            # 调整列宽
-            for column in ws.columns:
-                max_length = 0
-                for cell in column:
-                    try:
-                        if len(str(cell.value)) > max_length:
-                            max_length = len(str(cell.value))
-                    except:
-                        pass
-                adjusted_width = min(max_length + 2, 50)
-                ws.column_dimensions[column[0].column_letter].width = adjusted_width
-
-            # 为原始命令列单独设置更大宽度
-            ws.column_dimensions[chr(ord('A') + len(headers) - 1)].width = 120
-
-            wb.save(file_path)
-            QMessageBox.information(self, "导出成功", f"数据已成功导出到:\n{file_path}")
-
-        except Exception as e:
-            QMessageBox.critical(self, "导出错误", f"导出过程中发生错误：\n{str(e)}")
+    @staticmethod
+    def export_task(task, file_path, device_type, data, failed_entries, conflicts):
+        """在后台线程中整理各列数据并流式写入文件"""
+        start_time = time.perf_counter()
+        columns = NatResultModel.COLUMNS.get(device_type, NatResultModel.COLUMNS["huawei"])
+        columns = columns + [("原始命令", 'command')]
+        field_value = NatResultModel.field_value
+        sheets = [ExportSheet(
+            title="NAT Server配置",
+            headers=[header for header, _ in columns],
+            columns=[[field_value(item, key) for item in data] for _, key in columns],
+            # 原始命令列固定宽度并自动换行
+            wrap_columns=(len(columns) - 1,),
+            widths={len(columns) - 1: 120},
+            appendix_title="解析失败条目：",
+            appendix=failed_entries
+        )]
+
+        if conflicts:
+            # 只有批量解析时才区分设备
+            indexes = [i for i in range(len(ConflictModel.HEADERS)) if i != 1 or device_type == "batch"]
+            rows = [ConflictModel.summary_values(conflict)
+                    + ['\n'.join(ConflictModel.rule_lines(conflict, data))] for conflict in conflicts]
+            sheets.append(ExportSheet(
+                title="冲突检查",
+                headers=[ConflictModel.HEADERS[i] for i in indexes],
+                columns=[[row[i] for row in rows] for i in indexes],
+                wrap_columns=(len(indexes) - 1,),
+                widths={len(indexes) - 1: 80}
+            ))
+
+        completed = export_tables(file_path, sheets, task.report_progress, task.is_cancelled)
+        logger.info(
+            f"NAT解析结果导出{'完成' if completed else '已取消'}: {file_path}，"
+            f"{len(data)} 条记录，耗时 {time.perf_counter() - start_time:.2f}s"
+        )
+        return {"file_path": file_path, "completed": completed}
+
+    def handle_export_result(self, result, error):
+        """导出完成后提示结果"""
+        self.export_button.setEnabled(True)
+        self.export_progress.setVisible(False)
+        if error:
+            QMessageBox.critical(self, "导出错误", f"导出过程中发生错误：\n{error}")
+        elif result["completed"]:
+            QMessageBox.information(self, "导出成功", f"数据已成功导出到:\n{result['file_path']}")
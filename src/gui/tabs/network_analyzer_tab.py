@@ -1,62 +1,134 @@
-from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QTableWidget, QTableWidgetItem, 
-                           QPushButton, QFileDialog, QLabel, QHBoxLayout, QLineEdit, QMessageBox, QHeaderView)
-from PyQt6.QtCore import Qt
-from warnings import filterwarnings
+from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QTableView, QAbstractItemView,
+                           QPushButton, QFileDialog, QLabel, QHBoxLayout, QLineEdit, QHeaderView,
+                           QProgressBar, QCheckBox)
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex, QTimer
 import os
-filterwarnings("ignore")
-from scapy.layers.inet import TCP, IP, UDP
-from scapy.all import *
-import re
-from netaddr import IPAddress
-
-class SortableTableWidgetItem(QTableWidgetItem):
-    """可排序的表格项"""
-    def __init__(self, value, sort_value=None):
-        super().__init__(str(value))
-        self._sort_value = sort_value if sort_value is not None else value
-        self.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-
-    def __lt__(self, other):
-        if isinstance(self._sort_value, tuple):  # IP:port tuple
-            return (self._sort_value[0], self._sort_value[1]) < (other._sort_value[0], other._sort_value[1])
-        return self._sort_value < other._sort_value
-
-def parse_ip_port(address):
-    """解析IP地址和端口"""
-    try:
-        if ':' not in address:
-            return (0, 0)
-        
-        ip, port = address.rsplit(':', 1)
-        return (int(IPAddress(ip)), int(port))
-    except:
-        return (0, 0)
 
-def parse_size(size_str):
-    """解析流量大小，统一转换为字节"""
+from src.utils.async_utils import AsyncTaskManager
+from src.utils.flow_search import FlowSearchIndex
+from src.utils.flow_table import FlowColumns
+from src.utils.pcap_analysis import analyze_pcap_file
+from src.utils.pcap_reader import format_endpoint
+
+def format_size(bytes_size):
+    """格式化字节大小显示"""
     try:
-        if isinstance(size_str, (int, float)):
-            return float(size_str)
-            
-        size_str = str(size_str).upper()
-        if 'GB' in size_str:
-            return float(size_str.replace('GB', '')) * 1024 * 1024 * 1024
-        elif 'MB' in size_str:
-            return float(size_str.replace('MB', '')) * 1024 * 1024
-        elif 'KB' in size_str:
-            return float(size_str.replace('KB', '')) * 1024
-        elif 'B' in size_str:
-            return float(size_str.replace('B', ''))
+        bytes_size = int(bytes_size)
+        if bytes_size >= 1024 * 1024 * 1024:
+            return f"{bytes_size/1024/1024/1024:.2f} GB"
+        elif bytes_size >= 1024 * 1024:
+            return f"{bytes_size/1024/1024:.2f} MB"
+        elif bytes_size >= 1024:
+            return f"{bytes_size/1024:.2f} KB"
         else:
-            return float(size_str)
+            return f"{bytes_size} B"
     except (ValueError, TypeError):
-        return 0
+        return "0 B"
+
+class FlowTableModel(QAbstractTableModel):
+    """
+    流量表模型
+
+    数据以列式数组存储，单元格文本仅在视图请求可见行时生成；
+    排序对预先计算好的整数/字符串键做下标排序，不创建单元格对象。
+    """
+
+    HEADERS = ['协议', '源地址', '目标地址', '标志位', '流量大小', '正向计数', '反向计数']
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._columns = FlowColumns()
+        self._rows = []  # 当前显示的行在列数组中的下标
+        self._sort_column = -1
+        self._sort_order = Qt.SortOrder.AscendingOrder
+
+    @property
+    def flow_columns(self):
+        """当前的列式数据"""
+        return self._columns
+
+    @property
+    def visible_rows(self):
+        """当前显示的行下标（已排序）"""
+        return self._rows
+
+    def set_flows(self, columns, rows=None):
+        """
+        设置显示的数据
+
+        Args:
+            columns: FlowColumns 列式数据
+            rows: 要显示的行下标，为None时显示全部
+        """
+        self.beginResetModel()
+        self._columns = columns
+        self._rows = list(range(len(columns))) if rows is None else list(rows)
+        self._apply_sort()
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+        if orientation == Qt.Orientation.Horizontal:
+            return self.HEADERS[section]
+        return str(section + 1)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.ItemDataRole.TextAlignmentRole:
+            return Qt.AlignmentFlag.AlignCenter
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+
+        row = self._rows[index.row()]
+        column = index.column()
+        columns = self._columns
+        if column == 0:
+            return columns.protocol[row]
+        if column == 1:
+            return format_endpoint(columns.src[row])
+        if column == 2:
+            return format_endpoint(columns.dst[row])
+        if column == 3:
+            return columns.flags[row]
+        if column == 4:
+            return format_size(columns.size[row])
+        if column == 5:
+            return str(columns.forward[row])
+        return str(columns.reverse[row])
+
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        """按列排序：地址按IP、端口数值，流量大小按字节数，计数按数值"""
+        self._sort_column = column
+        self._sort_order = order
+        self.beginResetModel()
+        self._apply_sort()
+        self.endResetModel()
+
+    def _apply_sort(self):
+        if not 0 <= self._sort_column < len(self.HEADERS):
+            return
+        columns = self._columns
+        keys = (columns.protocol, columns.src, columns.dst, columns.flags,
+                columns.size, columns.forward, columns.reverse)[self._sort_column]
+        self._rows.sort(key=keys.__getitem__,
+                        reverse=self._sort_order == Qt.SortOrder.DescendingOrder)
 
 class NetworkAnalyzerTab(QWidget):
     def __init__(self):
         super().__init__()
-        self.flows = []
-        self.summary = []
+        self.flows = None
+        self.summary = FlowColumns()
+        self.search_index = None
+        # 创建异步任务管理器
+        self.task_manager = AsyncTaskManager()
         self.initUI()
 
     def initUI(self):
@@ -74,15 +146,33 @@ class NetworkAnalyzerTab(QWidget):
         
         self.select_btn = QPushButton('选择文件')
         self.select_btn.clicked.connect(self.select_file)
+
+        self.stop_btn = QPushButton('停止分析')
+        self.stop_btn.setEnabled(False)
+        self.stop_btn.clicked.connect(self.stop_analysis)
+        
+        # 多进程分析，仅对较大的经典pcap文件生效
+        self.parallel_check = QCheckBox('多进程')
+        self.parallel_check.setToolTip('按记录边界切分较大的pcap文件，使用多个CPU核心并行分析')
+        self.parallel_check.setChecked((os.cpu_count() or 1) > 1)
         
         file_layout.addWidget(self.file_path)
         file_layout.addWidget(self.select_btn)
+        file_layout.addWidget(self.stop_btn)
+        file_layout.addWidget(self.parallel_check)
         
         # 搜索区域
         search_layout = QHBoxLayout()
         self.search_input = QLineEdit()
-        self.search_input.setPlaceholderText('输入搜索关键词...')
-        self.search_input.textChanged.connect(self.filter_results)
+        self.search_input.setPlaceholderText('输入搜索关键词，支持 port:443 ip:10.0.0.0/8 proto:udp')
+        self.search_input.textChanged.connect(self.schedule_filter)
+        self.search_input.returnPressed.connect(self.filter_results)
+        
+        # 输入停顿后再执行搜索
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(250)
+        self.search_timer.timeout.connect(self.filter_results)
         
         search_layout.addWidget(QLabel('搜索:'))
         search_layout.addWidget(self.search_input)
@@ -92,9 +182,16 @@ class NetworkAnalyzerTab(QWidget):
         top_layout.addLayout(search_layout, stretch=1)
         
         layout.addLayout(top_layout)
+
+        # 添加进度条
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setRange(0, 1000)
+        self.progress_bar.setVisible(False)
+        layout.addWidget(self.progress_bar)
         
         # 添加表格
-        self.table = QTableWidget()
+        self.table = QTableView()
+        self.model = FlowTableModel(self)
         self.setup_table()
         layout.addWidget(self.table)
         
@@ -106,11 +203,7 @@ class NetworkAnalyzerTab(QWidget):
 
     def setup_table(self):
         """设置表格"""
-        self.table.setColumnCount(7)
-        self.table.setHorizontalHeaderLabels([
-            '协议', '源地址', '目标地址', '标志位', 
-            '流量大小', '正向计数', '反向计数'
-        ])
+        self.table.setModel(self.model)
         
         # 启用排序
         self.table.setSortingEnabled(True)
@@ -118,10 +211,13 @@ class NetworkAnalyzerTab(QWidget):
         # 设置表头
         header = self.table.horizontalHeader()
         header.setSectionsClickable(True)
-        header.setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
+        header.setSectionResizeMode(QHeaderView.ResizeMode.Interactive)
+        # 列宽只按前若干行估算，避免大表格在每次排序时遍历全部单元格
+        header.setResizeContentsPrecision(200)
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
         
         # 设置选择模式
-        self.table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
         self.table.setAlternatingRowColors(True)
 
     def select_file(self):
@@ -133,173 +229,32 @@ class NetworkAnalyzerTab(QWidget):
             'PCAP files (*.pcap *.pcapng);;All files (*.*)'
         )
         if fname:
-            # 检查文件大小
-            file_size = os.path.getsize(fname) / (1024 * 1024)  # 转换为MB
-            if file_size > 100:  # 如果文件大于100MB
-                reply = QMessageBox.question(
-                    self, 
-                    '大文件警告',
-                    f'文件大小为 {file_size:.1f}MB，分析可能需要较长时间。是否继续？',
-                    QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
-                )
-                if reply == QMessageBox.StandardButton.No:
-                    return
-                
             self.file_path.setText(fname)
             self.analyze_pcap(fname)
 
-    def read_pcap(self, pcap):
-        """读取pcap文件"""
-        flows = list()
-        try:
-            packets = rdpcap(pcap)
-            for packet in packets:
-                if packet.haslayer(IP):
-                    if packet.haslayer(TCP):
-                        flows.append([
-                            "TCP", 
-                            f"{packet[IP].src}:{packet[TCP].sport}", 
-                            f"{packet[IP].dst}:{packet[TCP].dport}",
-                            packet.sprintf('%TCP.flags%'), 
-                            packet.sprintf('%IP.len%')
-                        ])
-                    elif packet.haslayer(UDP):
-                        flows.append([
-                            "UDP", 
-                            f"{packet[IP].src}:{packet[UDP].sport}", 
-                            f"{packet[IP].dst}:{packet[UDP].dport}",
-                            '--', 
-                            packet.sprintf('%IP.len%')
-                        ])
-            return flows
-        except Exception as e:
-            self.stats_label.setText(f'错误: {str(e)}')
-            return []
-
-    def reverse_socket(self, socket):
-        """反转源目标地址"""
-        return [socket[0], socket[2], socket[1], socket[3], socket[4]]
-
-    def increment_count(self, socket, flow_list, counter_position):
-        """增加计数"""
-        for sockets in range(len(flow_list)):
-            if (flow_list[sockets][0] == socket[0] and 
-                flow_list[sockets][1] == socket[1] and 
-                flow_list[sockets][2] == socket[2]):
-                if len(flow_list[sockets]) == counter_position - 1:
-                    flow_list[sockets].append(1)
-                elif len(flow_list[sockets]) >= counter_position:
-                    flow_list[sockets][counter_position - 1] += 1
-
-    def increment_size(self, socket, flow_list):
-        """增加流量大小"""
-        for sockets in range(len(flow_list)):
-            if (flow_list[sockets][0] == socket[0] and 
-                flow_list[sockets][1] == socket[1] and 
-                flow_list[sockets][2] == socket[2]):
-                flow_list[sockets][4] = int(flow_list[sockets][4]) + int(socket[4])
-
-    def add_tcp_flags(self, socket, flow_list):
-        """添加TCP标志位"""
-        for sockets in range(len(flow_list)):
-            if (flow_list[sockets][0] == socket[0] and 
-                flow_list[sockets][1] == socket[1] and 
-                flow_list[sockets][2] == socket[2]):
-                for flag in socket[3]:
-                    if flag not in flow_list[sockets][3]:
-                        flow_list[sockets][3] = flow_list[sockets][3] + flag
-
-    def summarize_packets(self, flows):
-        """汇总数据包信息"""
-        flows_with_count = list()
-        flows_without_count = list()
-        for flow in flows:
-            rsocket = self.reverse_socket(flow)
-            short_flow = [flow[0], flow[1], flow[2]]
-            reverse_short_flow = [flow[0], flow[2], flow[1]]
-            if short_flow not in flows_without_count:
-                if reverse_short_flow not in flows_without_count:
-                    forward_socket_with_count = flow.copy()
-                    forward_socket_with_count.append(1)
-                    flows_with_count.append(forward_socket_with_count)
-                    flows_without_count.append(short_flow)
-                else:
-                    self.increment_count(rsocket, flows_with_count, 7)
-                    self.increment_size(rsocket, flows_with_count)
-                    self.add_tcp_flags(rsocket, flows_with_count)
-            else:
-                self.increment_count(flow, flows_with_count, 6)
-                self.increment_size(flow, flows_with_count)
-                self.add_tcp_flags(flow, flows_with_count)
-        return flows_with_count
-
-    def format_size(self, bytes_size):
-        """格式化字节大小显示"""
-        try:
-            bytes_size = int(bytes_size)
-            if bytes_size >= 1024 * 1024 * 1024:
-                return f"{bytes_size/1024/1024/1024:.2f} GB"
-            elif bytes_size >= 1024 * 1024:
-                return f"{bytes_size/1024/1024:.2f} MB"
-            elif bytes_size >= 1024:
-                return f"{bytes_size/1024:.2f} KB"
-            else:
-                return f"{bytes_size} B"
-        except (ValueError, TypeError):
-            return "0 B"
-
-    def update_table(self, summary):
-        """更新表格显示"""
-        self.table.setSortingEnabled(False)
-        self.table.setRowCount(len(summary))
-        
-        for row, flow in enumerate(summary):
-            # 协议列
-            self.table.setItem(row, 0, SortableTableWidgetItem(flow[0]))
-            
-            # 源地址和目标地址列 - 使用netaddr进行IP排序
-            self.table.setItem(row, 1, 
-                SortableTableWidgetItem(flow[1], parse_ip_port(flow[1])))
-            self.table.setItem(row, 2, 
-                SortableTableWidgetItem(flow[2], parse_ip_port(flow[2])))
-            
-            # 标志位列
-            self.table.setItem(row, 3, SortableTableWidgetItem(flow[3]))
-            
-            # 流量大小列 - 转换为合适的单位显示，但保持字节数用于排序
-            try:
-                size = int(flow[4])
-                if size >= 1024 * 1024 * 1024:
-                    display_size = f"{size/1024/1024/1024:.2f} GB"
-                elif size >= 1024 * 1024:
-                    display_size = f"{size/1024/1024:.2f} MB"
-                elif size >= 1024:
-                    display_size = f"{size/1024:.2f} KB"
-                else:
-                    display_size = f"{size} B"
-                self.table.setItem(row, 4, 
-                    SortableTableWidgetItem(display_size, size))
-            except ValueError:
-                self.table.setItem(row, 4, 
-                    SortableTableWidgetItem(flow[4], 0))
-            
-            # 计数列
-            for col in [5, 6]:
-                if col < len(flow):
-                    self.table.setItem(row, col, 
-                        SortableTableWidgetItem(flow[col], int(flow[col])))
-                else:
-                    self.table.setItem(row, col, 
-                        SortableTableWidgetItem('0', 0))
-        
-        self.table.setSortingEnabled(True)
+    def update_table(self, summary, rows=None):
+        """
+        更新表格显示
+
+        Args:
+            summary: FlowColumns 列式数据
+            rows: 要显示的行下标，为None时显示全部
+        """
+        self.model.set_flows(summary, rows)
         self.table.resizeColumnsToContents()
         
         # 更新统计信息
-        total_flows = len(summary)
-        tcp_flows = sum(1 for flow in summary if flow[0] == 'TCP')
-        udp_flows = sum(1 for flow in summary if flow[0] == 'UDP')
-        total_bytes = sum(int(flow[4]) for flow in summary)
+        visible = self.model.visible_rows
+        total_flows = len(visible)
+        if rows is None:
+            tcp_flows = summary.protocol.count('TCP')
+            udp_flows = summary.protocol.count('UDP')
+            total_bytes = sum(summary.size)
+        else:
+            protocols = summary.protocol
+            tcp_flows = sum(1 for i in visible if protocols[i] == 'TCP')
+            udp_flows = total_flows - tcp_flows
+            total_bytes = sum(summary.size[i] for i in visible)
         
         # 计算百分比
         tcp_percent = (tcp_flows / total_flows * 100) if total_flows > 0 else 0
@@ -309,25 +264,92 @@ class NetworkAnalyzerTab(QWidget):
                 f'总流量数: {total_flows:,}\n'
                 f'TCP流量: {tcp_flows:,} ({tcp_percent:.1f}%)\n'
                 f'UDP流量: {udp_flows:,} ({udp_percent:.1f}%)\n'
-                f'总流量: {self.format_size(total_bytes)} ({total_bytes:,} bytes)')
+                f'总流量: {format_size(total_bytes)} ({total_bytes:,} bytes)')
         self.stats_label.setText(stats)
 
+    def schedule_filter(self):
+        """重新开始搜索计时"""
+        self.search_timer.start()
+
     def filter_results(self):
         """过滤搜索结果"""
-        search_text = self.search_input.text().lower()
+        self.search_timer.stop()
+        search_text = self.search_input.text().strip()
         if not search_text:
             self.update_table(self.summary)
             return
-            
-        filtered_summary = [
-            flow for flow in self.summary 
-            if any(search_text in str(item).lower() for item in flow)
-        ]
-        self.update_table(filtered_summary)
+
+        if self.search_index is None or self.search_index.columns is not self.summary:
+            self.search_index = FlowSearchIndex(self.summary)
+        self.update_table(self.summary, self.search_index.search(search_text))
 
     def analyze_pcap(self, pcap_file):
-        """分析pcap文件并显示结果"""
-        self.flows = self.read_pcap(pcap_file)
-        if self.flows:
-            self.summary = self.summarize_packets(self.flows)
-            self.update_table(self.summary)
\ No newline at end of file
+        """在后台线程中分析pcap文件，分析过程中定期显示部分结果"""
+        self.flows = None
+        self.summary = FlowColumns()
+        self.update_table(self.summary)
+
+        self.progress_bar.setValue(0)
+        self.progress_bar.setFormat('%p%')
+        self.progress_bar.setVisible(True)
+        self.stop_btn.setEnabled(True)
+        self.stats_label.setText('正在分析...')
+
+        self.task_manager.run_progress_task(
+            "pcap_analysis",
+            self.analyze_pcap_task,
+            self.handle_analysis_result,
+            self.handle_analysis_progress,
+            pcap_file,
+            workers=(os.cpu_count() or 1) if self.parallel_check.isChecked() else 1
+        )
+
+    def analyze_pcap_task(self, task, pcap_file, workers=1):
+        """在后台线程中执行pcap分析任务"""
+        return analyze_pcap_file(
+            pcap_file,
+            progress_callback=task.report_progress,
+            is_cancelled=task.is_cancelled,
+            workers=workers
+        )
+
+    def stop_analysis(self):
+        """停止分析，保留已汇总的结果"""
+        self.task_manager.cancel_task("pcap_analysis")
+        self.stop_btn.setEnabled(False)
+        self.stats_label.setText('正在停止...')
+
+    def handle_analysis_progress(self, progress):
+        """处理分析进度（在主线程中运行）"""
+        if progress['offset'] is None:
+            # scapy解析时无法获取字节偏移，显示为不确定进度
+            self.progress_bar.setRange(0, 0)
+        else:
+            self.progress_bar.setRange(0, 1000)
+            self.progress_bar.setValue(int(progress['offset'] * 1000 / max(progress['total'], 1)))
+
+        if 'columns' in progress:
+            self.summary = progress['columns']
+            self.filter_results()
+        if progress['packets'] is not None:
+            self.progress_bar.setFormat(f"已处理 {progress['packets']:,} 个数据包 (%p%)")
+
+    def handle_analysis_result(self, result, error):
+        """处理分析结果（在主线程中运行）"""
+        self.progress_bar.setVisible(False)
+        self.progress_bar.setRange(0, 1000)
+        self.stop_btn.setEnabled(False)
+
+        if error:
+            self.stats_label.setText(f'错误: {error}')
+            return
+
+        self.flows = result['flow_table']
+        self.summary = self.flows.to_columns()
+        self.filter_results()
+        if result['cancelled']:
+            if result['packets'] is None:
+                note = "\n分析已停止，显示已完成部分的汇总结果"
+            else:
+                note = f"\n分析已停止，显示前 {result['packets']:,} 个数据包的汇总结果"
+            self.stats_label.setText(self.stats_label.text() + note)
@@ -0,0 +1,293 @@
+from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QGroupBox, QTextEdit,
+                           QPushButton, QTableView, QAbstractItemView, QHeaderView,
+                           QLabel, QProgressBar, QFileDialog, QMessageBox, QSplitter)
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex
+import csv
+import os
+import socket
+import time
+
+try:
+    import numpy as np
+except ImportError:  # 未安装NumPy时 lookup_many 返回列表
+    np = None
+
+from ...utils.text_utils import TextUtils
+from ...utils.prefix_parser import parse_addresses
+from ...utils.route_lookup import RouteTable, parse_routing_table, NO_ROUTE
+from ...utils.async_utils import AsyncTaskManager
+from ...utils.logger import logger
+
+
+def format_address(address):
+    """IPv4地址整数转为点分十进制"""
+    return socket.inet_ntoa(int(address).to_bytes(4, 'big'))
+
+
+class LookupResultModel(QAbstractTableModel):
+    """
+    查询结果表模型
+
+    只保存地址数组和匹配的前缀组下标，单元格文本在视图请求时生成；
+    等价路由的各字段以逗号连接显示在同一行。
+    """
+
+    HEADERS = ['IP地址', '匹配路由', '协议', '优先级', '开销', '下一跳', '出接口']
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._table = None
+        self._addresses = []
+        self._groups = []
+
+    def set_results(self, table, addresses, groups):
+        """
+        设置查询结果
+
+        Args:
+            table: RouteTable 路由查询索引
+            addresses: 查询的地址序列
+            groups: 与地址一一对应的前缀组下标
+        """
+        self.beginResetModel()
+        self._table = table
+        self._addresses = addresses
+        self._groups = groups
+        self.endResetModel()
+
+    def clear(self):
+        self.set_results(None, [], [])
+
+    def row_values(self, row):
+        """第 row 行各列的文本"""
+        address = format_address(self._addresses[row])
+        group = int(self._groups[row])
+        if group == NO_ROUTE:
+            return [address, '无匹配路由', '', '', '', '', '']
+        routes = self._table.group_routes(group)
+        return [
+            address,
+            routes[0].prefix,
+            ', '.join(dict.fromkeys(route.protocol for route in routes)),
+            ', '.join(dict.fromkeys(route.preference for route in routes)),
+            ', '.join(dict.fromkeys(route.cost for route in routes)),
+            ', '.join(route.next_hop for route in routes),
+            ', '.join(route.interface for route in routes),
+        ]
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._addresses)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+        if orientation == Qt.Orientation.Horizontal:
+            return self.HEADERS[section]
+        return str(section + 1)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or role != Qt.ItemDataRole.DisplayRole:
+            return None
+        return self.row_values(index.row())[index.column()]
+
+
+class RouteLookupTab(QWidget):
+    def __init__(self):
+        super().__init__()
+        # 创建异步任务管理器
+        self.task_manager = AsyncTaskManager()
+        self.setup_ui()
+
+    def setup_ui(self):
+        """设置UI界面"""
+        layout = QVBoxLayout(self)
+
+        # 输入区域：左侧路由表，右侧待查询地址
+        splitter = QSplitter(Qt.Orientation.Horizontal)
+
+        table_group = QGroupBox("路由表")
+        table_layout = QVBoxLayout()
+        self.table_input = QTextEdit()
+        self.table_input.setPlaceholderText(
+            "粘贴 display ip routing-table 的输出，例如：\n"
+            "Destination/Mask    Proto   Pre  Cost      Flags NextHop         Interface\n"
+            "        0.0.0.0/0   Static  60   0          RD   10.1.1.2        GigabitEthernet0/0/1\n"
+            "     172.16.0.0/16  OSPF    10   2           D   10.1.1.3        Vlanif10\n"
+            "                    OSPF    10   2           D   10.1.1.4        Vlanif20"
+        )
+        self.table_input.setLineWrapMode(QTextEdit.LineWrapMode.NoWrap)
+        table_layout.addWidget(self.table_input)
+        table_group.setLayout(table_layout)
+        splitter.addWidget(table_group)
+
+        address_group = QGroupBox("查询地址")
+        address_layout = QVBoxLayout()
+        self.address_input = QTextEdit()
+        self.address_input.setPlaceholderText("每行一个IP地址，也可以用空格、逗号分隔")
+        address_layout.addWidget(self.address_input)
+        address_group.setLayout(address_layout)
+        splitter.addWidget(address_group)
+        splitter.setSizes([600, 300])
+        layout.addWidget(splitter)
+
+        # 按钮区域
+        button_layout = QHBoxLayout()
+        button_layout.addStretch()
+        self.lookup_button = QPushButton("查询")
+        self.lookup_button.setFixedWidth(80)
+        self.lookup_button.clicked.connect(self.lookup_routes)
+        button_layout.addWidget(self.lookup_button)
+        self.export_button = QPushButton("导出结果")
+        self.export_button.setFixedWidth(80)
+        self.export_button.setEnabled(False)
+        self.export_button.clicked.connect(self.export_results)
+        button_layout.addWidget(self.export_button)
+        layout.addLayout(button_layout)
+
+        # 结果区域
+        result_group = QGroupBox("查询结果")
+        result_layout = QVBoxLayout()
+
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setRange(0, 0)  # 设置为不确定模式
+        self.progress_bar.setVisible(False)
+        result_layout.addWidget(self.progress_bar)
+
+        self.stats_label = QLabel()
+        result_layout.addWidget(self.stats_label)
+
+        self.model = LookupResultModel(self)
+        self.result_table = QTableView()
+        self.result_table.setModel(self.model)
+        header = self.result_table.horizontalHeader()
+        header.setSectionResizeMode(QHeaderView.ResizeMode.Interactive)
+        header.setStretchLastSection(True)
+        # 列宽只按前若干行估算，避免大表格遍历全部单元格
+        header.setResizeContentsPrecision(200)
+        self.result_table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        self.result_table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.result_table.setAlternatingRowColors(True)
+        result_layout.addWidget(self.result_table)
+
+        result_group.setLayout(result_layout)
+        layout.addWidget(result_group, 1)
+
+    def lookup_routes(self):
+        """解析路由表并批量查询输入的地址"""
+        # 停止任何正在运行的任务
+        self.task_manager.stop_all_tasks()
+
+        table_text = self.table_input.toPlainText()
+        address_text = self.address_input.toPlainText()
+        if not table_text.strip() or not address_text.strip():
+            self.clear_results()
+            return
+
+        self.progress_bar.setVisible(True)
+        self.lookup_button.setEnabled(False)
+        self.export_button.setEnabled(False)
+        self.stats_label.setText("正在处理...")
+
+        self.task_manager.run_task(
+            "route_lookup",
+            self.lookup_routes_task,
+            self.handle_lookup_result,
+            table_text,
+            address_text
+        )
+
+    def lookup_routes_task(self, table_text, address_text):
+        """在后台线程中解析路由表并执行最长前缀匹配"""
+        routes = parse_routing_table(table_text)
+        if not routes:
+            raise ValueError("未识别到路由条目，请粘贴 display ip routing-table 的输出")
+        table = RouteTable(routes)
+
+        addresses, failed = parse_addresses(TextUtils.split_text(address_text))
+
+        start = time.perf_counter()
+        groups = table.lookup_many(addresses)
+        elapsed = time.perf_counter() - start
+        if isinstance(groups, list):
+            unmatched = groups.count(NO_ROUTE)
+        else:
+            unmatched = int(np.count_nonzero(groups == NO_ROUTE))
+        logger.info(f"路由查询完成，路由数: {len(routes)}，地址数: {len(addresses)}，耗时: {elapsed:.3f}s")
+
+        return {
+            "table": table,
+            "addresses": addresses,
+            "groups": groups,
+            "failed": failed,
+            "unmatched": unmatched,
+            "elapsed": elapsed
+        }
+
+    def handle_lookup_result(self, result, error):
+        """处理查询结果"""
+        self.progress_bar.setVisible(False)
+        self.lookup_button.setEnabled(True)
+
+        if error:
+            self.show_error(f"查询错误: {error}")
+            return
+
+        table = result["table"]
+        groups = result["groups"]
+        self.model.set_results(table, result["addresses"], groups)
+        self.result_table.resizeColumnsToContents()
+        self.export_button.setEnabled(len(groups) > 0)
+
+        stats = (
+            f"路由条目: {len(table.routes):,}（{len(table):,} 个目的网段） | "
+            f"查询地址: {len(groups):,} | 无匹配: {result['unmatched']:,} | "
+            f"查询耗时: {result['elapsed'] * 1000:.1f} ms"
+        )
+        failed = result["failed"]
+        if failed:
+            preview = ", ".join(entry for entry, _ in failed[:5])
+            more = " 等" if len(failed) > 5 else ""
+            stats += f"\n以下 {len(failed)} 个条目不是有效的IP地址，已忽略: {preview}{more}"
+        self.stats_label.setText(stats)
+
+    def export_results(self):
+        """导出查询结果到CSV文件"""
+        if not self.model.rowCount():
+            QMessageBox.warning(self, "导出警告", "没有可导出的数据！")
+            return
+
+        default_path = os.path.join(os.path.expanduser("~"), "Desktop", "路由查询结果.csv")
+        file_path, _ = QFileDialog.getSaveFileName(
+            self,
+            "保存CSV文件",
+            default_path,
+            "CSV Files (*.csv)"
+        )
+        if not file_path:
+            return
+
+        try:
+            # 使用带BOM的UTF-8，Excel可直接打开中文内容
+            with open(file_path, 'w', newline='', encoding='utf-8-sig') as f:
+                writer = csv.writer(f)
+                writer.writerow(LookupResultModel.HEADERS)
+                writer.writerows(self.model.row_values(row) for row in range(self.model.rowCount()))
+            QMessageBox.information(self, "导出成功", f"数据已成功导出到：\n{file_path}")
+        except Exception as e:
+            logger.error(f"导出路由查询结果失败: {str(e)}")
+            QMessageBox.critical(self, "导出错误", f"导出过程中发生错误：\n{str(e)}")
+
+    def clear_results(self):
+        """清空结果显示"""
+        self.stats_label.clear()
+        self.model.clear()
+        self.export_button.setEnabled(False)
+
+    def show_error(self, message):
+        """显示错误信息"""
+        self.stats_label.setText(f"错误: {message}")
+        self.model.clear()
+        self.export_button.setEnabled(False)
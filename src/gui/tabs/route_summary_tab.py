@@ -1,9 +1,10 @@
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QGroupBox,
                            QTextEdit, QPushButton, QTableWidget, QTableWidgetItem,
                            QHeaderView, QLabel, QRadioButton, QButtonGroup,
-                           QProgressBar, QMessageBox)
-from netaddr import IPRange, IPNetwork, IPAddress, cidr_merge
+                           QProgressBar, QSpinBox)
 from ...utils.text_utils import TextUtils
+from ...utils.prefix_parser import parse_prefixes
+from ...utils.route_summary import IPV6_BITS, summarize_ranges, summarize_with_budget
 from ...utils.async_utils import AsyncTaskManager
 from ...utils.logger import logger
 from PyQt6.QtCore import Qt
@@ -36,6 +37,16 @@ class RouteSummaryTab(QWidget):
 
         mode_layout.addWidget(self.exact_mode)
         mode_layout.addWidget(self.inexact_mode)
+
+        # 非精确汇总允许输出的最大路由条目数
+        mode_layout.addWidget(QLabel("最大路由条目数:"))
+        self.max_routes_input = QSpinBox()
+        self.max_routes_input.setRange(1, 100000)
+        self.max_routes_input.setValue(1)
+        self.max_routes_input.setToolTip("非精确汇总时每个地址族（IPv4/IPv6）最多输出的路由条目数，在此范围内使额外包含的IP最少")
+        self.max_routes_input.setEnabled(False)
+        self.inexact_mode.toggled.connect(self.max_routes_input.setEnabled)
+        mode_layout.addWidget(self.max_routes_input)
         mode_layout.addStretch()
         self.summary_button = QPushButton("汇总")
         self.summary_button.setFixedWidth(80)  # 设置固定宽度
@@ -91,23 +102,6 @@ class RouteSummaryTab(QWidget):
 
     def perform_exact_summary(self, networks):
         """执行精确汇总"""
-        # 检查IP范围大小
-        total_ips = self.count_total_ips(networks)
-
-        # 如果IP数量超过100万，显示警告
-        if total_ips > 1000000:
-            reply = QMessageBox.warning(
-                self,
-                "大范围警告",
-                f"您输入的IP范围包含超过 {total_ips:,} 个IP地址，处理可能需要较长时间。\n\n"
-                f"建议使用非精确汇总模式处理大范围IP。\n\n"
-                f"是否继续?",
-                QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
-                QMessageBox.StandardButton.No
-            )
-            if reply == QMessageBox.StandardButton.No:
-                return
-
         # 显示进度条
         self.progress_bar.setVisible(True)
         self.stats_label.setText("正在处理...")
@@ -120,53 +114,28 @@ class RouteSummaryTab(QWidget):
             networks
         )
 
-    def count_total_ips(self, networks):
-        """计算网络列表中的总IP数量"""
-        total = 0
-        for net in networks:
-            if isinstance(net, IPRange):
-                total += net.last - net.first + 1
-            else:
-                total += net.size
-        return total
-
     def perform_exact_summary_task(self, networks):
         """在后台线程中执行精确汇总任务"""
         logger.info(f"开始精确汇总，网络数量: {len(networks)}")
 
-        # 优化的精确汇总算法
-        original_inputs = []
-        ip_networks = []
-        total_original_ips = 0
-
-        # 第一步：将所有网络转换为CIDR块
-        for net in networks:
-            if isinstance(net, IPRange):
-                # 计算IP数量
-                ip_count = net.last - net.first + 1
-                total_original_ips += ip_count
-                range_str = f"{IPAddress(net.first)}-{IPAddress(net.last)}"
-                original_inputs.append(range_str)
-
-                # 使用cidr_merge直接将IPRange转换为最优CIDR块集合
-                # 这比逐个IP转换效率高得多
-                cidrs = net.cidrs()
-                ip_networks.extend(cidrs)
-
-            else:  # 已经是IPNetwork
-                total_original_ips += net.size
-                original_inputs.append(str(net))
-                ip_networks.append(net)
-
-        # 第二步：合并CIDR块
-        summarized = cidr_merge(ip_networks)
-        logger.info(f"精确汇总完成，原始IP数量: {total_original_ips}，汇总后条目数: {len(summarized)}")
+        # IPv4与IPv6分别排序合并起始/结束地址区间，并按位运算生成最少的CIDR块
+        summarized = []
+        families = []
+        for bits, starts, ends in networks.families():
+            blocks = summarize_ranges(starts, ends, bits)
+            version = 6 if bits == IPV6_BITS else 4
+            families.append({
+                "version": version,
+                "total_original_ips": networks.total_addresses(version),
+                "routes": len(blocks)
+            })
+            summarized.extend(blocks)
+        logger.info(f"精确汇总完成，汇总后条目数: {len(summarized)}")
 
         # 返回结果
         return {
             "summarized": summarized,
-            "total_original_ips": total_original_ips,
-            "original_inputs": original_inputs
+            "families": families
         }
 
     def handle_summary_result(self, result, error):
@@ -181,28 +150,32 @@ class RouteSummaryTab(QWidget):
         try:
             # 获取结果数据
             summarized = result["summarized"]
-            total_original_ips = result["total_original_ips"]
 
             # 检查是否是非精确汇总的结果
-            is_inexact = "extra_ips" in result
-
-            # 更新统计信息
-            if is_inexact:
-                total_summarized_ips = result["total_summarized_ips"]
-                extra_ips = result["extra_ips"]
-                extra_percent = (extra_ips / total_original_ips * 100) if total_original_ips > 0 else 0
-
-                self.stats_label.setText(
-                    f"原始IP数量: {total_original_ips:,} | "
-                    f"汇总后IP数量: {total_summarized_ips:,} | "
-                    f"额外包含IP数量: {extra_ips:,} ({extra_percent:.2f}%) | "
-                    f"汇总后路由条目数: {len(summarized)}"
-                )
-            else:
-                self.stats_label.setText(
-                    f"原始IP数量: {total_original_ips:,} | "
-                    f"汇总后路由条目数: {len(summarized)}"
-                )
+            is_inexact = "extra_per_prefix" in result
+
+            # 更新统计信息，同时包含IPv4与IPv6时分别显示
+            families = result["families"]
+            lines = []
+            for family in families:
+                total_original_ips = family["total_original_ips"]
+                prefix = f"IPv{family['version']} " if len(families) > 1 else ""
+                if is_inexact:
+                    total_summarized_ips = family["total_summarized_ips"]
+                    extra_ips = family["extra_ips"]
+                    extra_percent = (extra_ips / total_original_ips * 100) if total_original_ips > 0 else 0
+                    lines.append(
+                        f"{prefix}原始IP数量: {total_original_ips:,} | "
+                        f"汇总后IP数量: {total_summarized_ips:,} | "
+                        f"额外包含IP数量: {extra_ips:,} ({extra_percent:.2f}%) | "
+                        f"汇总后路由条目数: {family['routes']}"
+                    )
+                else:
+                    lines.append(
+                        f"{prefix}原始IP数量: {total_original_ips:,} | "
+                        f"汇总后路由条目数: {family['routes']}"
+                    )
+            self.stats_label.setText("\n".join(lines))
 
             # 更新结果表格
             self.result_table.setRowCount(len(summarized))
@@ -211,11 +184,13 @@ class RouteSummaryTab(QWidget):
                 self.result_table.setItem(i, 0, summary_item)
 
                 # 信息显示
-                if is_inexact and len(summarized) == 1:
-                    # 非精确汇总且只有一个结果时，显示额外包含的IP信息
-                    extra_percent = (extra_ips / total_original_ips * 100) if total_original_ips > 0 else 0
+                network_extra = result["extra_per_prefix"][i] if is_inexact else 0
+                if network_extra:
+                    # 非精确汇总的网段，显示额外包含的IP信息（占该网段原始IP数量的百分比）
+                    original_ips = network.size - network_extra
+                    extra_percent = network_extra / original_ips * 100
                     info = (f"包含 {network.size:,} 个IP地址 "
-                           f"(额外包含 {extra_ips:,} 个IP，{extra_percent:.2f}%)")
+                           f"(额外包含 {network_extra:,} 个IP，{extra_percent:.2f}%)")
                 else:
                     # 精确汇总或多个结果时，只显示包含的IP数量
                     info = f"包含 {network.size:,} 个IP地址"
@@ -242,82 +217,43 @@ class RouteSummaryTab(QWidget):
                 "inexact_summary",
                 self.perform_inexact_summary_task,
                 self.handle_summary_result,
-                networks
+                networks,
+                self.max_routes_input.value()
             )
         except Exception as e:
             logger.error(f"非精确汇总错误: {str(e)}")
             self.progress_bar.setVisible(False)
             self.show_error(f"汇总错误: {str(e)}")
 
-    def perform_inexact_summary_task(self, networks):
+    def perform_inexact_summary_task(self, networks, max_routes=1):
         """在后台线程中执行非精确汇总任务"""
-        logger.info(f"开始非精确汇总，网络数量: {len(networks)}")
-
-        # 计算总IP数和找出最小/最大IP地址
-        total_original_ips = 0
-        min_ip = None
-        max_ip = None
-
-        # 首先，将所有网络转换为整数范围
-        for net in networks:
-            if isinstance(net, IPRange):
-                total_original_ips += net.last - net.first + 1
-                if min_ip is None or net.first < min_ip:
-                    min_ip = net.first
-                if max_ip is None or net.last > max_ip:
-                    max_ip = net.last
-            else:  # IPNetwork
-                total_original_ips += net.size
-                net_first = int(net.network)
-                net_last = int(net.broadcast)
-                if min_ip is None or net_first < min_ip:
-                    min_ip = net_first
-                if max_ip is None or net_last > max_ip:
-                    max_ip = net_last
-
-        # 强制使用单一CIDR块进行非精确汇总
-        # 计算需要的前缀长度
-        range_size = max_ip - min_ip + 1
-        prefix_length = 32
-        while (1 << (32 - prefix_length)) < range_size:
-            prefix_length -= 1
-            if prefix_length <= 0:
-                prefix_length = 0
-                break
-
-        # 创建包含整个范围的CIDR块
-        # 需要找到正确的网络地址（向下对齐到CIDR边界）
-        network_address = min_ip & (0xFFFFFFFF << (32 - prefix_length))
-        single_cidr = IPNetwork(f"{IPAddress(network_address)}/{prefix_length}")
-
-        # 确保这个CIDR块确实包含了整个范围
-        if int(single_cidr.network) <= min_ip and int(single_cidr.broadcast) >= max_ip:
-            summarized = [single_cidr]
-        else:
-            # 如果计算出的CIDR块不包含整个范围，减小前缀长度
-            while prefix_length > 0:
-                prefix_length -= 1
-                network_address = min_ip & (0xFFFFFFFF << (32 - prefix_length))
-                single_cidr = IPNetwork(f"{IPAddress(network_address)}/{prefix_length}")
-                if int(single_cidr.network) <= min_ip and int(single_cidr.broadcast) >= max_ip:
-                    summarized = [single_cidr]
-                    break
-
-            # 如果仍然无法找到单一CIDR块，使用0.0.0.0/0
-            if prefix_length <= 0:
-                summarized = [IPNetwork("0.0.0.0/0")]
-
-        # 计算额外包含的IP数量
-        total_summarized_ips = sum(net.size for net in summarized)
-        extra_ips = total_summarized_ips - total_original_ips
-
-        logger.info(f"非精确汇总完成，原始IP数量: {total_original_ips}，汇总后条目数: {len(summarized)}，额外包含IP数量: {extra_ips}")
+        logger.info(f"开始非精确汇总，网络数量: {len(networks)}，最大路由条目数: {max_routes}")
+
+        # IPv4与IPv6分别先精确汇总，再在不超过最大路由条目数的前提下选择额外地址最少的覆盖网段
+        summarized = []
+        extra_per_prefix = []
+        families = []
+        for bits, starts, ends in networks.families():
+            version = 6 if bits == IPV6_BITS else 4
+            blocks = summarize_ranges(starts, ends, bits)
+            chosen = summarize_with_budget(blocks, max_routes, bits)
+            family_extra = [extra for _, extra in chosen]
+            families.append({
+                "version": version,
+                "total_original_ips": networks.total_addresses(version),
+                "total_summarized_ips": sum(cidr.size for cidr, _ in chosen),
+                "extra_ips": sum(family_extra),
+                "routes": len(chosen)
+            })
+            summarized.extend(cidr for cidr, _ in chosen)
+            extra_per_prefix.extend(family_extra)
+
+        logger.info(f"非精确汇总完成，汇总后条目数: {len(summarized)}，额外包含IP数量: {sum(extra_per_prefix)}")
 
         return {
             "summarized": summarized,
-            "total_original_ips": total_original_ips,
-            "total_summarized_ips": total_summarized_ips,
-            "extra_ips": extra_ips
+            "families": families,
+            "extra_per_prefix": extra_per_prefix
         }
 
     def summarize_routes(self):
@@ -332,21 +268,12 @@ class RouteSummaryTab(QWidget):
             return
 
         try:
-            # 使用TextUtils解析输入文本
+            # 使用TextUtils拆分输入文本，批量解析为地址区间
             entries = TextUtils.split_text(text)
-            networks = []
-            failed_entries = []
-
-            # 解析每个条目
-            for entry in entries:
-                try:
-                    network = TextUtils.parse_ip_range(entry)
-                    if network:
-                        networks.append(network)
-                except ValueError as e:
-                    failed_entries.append((entry, str(e)))
-
-            if not networks:
+            networks = parse_prefixes(entries)
+            failed_entries = networks.failed
+
+            if not len(networks):
                 raise ValueError("没有有效的路由条目")
 
             # 执行汇总
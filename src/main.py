@@ -2,6 +2,7 @@ import os
 import sys
 import warnings
 import traceback
+import multiprocessing
 
 # 设置项目根目录
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
@@ -67,4 +68,6 @@ def main():
         sys.exit(1)
 
 if __name__ == '__main__':
+    # 打包后的程序中启用多进程支持
+    multiprocessing.freeze_support()
     main()
\ No newline at end of file
@@ -2,6 +2,7 @@
 异步处理工具模块
 提供异步任务处理的工具类和函数
 """
+import threading
 from PyQt6.QtCore import QThread, pyqtSignal
 from typing import Callable, Any, Dict, Optional, Tuple
 
@@ -37,12 +38,55 @@ class AsyncTask(QThread):
             self.task_completed.emit(None, str(e))
 
 
+class ProgressTask(AsyncTask):
+    """支持进度报告和协作式取消的异步任务"""
+
+    # 进度更新信号，内容由任务函数自行约定
+    progress_updated = pyqtSignal(object)
+
+    def __init__(self, task_func: Callable, *args, **kwargs):
+        """
+        初始化异步任务
+
+        Args:
+            task_func: 要执行的任务函数，第一个参数为任务自身，
+                       用于调用 report_progress 和 is_cancelled
+            *args: 传递给任务函数的位置参数
+            **kwargs: 传递给任务函数的关键字参数
+        """
+        super().__init__(task_func, *args, **kwargs)
+        self._cancel_event = threading.Event()
+
+    def cancel(self) -> None:
+        """请求取消任务，任务函数需自行检查 is_cancelled 并尽快返回"""
+        self._cancel_event.set()
+
+    def is_cancelled(self) -> bool:
+        """是否已请求取消"""
+        return self._cancel_event.is_set()
+
+    def report_progress(self, progress: Any) -> None:
+        """报告任务进度（可在后台线程中调用）"""
+        self.progress_updated.emit(progress)
+
+    def run(self):
+        """执行任务"""
+        try:
+            self.result = self.task_func(self, *self.args, **self.kwargs)
+            self.task_completed.emit(self.result, None)
+        except Exception as e:
+            self.error = e
+            self.task_completed.emit(None, str(e))
+
+
 class AsyncTaskManager:
     """异步任务管理器"""
     
     def __init__(self):
         """初始化任务管理器"""
         self.tasks = {}
+        # 已请求取消但尚未结束的任务，保留引用直到线程结束，避免运行中的 QThread 被回收
+        self._stopping = set()
     
     def run_task(self, task_id: str, task_func: Callable, 
                  callback: Callable[[Any, Optional[str]], None], 
@@ -63,46 +107,109 @@ class AsyncTaskManager:
         # 创建新任务
         task = AsyncTask(task_func, *args, **kwargs)
         task.task_completed.connect(
-            lambda result, error: self._on_task_completed(task_id, result, error, callback)
+            lambda result, error: self._on_task_completed(task_id, task, result, error, callback)
         )
         
         # 保存任务并启动
         self.tasks[task_id] = task
         task.start()
+
+    def run_progress_task(self, task_id: str, task_func: Callable,
+                          callback: Callable[[Any, Optional[str]], None],
+                          progress_callback: Callable[[Any], None],
+                          *args, **kwargs) -> None:
+        """
+        运行支持进度报告和取消的异步任务
+
+        Args:
+            task_id: 任务ID，用于标识和管理任务
+            task_func: 要执行的任务函数，第一个参数为 ProgressTask 实例
+            callback: 任务完成后的回调函数，接收结果和错误信息
+            progress_callback: 进度回调函数，在主线程中接收进度信息
+            *args: 传递给任务函数的位置参数
+            **kwargs: 传递给任务函数的关键字参数
+        """
+        self.stop_task(task_id)
+
+        task = ProgressTask(task_func, *args, **kwargs)
+        task.task_completed.connect(
+            lambda result, error: self._on_task_completed(task_id, task, result, error, callback)
+        )
+        task.progress_updated.connect(
+            lambda progress: self._on_task_progress(task_id, task, progress, progress_callback)
+        )
+
+        self.tasks[task_id] = task
+        task.start()
+
+    def cancel_task(self, task_id: str) -> None:
+        """
+        请求协作式取消任务，任务结束后仍会调用完成回调
+
+        Args:
+            task_id: 要取消的任务ID
+        """
+        task = self.tasks.get(task_id)
+        if isinstance(task, ProgressTask):
+            task.cancel()
+
+    def is_running(self, task_id: str) -> bool:
+        """指定ID的任务是否正在运行"""
+        task = self.tasks.get(task_id)
+        return task is not None and task.isRunning()
     
     def stop_task(self, task_id: str) -> None:
         """
         停止指定ID的任务
-        
+
+        ProgressTask 只请求取消，不等待其结束，以免阻塞界面线程；
+        任务在下次检查 is_cancelled 后自行结束，结果不再回调。
+
         Args:
             task_id: 要停止的任务ID
         """
         if task_id in self.tasks:
-            task = self.tasks[task_id]
+            task = self.tasks.pop(task_id)
             if task.isRunning():
-                task.terminate()
-                task.wait()
-            del self.tasks[task_id]
+                if isinstance(task, ProgressTask):
+                    task.cancel()
+                    self._stopping.add(task)
+                    task.finished.connect(lambda: self._stopping.discard(task))
+                else:
+                    task.terminate()
+                    task.wait()
     
     def stop_all_tasks(self) -> None:
         """停止所有任务"""
         for task_id in list(self.tasks.keys()):
             self.stop_task(task_id)
     
-    def _on_task_completed(self, task_id: str, result: Any, 
+    def _on_task_progress(self, task_id: str, task: AsyncTask, progress: Any,
+                          progress_callback: Callable) -> None:
+        """
+        任务进度处理，忽略已被停止或替换的任务发出的进度
+        """
+        if self.tasks.get(task_id) is task and progress_callback:
+            progress_callback(progress)
+
+    def _on_task_completed(self, task_id: str, task: AsyncTask, result: Any, 
                           error: Optional[str], callback: Callable) -> None:
         """
         任务完成处理
         
         Args:
             task_id: 任务ID
+            task: 完成的任务
             result: 任务结果
             error: 错误信息
             callback: 回调函数
         """
+        # 已被停止或替换的任务不再回调
+        if self.tasks.get(task_id) is not task:
+            return
+
         # 从任务列表中移除
-        if task_id in self.tasks:
-            del self.tasks[task_id]
+        del self.tasks[task_id]
         
         # 调用回调函数
         if callback:
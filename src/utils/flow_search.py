@@ -0,0 +1,232 @@
+"""
+流量搜索模块
+为流量表的列式快照建立搜索索引，支持关键字与结构化过滤条件
+"""
+from bisect import bisect_left, bisect_right
+from ipaddress import ip_network
+from typing import Callable, List, Optional, Tuple
+
+from .flow_table import FlowColumns
+from .pcap_reader import format_endpoint
+
+# 各行搜索文本中字段之间的分隔符，保证关键字不会跨字段匹配
+FIELD_SEPARATOR = '\x00'
+
+
+class SearchTerm:
+    """
+    单个过滤条件
+
+    kind 为 text/proto/port/ip 之一：text 为关键字子串匹配；proto 为协议名；
+    port 与 ip 为闭区间 [low, high]，源端或目标端任一落在区间内即匹配。
+    """
+
+    __slots__ = ('kind', 'value', 'low', 'high')
+
+    def __init__(self, kind: str, value: str = '', low: int = 0, high: int = 0):
+        self.kind = kind
+        self.value = value
+        self.low = low
+        self.high = high
+
+    def implies(self, other: 'SearchTerm') -> bool:
+        """满足本条件的行是否一定满足 other"""
+        if self.kind != other.kind:
+            return False
+        if self.kind == 'text':
+            return other.value in self.value
+        if self.kind == 'proto':
+            return self.value == other.value
+        return other.low <= self.low and self.high <= other.high
+
+
+def parse_term(token: str) -> SearchTerm:
+    """
+    解析单个过滤条件
+
+    支持 port:443、port:1000-2000、ip:10.0.0.1、ip:10.0.0.0/8、proto:udp，
+    其余内容及无法解析的值按关键字匹配。
+    """
+    token = token.lower()
+    key, sep, value = token.partition(':')
+    if not sep or not value:
+        return SearchTerm('text', token)
+
+    if key == 'proto':
+        return SearchTerm('proto', value)
+    if key == 'port':
+        low, _, high = value.partition('-')
+        try:
+            low = int(low)
+            high = int(high) if high else low
+        except ValueError:
+            return SearchTerm('text', value)
+        if 0 <= low <= high <= 0xFFFF:
+            return SearchTerm('port', low=low, high=high)
+        return SearchTerm('text', value)
+    if key == 'ip':
+        try:
+            network = ip_network(value, strict=False)
+        except ValueError:
+            # 输入中的不完整地址（如 10.0.）按关键字匹配
+            return SearchTerm('text', value)
+        if network.version != 4:
+            return SearchTerm('text', value)
+        low = int(network.network_address)
+        return SearchTerm('ip', low=low, high=low + network.num_addresses - 1)
+    return SearchTerm('text', token)
+
+
+def parse_query(query: str) -> List[SearchTerm]:
+    """将搜索框内容解析为过滤条件列表，多个条件之间为“与”关系"""
+    return [parse_term(token) for token in query.split()]
+
+
+class FlowSearchIndex:
+    """
+    流量搜索索引
+
+    每行预先生成小写的搜索文本；协议和端口建立倒排索引，源/目标IP建立有序索引，
+    结构化条件通过索引直接得到候选行。若新查询只是在上一次查询的基础上追加
+    内容（如继续输入字符），则只在上一次的结果中继续筛选。
+    """
+
+    def __init__(self, columns: FlowColumns):
+        self.columns = columns
+        self._haystack: Optional[List[str]] = None
+        self._protocols = None
+        self._ports = None
+        self._ip_indexes = None
+        self._last_terms: Optional[List[SearchTerm]] = None
+        self._last_rows: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self.columns)
+
+    @property
+    def haystack(self) -> List[str]:
+        """每行的小写搜索文本，首次使用时生成"""
+        if self._haystack is None:
+            columns = self.columns
+            lowered = {}
+            protocols = [lowered.setdefault(p, p.lower()) for p in columns.protocol]
+            flags = [lowered.setdefault(f, f.lower()) for f in columns.flags]
+            # 端点与数字不含大小写字母，无需转换
+            self._haystack = list(map(FIELD_SEPARATOR.join, zip(
+                protocols, map(format_endpoint, columns.src), map(format_endpoint, columns.dst),
+                flags, map(str, columns.size), map(str, columns.forward), map(str, columns.reverse),
+            )))
+        return self._haystack
+
+    def _protocol_index(self):
+        """协议 -> 行下标列表"""
+        if self._protocols is None:
+            self._protocols = {}
+            for i, protocol in enumerate(self.columns.protocol):
+                self._protocols.setdefault(protocol.lower(), []).append(i)
+        return self._protocols
+
+    def _port_index(self):
+        """端口 -> 源或目标端口为该端口的行下标列表"""
+        if self._ports is None:
+            ports = {}
+            for i, (src, dst) in enumerate(zip(self.columns.src, self.columns.dst)):
+                src_port = src & 0xFFFF
+                dst_port = dst & 0xFFFF
+                ports.setdefault(src_port, []).append(i)
+                if dst_port != src_port:
+                    ports.setdefault(dst_port, []).append(i)
+            self._ports = ports
+        return self._ports
+
+    def _ip_index(self) -> List[Tuple[List[int], List[int]]]:
+        """源/目标端点各自按数值排序的 (行下标, 端点) 列表，IP在端点的高位"""
+        if self._ip_indexes is None:
+            self._ip_indexes = [
+                (sorted(range(len(endpoints)), key=endpoints.__getitem__), sorted(endpoints))
+                for endpoints in (self.columns.src, self.columns.dst)
+            ]
+        return self._ip_indexes
+
+    def search(self, query: str) -> List[int]:
+        """
+        搜索匹配的行
+
+        Args:
+            query: 搜索内容，空白分隔的多个条件同时满足才匹配
+
+        Returns:
+            List[int]: 匹配行的下标，按升序排列
+        """
+        terms = parse_query(query)
+        if not terms:
+            rows = list(range(len(self)))
+        else:
+            rows = self._search_terms(terms)
+        self._last_terms = terms
+        self._last_rows = rows
+        return rows
+
+    def _search_terms(self, terms: List[SearchTerm]) -> List[int]:
+        remaining = list(terms)
+        if self._last_terms is not None and self._narrows(terms, self._last_terms):
+            candidates = self._last_rows
+        else:
+            candidates = None
+            indexed = [term for term in terms if term.kind != 'text']
+            if indexed:
+                # 从候选最少的结构化条件开始，其余条件逐行过滤
+                best = min((self._lookup(term) for term in indexed), key=lambda item: len(item[1]))
+                candidates = best[1]
+                remaining.remove(best[0])
+            elif len(terms) == 1:
+                text = terms[0].value
+                return [i for i, haystack in enumerate(self.haystack) if text in haystack]
+
+        if candidates is None:
+            candidates = range(len(self))
+        for term in remaining:
+            match = self._matcher(term)
+            candidates = [i for i in candidates if match(i)]
+        return list(candidates)
+
+    @staticmethod
+    def _narrows(terms: List[SearchTerm], previous: List[SearchTerm]) -> bool:
+        """新条件是否比上一次的条件更严格"""
+        return all(any(term.implies(old) for term in terms) for old in previous)
+
+    def _lookup(self, term: SearchTerm):
+        """通过索引求出结构化条件匹配的行"""
+        if term.kind == 'proto':
+            rows = self._protocol_index().get(term.value, [])
+        elif term.kind == 'port':
+            ports = self._port_index()
+            if term.low == term.high:
+                rows = ports.get(term.low, [])
+            else:
+                matched = set()
+                for port, port_rows in ports.items():
+                    if term.low <= port <= term.high:
+                        matched.update(port_rows)
+                rows = sorted(matched)
+        else:
+            low, high = term.low << 16, (term.high << 16) | 0xFFFF
+            matched = set()
+            for order, keys in self._ip_index():
+                matched.update(order[bisect_left(keys, low):bisect_right(keys, high)])
+            rows = sorted(matched)
+        return term, rows
+
+    def _matcher(self, term: SearchTerm) -> Callable[[int], bool]:
+        """逐行判断条件的函数"""
+        columns = self.columns
+        if term.kind == 'text':
+            text, haystack = term.value, self.haystack
+            return lambda i: text in haystack[i]
+        if term.kind == 'proto':
+            value, protocols = term.value, columns.protocol
+            return lambda i: protocols[i].lower() == value
+        low, high, src, dst = term.low, term.high, columns.src, columns.dst
+        if term.kind == 'port':
+            return lambda i: low <= src[i] & 0xFFFF <= high or low <= dst[i] & 0xFFFF <= high
+        return lambda i: low <= src[i] >> 16 <= high or low <= dst[i] >> 16 <= high
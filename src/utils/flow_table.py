@@ -0,0 +1,167 @@
+"""
+流量表模块
+提供按双向五元组聚合数据包的哈希流量表
+"""
+from array import array
+from typing import Any, Callable, Dict, Hashable, Iterable, Iterator, List, Optional, Tuple
+
+
+class FlowRecord:
+    """单条双向流的统计记录"""
+
+    __slots__ = ('protocol', 'src', 'dst', 'flags', 'size', 'forward', 'reverse')
+
+    def __init__(self, protocol: str, src: Hashable, dst: Hashable, flags: str, size: int):
+        self.protocol = protocol
+        self.src = src
+        self.dst = dst
+        self.flags = flags
+        self.size = size
+        self.forward = 1
+        self.reverse = 0
+
+    def merge_flags(self, flags: str) -> None:
+        """按首次出现顺序合并TCP标志位"""
+        current = self.flags
+        if flags == current:
+            return
+        for flag in flags:
+            if flag not in current:
+                current += flag
+        self.flags = current
+
+    def to_row(self, format_endpoint: Optional[Callable[[Any], str]] = None) -> list:
+        """转换为表格行: [协议, 源地址, 目标地址, 标志位, 流量大小, 正向计数, 反向计数]"""
+        src, dst = self.src, self.dst
+        if format_endpoint is not None:
+            src, dst = format_endpoint(src), format_endpoint(dst)
+        return [self.protocol, src, dst, self.flags, self.size, self.forward, self.reverse]
+
+
+class FlowColumns:
+    """
+    流量表的列式快照
+
+    每列为等长序列，第i个元素属于第i条流；数值列使用array存储，
+    便于表格模型按整数键排序与统计。
+    """
+
+    __slots__ = ('protocol', 'src', 'dst', 'flags', 'size', 'forward', 'reverse')
+
+    def __init__(self, records: Iterable[FlowRecord] = ()):
+        records = list(records)
+        self.protocol = [record.protocol for record in records]
+        self.src = [record.src for record in records]
+        self.dst = [record.dst for record in records]
+        self.flags = [record.flags for record in records]
+        self.size = array('q', [record.size for record in records])
+        self.forward = array('q', [record.forward for record in records])
+        self.reverse = array('q', [record.reverse for record in records])
+
+    def __len__(self) -> int:
+        return len(self.protocol)
+
+    def row(self, index: int, format_endpoint: Optional[Callable[[Any], str]] = None) -> list:
+        """获取第index条流的表格行"""
+        src, dst = self.src[index], self.dst[index]
+        if format_endpoint is not None:
+            src, dst = format_endpoint(src), format_endpoint(dst)
+        return [self.protocol[index], src, dst, self.flags[index],
+                self.size[index], self.forward[index], self.reverse[index]]
+
+
+class FlowTable:
+    """
+    双向流量表
+
+    以方向归一化的 (协议, 端点A, 端点B) 为键，每个数据包的更新为O(1)。
+    流的方向以首个数据包为准：与首包同向的计入正向计数，反向的计入反向计数，
+    流量大小与TCP标志位两个方向合并统计。
+    """
+
+    def __init__(self):
+        self._flows: Dict[Tuple, FlowRecord] = {}
+
+    def __len__(self) -> int:
+        return len(self._flows)
+
+    def __iter__(self) -> Iterator[FlowRecord]:
+        return iter(self._flows.values())
+
+    def add(self, protocol: str, src: Hashable, dst: Hashable, flags: str, size: int) -> None:
+        """
+        添加一个数据包
+
+        Args:
+            protocol: 协议名称，如 TCP/UDP
+            src: 源端点（如 "ip:port"）
+            dst: 目标端点
+            flags: TCP标志位字符串，UDP为 '--'
+            size: IP总长度
+        """
+        key = (protocol, src, dst) if src <= dst else (protocol, dst, src)
+        record = self._flows.get(key)
+        if record is None:
+            self._flows[key] = FlowRecord(protocol, src, dst, flags, size)
+            return
+
+        if record.src == src and record.dst == dst:
+            record.forward += 1
+        else:
+            record.reverse += 1
+        record.size += size
+        record.merge_flags(flags)
+
+    def update(self, packets: Iterable) -> None:
+        """
+        批量添加数据包
+
+        Args:
+            packets: (协议, 源端点, 目标端点, 标志位, 大小) 序列
+        """
+        add = self.add
+        for protocol, src, dst, flags, size in packets:
+            add(protocol, src, dst, flags, int(size))
+
+    def merge(self, other: 'FlowTable') -> None:
+        """
+        合并另一张流量表，other 中的数据包视为发生在本表之后
+
+        依次合并按文件顺序切分的各分片流量表，结果与顺序汇总完全一致：
+        方向相反的记录交换正反向计数，标志位按首次出现顺序追加。
+        other 中的记录会被直接复用，合并后不应再单独使用 other。
+
+        Args:
+            other: 要合并的流量表
+        """
+        flows = self._flows
+        for key, record in other._flows.items():
+            current = flows.get(key)
+            if current is None:
+                flows[key] = record
+                continue
+
+            if current.src == record.src and current.dst == record.dst:
+                current.forward += record.forward
+                current.reverse += record.reverse
+            else:
+                current.forward += record.reverse
+                current.reverse += record.forward
+            current.size += record.size
+            current.merge_flags(record.flags)
+
+    def to_columns(self) -> FlowColumns:
+        """导出为列式快照，顺序与流首次出现的顺序一致"""
+        return FlowColumns(self._flows.values())
+
+    def to_rows(self, format_endpoint: Optional[Callable[[Any], str]] = None) -> List[list]:
+        """
+        导出为表格行列表，顺序与流首次出现的顺序一致
+
+        Args:
+            format_endpoint: 端点格式化函数，为None时直接使用端点值
+
+        Returns:
+            List[list]: 表格行列表
+        """
+        return [record.to_row(format_endpoint) for record in self._flows.values()]
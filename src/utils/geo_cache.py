@@ -0,0 +1,184 @@
+"""
+IP定位结果缓存模块
+按IP地址缓存在线查询的结果：内存中为有容量上限的LRU表，条目按来源设置有效期，
+并以SQLite文件保存在 ~/.network_tools 目录中。磁盘缓存在第一次查询时才打开，
+只按需读取单个地址，启动时不加载整个缓存。
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from .logger import logger
+
+# 缓存文件
+CACHE_PATH = os.path.join(os.path.expanduser('~'), '.network_tools', 'ip_geo_cache.db')
+# 内存中保留的条目数
+MEMORY_CAPACITY = 100000
+# 磁盘上保留的条目数，超出时删除最久未使用的条目
+DISK_CAPACITY = 1000000
+# 累积多少条新条目后写入磁盘
+FLUSH_ROWS = 500
+
+# 全部在线接口都失败时记录的来源
+FAILED_SOURCE = 'failed'
+# 在线接口结果的有效期（秒）
+DEFAULT_TTL = 7 * 24 * 3600
+# 各来源的有效期，未列出的来源使用 DEFAULT_TTL
+SOURCE_TTL = {
+    # 查询失败的记录只保留较短时间，网络恢复后可以重新查询
+    FAILED_SOURCE: 10 * 60,
+}
+
+
+class GeoCache:
+    """
+    IP定位结果缓存
+
+    条目为 (来源, 数据)，数据为可序列化为JSON的对象。内存与磁盘的读写均在同一把
+    锁内进行，可在批量查询的多个工作线程中同时使用。磁盘无法写入时只使用内存缓存。
+    """
+
+    def __init__(self, path: str = CACHE_PATH, capacity: int = MEMORY_CAPACITY,
+                 disk_capacity: int = DISK_CAPACITY):
+        self.path = path
+        self.capacity = capacity
+        self.disk_capacity = disk_capacity
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # 地址 -> (过期时间, 来源, 数据)，按最近使用的顺序排列
+        self._entries = OrderedDict()
+        # 等待写入磁盘的条目
+        self._pending = {}
+        # 命中过的地址，写入磁盘时一并更新其最近使用时间
+        self._touched = set()
+        # None 为尚未打开，False 为无法使用
+        self._db = None
+
+    def _connect(self):
+        """首次访问磁盘时打开缓存文件，并清理过期和超出容量的条目"""
+        if self._db is None:
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                db = sqlite3.connect(self.path, check_same_thread=False)
+                db.execute('CREATE TABLE IF NOT EXISTS geo_cache ('
+                           'ip TEXT PRIMARY KEY, source TEXT, data TEXT, expires REAL, used REAL)')
+                db.execute('CREATE INDEX IF NOT EXISTS geo_cache_expires ON geo_cache (expires)')
+                db.execute('CREATE INDEX IF NOT EXISTS geo_cache_used ON geo_cache (used)')
+                db.execute('DELETE FROM geo_cache WHERE expires < ?', (time.time(),))
+                excess = db.execute('SELECT COUNT(*) FROM geo_cache').fetchone()[0] - self.disk_capacity
+                if excess > 0:
+                    db.execute('DELETE FROM geo_cache WHERE ip IN '
+                               '(SELECT ip FROM geo_cache ORDER BY used LIMIT ?)', (excess,))
+                db.commit()
+                self._db = db
+            except (OSError, sqlite3.Error) as e:
+                logger.warning(f"IP定位缓存文件不可用，仅使用内存缓存: {str(e)}")
+                self._db = False
+        return self._db
+
+    def _remember(self, ip: str, entry: Tuple[float, str, object]) -> None:
+        self._entries[ip] = entry
+        self._entries.move_to_end(ip)
+        if len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+
+    def get(self, ip: str) -> Optional[Tuple[str, object]]:
+        """
+        查询缓存，内存中没有时读取磁盘
+
+        Returns:
+            Optional[Tuple[str, object]]: (来源, 数据)，没有或已过期时返回None
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(ip)
+            if entry is None:
+                # 已移出内存的条目可能还未写入磁盘
+                entry = self._pending.get(ip)
+                db = self._connect() if entry is None else None
+                if db:
+                    row = db.execute('SELECT expires, source, data FROM geo_cache WHERE ip = ?',
+                                     (ip,)).fetchone()
+                    if row is not None:
+                        entry = (row[0], row[1], json.loads(row[2]))
+                if entry is not None:
+                    self._remember(ip, entry)
+            if entry is None or entry[0] < now:
+                self._entries.pop(ip, None)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(ip)
+            self._touched.add(ip)
+            self.hits += 1
+            return entry[1], entry[2]
+
+    def put(self, ip: str, source: str, data: object) -> None:
+        """写入缓存，有效期按来源确定，累积 FLUSH_ROWS 条后写入磁盘"""
+        entry = (time.time() + SOURCE_TTL.get(source, DEFAULT_TTL), source, data)
+        with self._lock:
+            self._remember(ip, entry)
+            self._pending[ip] = entry
+            if len(self._pending) >= FLUSH_ROWS:
+                self._flush()
+
+    def flush(self) -> None:
+        """将尚未保存的条目写入磁盘"""
+        with self._lock:
+            self._flush()
+
+    def _flush(self) -> None:
+        if not self._pending and not self._touched:
+            return
+        db = self._connect()
+        if db:
+            now = time.time()
+            try:
+                db.executemany('UPDATE geo_cache SET used = ? WHERE ip = ?',
+                               [(now, ip) for ip in self._touched if ip not in self._pending])
+                db.executemany('INSERT OR REPLACE INTO geo_cache VALUES (?, ?, ?, ?, ?)',
+                               [(ip, source, json.dumps(data, ensure_ascii=False), expires, now)
+                                for ip, (expires, source, data) in self._pending.items()])
+                db.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"IP定位缓存写入失败: {str(e)}")
+        self._pending.clear()
+        self._touched.clear()
+
+    def clear(self) -> None:
+        """清空内存和磁盘中的缓存，并重置命中统计"""
+        with self._lock:
+            self._entries.clear()
+            self._pending.clear()
+            self._touched.clear()
+            self.hits = self.misses = 0
+            db = self._connect()
+            if db:
+                try:
+                    db.execute('DELETE FROM geo_cache')
+                    db.commit()
+                except sqlite3.Error as e:
+                    logger.warning(f"IP定位缓存清空失败: {str(e)}")
+
+    def stats(self) -> Dict[str, int]:
+        """命中次数、未命中次数和内存中的条目数"""
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'entries': len(self._entries)}
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_geo_cache() -> GeoCache:
+    """获取进程内共享的缓存，创建时不访问磁盘"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = GeoCache()
+    return _cache
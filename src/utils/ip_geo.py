@@ -0,0 +1,594 @@
+"""
+IP地理位置查询模块
+提供进程内共享的ip2region本地查询：首次使用时将整个xdb文件读入内存，
+之后的查询只访问内存中的向量索引和数据段，不再打开或读取文件，查询过的段
+按起止地址缓存，同一段内的其他地址用二分查找直接得到结果；
+以及在线查询：各接口共享连接池，同时请求并采用最先返回的结果，接口按观测到的
+耗时和成功率排序，结果写入共享的定位缓存；另有限定并发数的批量在线查询、
+地区信息拆分和从文本中提取IPv4地址等批量查询的辅助函数
+"""
+import os
+import re
+import socket
+import struct
+import threading
+import time
+from bisect import bisect_right
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from itertools import islice
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from ..config import AppConfig
+from .geo_cache import FAILED_SOURCE, GeoCache, get_geo_cache
+from .logger import logger
+
+_lock = threading.Lock()
+_content = None
+_segment_index = None
+_session = None
+_request_executor = None
+# 接口名称 -> 耗时和成功率的统计
+_provider_stats = {}
+
+
+def get_xdb_path() -> str:
+    """
+    ip2region数据库路径
+
+    优先使用 resources 目录中的数据库，不存在时使用 XdbSearchIP 包自带的数据库
+    """
+    db_path = AppConfig.get_ip_db_path()
+    if os.path.exists(db_path):
+        return db_path
+    from XdbSearchIP.xdbSearcher import dbPath
+    return dbPath
+
+
+def load_xdb_content() -> bytes:
+    """
+    读取整个xdb文件，进程内只读取一次
+
+    Returns:
+        bytes: xdb文件内容，包含文件头、向量索引、数据段和段索引
+    """
+    global _content
+    if _content is None:
+        with _lock:
+            if _content is None:
+                with open(get_xdb_path(), 'rb') as f:
+                    _content = f.read()
+    return _content
+
+
+# xdb文件结构：256字节的文件头之后是按IP前两段划分的向量索引，每格8字节，
+# 为该范围内段索引的起止偏移（不含结束偏移）；段索引每条14字节：
+# 起始IP、结束IP、地区长度、地区偏移。段不跨越向量索引的格子
+XDB_HEADER_SIZE = 256
+_XDB_VECTOR = struct.Struct('<II')
+_XDB_SEGMENT = struct.Struct('<IIHI')
+
+
+def search_segment(content: bytes, ip: int) -> Optional[Tuple[int, int, str]]:
+    """
+    在xdb文件内容中查找地址所在的段
+
+    XdbSearcher 的 getInt2 读取地区长度时将第二个字节按 0xFF00 屏蔽，
+    只得到低8位，这里按小端16位整数读取。
+
+    Args:
+        content: 整个xdb文件的内容
+        ip: 整数形式的IPv4地址
+
+    Returns:
+        Optional[Tuple[int, int, str]]: (段起始IP, 段结束IP, 地区信息)，找不到时返回None
+    """
+    offset = XDB_HEADER_SIZE + (ip >> 16) * _XDB_VECTOR.size
+    start_ptr, end_ptr = _XDB_VECTOR.unpack_from(content, offset)
+    low, high = 0, (end_ptr - start_ptr) // _XDB_SEGMENT.size - 1
+    while low <= high:
+        mid = (low + high) >> 1
+        start_ip, end_ip, data_len, data_ptr = _XDB_SEGMENT.unpack_from(
+            content, start_ptr + mid * _XDB_SEGMENT.size)
+        if ip < start_ip:
+            high = mid - 1
+        elif ip > end_ip:
+            low = mid + 1
+        else:
+            return start_ip, end_ip, content[data_ptr:data_ptr + data_len].decode('utf-8')
+    return None
+
+
+class SegmentIndex:
+    """
+    ip2region段缓存
+
+    同一段内所有地址的地区信息相同。查询过的段按向量索引的格子（IP前两段）分组，
+    组内按起始IP保存在有序列表中，之后落在已知段内的地址用二分查找直接得到结果，
+    不再访问数据库。分组使插入新段时只移动同一格子内的少量条目；
+    缓存的段数不超过数据库中的段数。
+    """
+
+    def __init__(self, content: bytes):
+        self._content = content
+        # IP前两段 -> (起始IP列表, 结束IP列表, 地区信息列表)
+        self._cells = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.segments = 0
+
+    def search(self, ip: int) -> str:
+        """
+        查询整数形式的IPv4地址
+
+        Returns:
+            str: 地区信息，数据库中没有该地址时为空字符串
+        """
+        with self._lock:
+            cell = self._cells.get(ip >> 16)
+            if cell is None:
+                cell = self._cells[ip >> 16] = ([], [], [])
+            starts, ends, regions = cell
+            index = bisect_right(starts, ip) - 1
+            if index >= 0 and ip <= ends[index]:
+                self.hits += 1
+                return regions[index]
+            self.misses += 1
+            segment = search_segment(self._content, ip)
+            if segment is None:
+                return ''
+            start, end, region = segment
+            index += 1
+            starts.insert(index, start)
+            ends.insert(index, end)
+            regions.insert(index, region)
+            self.segments += 1
+            return region
+
+    def stats(self) -> Dict[str, int]:
+        """命中次数、未命中次数和已缓存的段数"""
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'segments': self.segments}
+
+
+def get_segment_index() -> SegmentIndex:
+    """获取进程内共享的段缓存"""
+    global _segment_index
+    if _segment_index is None:
+        content = load_xdb_content()
+        with _lock:
+            if _segment_index is None:
+                _segment_index = SegmentIndex(content)
+    return _segment_index
+
+
+def search_local(ip: str) -> str:
+    """
+    使用本地ip2region数据库查询IPv4地址的地理位置，先查段缓存
+
+    Returns:
+        str: 地区信息，格式为 国家|区域|省份|城市|运营商
+
+    Raises:
+        OSError: 不是有效的IPv4地址
+    """
+    return get_segment_index().search(int.from_bytes(socket.inet_aton(ip), 'big'))
+
+
+# 在线查询接口，按优先级排列：fields 为响应中显示的字段及名称，
+# columns 为批量查询表格中 国家/省份/城市/运营商 对应的字段，接口不提供时为None
+REMOTE_PROVIDERS = [
+    {
+        'name': 'realip.cc',
+        'url': 'https://realip.cc/?ip={ip}',
+        'fields': {
+            'ip': 'IP地址',
+            'country': '国家',
+            'province': '省份',
+            'city': '城市',
+            'isp': '运营商',
+            'time_zone': '时区',
+            'latitude': '纬度',
+            'longitude': '经度'
+        },
+        'columns': ('country', 'province', 'city', 'isp'),
+    },
+    {
+        'name': 'api.ip.sb',
+        'url': 'https://api.ip.sb/geoip/{ip}',
+        'fields': {
+            'ip': 'IP地址',
+            'country': '国家',
+            'region': '地区',
+            'city': '城市',
+            'isp': '运营商',
+            'timezone': '时区',
+            'latitude': '纬度',
+            'longitude': '经度'
+        },
+        'columns': ('country', 'region', 'city', 'isp'),
+    },
+    {
+        'name': 'ip2location.io',
+        'url': 'https://api.ip2location.io/?ip={ip}',
+        'fields': {
+            'ip': 'IP地址',
+            'country_name': '国家',
+            'region_name': '地区',
+            'city_name': '城市',
+            'time_zone': '时区',
+            'latitude': '纬度',
+            'longitude': '经度'
+        },
+        'columns': ('country_name', 'region_name', 'city_name', None),
+    },
+    {
+        'name': 'pconline',
+        'url': 'https://whois.pconline.com.cn/ipJson.jsp?ip={ip}&json=true',
+        'fields': {
+            'ip': 'IP地址',
+            'addr': '地理位置',
+            'pro': '省份',
+            'city': '城市',
+            'region': '地区'
+        },
+        'columns': (None, 'pro', 'city', None),
+    },
+]
+
+REQUEST_HEADERS = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'}
+REQUEST_TIMEOUT = 5
+# 接口统计的指数加权系数，越大越偏重最近的请求
+STATS_WEIGHT = 0.3
+# 计算接口得分时成功率的下限，避免除以0
+MIN_SUCCESS_RATE = 0.05
+# 批量查询时同时进行的在线查询数
+REMOTE_CONCURRENCY = 8
+# 批量查询时缓存命中的结果每多少个回调一次
+CACHED_BATCH = 5000
+# 按块读取文件时每块的字节数
+FILE_CHUNK_SIZE = 16 * 1024 * 1024
+
+_IPV4_PATTERN = re.compile(r'(?<!\d)(?<!\d\.)(?:\d{1,3}\.){3}\d{1,3}(?!\.?\d)')
+
+
+def get_session() -> requests.Session:
+    """
+    获取共享的HTTP会话
+
+    会话按主机保留连接池，同一接口的后续查询复用已建立的TLS连接；
+    连接池大小按批量查询的并发数设置，可在多个线程中同时使用。
+    """
+    global _session
+    if _session is None:
+        with _lock:
+            if _session is None:
+                session = requests.Session()
+                session.headers.update(REQUEST_HEADERS)
+                adapter = HTTPAdapter(pool_connections=len(REMOTE_PROVIDERS), pool_maxsize=REMOTE_CONCURRENCY)
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                _session = session
+    return _session
+
+
+def _get_request_executor() -> ThreadPoolExecutor:
+    """发送在线查询请求的共享线程池，批量查询时每个并发查询都可能同时请求全部接口"""
+    global _request_executor
+    if _request_executor is None:
+        with _lock:
+            if _request_executor is None:
+                _request_executor = ThreadPoolExecutor(
+                    max_workers=len(REMOTE_PROVIDERS) * REMOTE_CONCURRENCY,
+                    thread_name_prefix='ip_geo')
+    return _request_executor
+
+
+def _record_request(name: str, elapsed: float, success: bool) -> None:
+    """按指数加权平均更新接口的耗时和成功率"""
+    with _lock:
+        stats = _provider_stats.get(name)
+        if stats is None:
+            _provider_stats[name] = {'latency': elapsed, 'success': float(success), 'requests': 1}
+            return
+        stats['latency'] += STATS_WEIGHT * (elapsed - stats['latency'])
+        stats['success'] += STATS_WEIGHT * (success - stats['success'])
+        stats['requests'] += 1
+
+
+def provider_stats() -> Dict[str, Dict]:
+    """各接口的统计：latency 为平均耗时（秒），success 为成功率，requests 为请求次数"""
+    with _lock:
+        return {name: dict(stats) for name, stats in _provider_stats.items()}
+
+
+def ranked_providers() -> List[Dict]:
+    """
+    按观测到的表现排列在线接口
+
+    得分为平均耗时除以成功率，越小越靠前；失败的请求按实际等待时间计入耗时。
+    尚未请求过的接口得分为0，排在最前以便尽快获得统计，得分相同时保持定义的顺序。
+    """
+    stats = provider_stats()
+
+    def score(provider):
+        item = stats.get(provider['name'])
+        if item is None:
+            return 0.0
+        return item['latency'] / max(item['success'], MIN_SUCCESS_RATE)
+
+    return sorted(REMOTE_PROVIDERS, key=score)
+
+
+def _fetch(provider: Dict, ip: str) -> Optional[Dict]:
+    """调用一个在线接口，响应缺少任一字段时视为失败"""
+    url = provider['url'].format(ip=ip)
+    start = time.perf_counter()
+    data = None
+    try:
+        response = get_session().get(url, timeout=REQUEST_TIMEOUT)
+        if response.status_code == 200:
+            payload = response.json()
+            data = {key: payload[key] for key in provider['fields']}
+    except Exception as e:
+        logger.debug(f"API {url} 调用失败: {str(e)}")
+    _record_request(provider['name'], time.perf_counter() - start, data is not None)
+    return data
+
+
+def _query_providers(ip: str, fanout: Optional[int]) -> Optional[Dict]:
+    """并发请求在线接口，返回最先得到的有效结果"""
+    executor = _get_request_executor()
+    providers = iter(ranked_providers())
+    pending = {}
+    for provider in islice(providers, fanout or len(REMOTE_PROVIDERS)):
+        pending[executor.submit(_fetch, provider, ip)] = provider
+
+    result = None
+    while pending and result is None:
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            provider = pending.pop(future)
+            data = future.result()
+            if data is not None and result is None:
+                result = {'provider': provider, 'data': data}
+        if result is None:
+            for fallback in islice(providers, len(done)):
+                pending[executor.submit(_fetch, fallback, ip)] = fallback
+    for future in pending:
+        future.cancel()
+    return result
+
+
+def _cached_result(cache: GeoCache, ip: str) -> Tuple[bool, Optional[Dict]]:
+    """
+    读取缓存的在线查询结果
+
+    Returns:
+        Tuple[bool, Optional[Dict]]: (是否命中, 结果)，命中失败条目时结果为None
+    """
+    cached = cache.get(ip)
+    if cached is None:
+        return False, None
+    source, data = cached
+    if source == FAILED_SOURCE:
+        return True, None
+    provider = next((p for p in REMOTE_PROVIDERS if p['name'] == source), None)
+    if provider is None:
+        # 接口已不再使用
+        return False, None
+    return True, {'provider': provider, 'data': data}
+
+
+def _store_result(cache: GeoCache, ip: str, result: Optional[Dict]) -> None:
+    """缓存在线查询结果，全部接口失败时记录失败条目"""
+    if result is None:
+        cache.put(ip, FAILED_SOURCE, None)
+    else:
+        cache.put(ip, result['provider']['name'], result['data'])
+
+
+def query_remote(ip: str, fanout: Optional[int] = None, use_cache: bool = True) -> Optional[Dict]:
+    """
+    并发调用在线接口查询IP地理位置，采用最先返回的有效结果
+
+    接口按 ranked_providers 的顺序使用，同时请求其中 fanout 个；某个请求失败后
+    补上下一个接口，直到有结果或全部失败。得到结果后取消尚未开始的请求，
+    已发出的请求在后台结束，其耗时仍计入接口统计。
+
+    查询结果写入共享的 GeoCache，全部失败也记录一条较短有效期的失败条目，
+    有效期内再次查询同一地址时直接返回缓存的结果。
+
+    Args:
+        ip: 要查询的地址
+        fanout: 同时请求的接口数，默认同时请求全部接口；批量查询时取1以免成倍增加请求量
+        use_cache: 是否读写缓存
+
+    Returns:
+        Optional[Dict]: provider 为接口定义，data 为接口返回的字段，全部失败时返回None
+    """
+    cache = get_geo_cache() if use_cache else None
+    if cache is not None:
+        hit, result = _cached_result(cache, ip)
+        if hit:
+            return result
+
+    result = _query_providers(ip, fanout)
+    if cache is not None:
+        _store_result(cache, ip, result)
+    return result
+
+
+def remote_columns(result: Dict) -> Tuple[str, str, str, str]:
+    """在线查询结果的 (国家, 省份, 城市, 运营商)"""
+    data = result['data']
+    return tuple(str(data.get(key) or '') if key else '' for key in result['provider']['columns'])
+
+
+def parse_region(region: str) -> Tuple[str, str, str, str]:
+    """
+    拆分ip2region的地区信息
+
+    Args:
+        region: 国家|区域|省份|城市|运营商 格式的文本，未知的部分为0
+
+    Returns:
+        Tuple[str, str, str, str]: (国家, 省份, 城市, 运营商)，未知的部分为空字符串
+    """
+    parts = region.split('|')
+    if len(parts) != 5:
+        return region, '', '', ''
+    country, _, province, city, isp = ('' if part == '0' else part for part in parts)
+    return country, province, city, isp
+
+
+def lookup_local(ips: Iterable[str]) -> List[Tuple[str, str, str, str]]:
+    """
+    使用本地数据库批量查询，经过共享的段缓存
+
+    Returns:
+        List[Tuple[str, str, str, str]]: 各地址的 (国家, 省份, 城市, 运营商)，查询失败的地址各项为空
+    """
+    search = get_segment_index().search
+    # 不同地址的地区信息大量重复，拆分结果按地区文本缓存
+    regions = {}
+    results = []
+    for ip in ips:
+        try:
+            region = search(int.from_bytes(socket.inet_aton(ip), 'big'))
+            geo = regions.get(region)
+            if geo is None:
+                geo = regions[region] = parse_region(region)
+            results.append(geo)
+        except Exception as e:
+            logger.debug(f"ip2region查询 {ip} 失败: {str(e)}")
+            results.append(('', '', '', ''))
+    return results
+
+
+def lookup_remote(ips: Sequence[str],
+                  result_callback: Callable[[List[Tuple[int, Optional[Dict]]]], None],
+                  is_cancelled: Optional[Callable[[], bool]] = None,
+                  workers: int = REMOTE_CONCURRENCY,
+                  poll_interval: float = 0.2,
+                  use_cache: bool = True) -> bool:
+    """
+    在线程池中并发调用在线接口查询
+
+    缓存中已有的地址先直接返回，每 CACHED_BATCH 个调用一次 result_callback；
+    其余地址逐个按接口排序查询，同时进行的查询不超过 workers 个，完成一个补充一个，
+    不会一次提交全部地址，每轮等待结束后将本轮完成的结果一并交给 result_callback。
+
+    Args:
+        ips: 要查询的地址
+        result_callback: 结果回调，参数为 (地址下标, query_remote 的返回值) 列表
+        is_cancelled: 返回True时停止提交，已开始的请求不等待
+        workers: 并发查询数
+        poll_interval: 检查取消请求的间隔（秒）
+        use_cache: 是否读写缓存
+
+    Returns:
+        bool: 全部完成返回True，被取消返回False
+    """
+    cache = get_geo_cache() if use_cache else None
+    queue = []
+    cached = []
+    for index, ip in enumerate(ips):
+        hit, result = _cached_result(cache, ip) if cache is not None else (False, None)
+        if not hit:
+            queue.append((index, ip))
+            continue
+        cached.append((index, result))
+        if len(cached) >= CACHED_BATCH:
+            result_callback(cached)
+            cached = []
+            if is_cancelled is not None and is_cancelled():
+                return False
+    if cached:
+        result_callback(cached)
+
+    def lookup(ip):
+        result = _query_providers(ip, 1)
+        if cache is not None:
+            _store_result(cache, ip, result)
+        return result
+
+    executor = ThreadPoolExecutor(max_workers=max(workers, 1))
+    cancelled = False
+    try:
+        remaining = iter(queue)
+        futures = {}
+        for index, ip in remaining:
+            futures[executor.submit(lookup, ip)] = index
+            if len(futures) >= workers:
+                break
+
+        while futures:
+            done, _ = wait(futures, timeout=poll_interval, return_when=FIRST_COMPLETED)
+            if done:
+                result_callback([(futures.pop(future), future.result()) for future in done])
+            if is_cancelled is not None and is_cancelled():
+                cancelled = True
+                break
+            for index, ip in remaining:
+                futures[executor.submit(lookup, ip)] = index
+                if len(futures) >= workers:
+                    break
+    finally:
+        executor.shutdown(wait=not cancelled, cancel_futures=True)
+        if cache is not None:
+            cache.flush()
+    return not cancelled
+
+
+def count_ipv4_addresses(text: str) -> Dict[str, int]:
+    """
+    提取文本中的IPv4地址并统计出现次数
+
+    适用于地址列表和防火墙日志等任意文本。各段超过255的数字串忽略，
+    带前导0的写法（如 010.001.002.003）按十进制归并为标准写法。
+
+    Returns:
+        Dict[str, int]: 地址 -> 出现次数，按首次出现的顺序排列
+    """
+    counts = {}
+    for address, count in Counter(_IPV4_PATTERN.findall(text)).items():
+        parts = address.split('.')
+        if any(int(part) > 255 for part in parts):
+            continue
+        if any(len(part) > 1 and part[0] == '0' for part in parts):
+            address = '.'.join(str(int(part)) for part in parts)
+        counts[address] = counts.get(address, 0) + count
+    return counts
+
+
+def count_ipv4_addresses_in_file(path: str) -> Dict[str, int]:
+    """
+    按块读取文件并统计其中的IPv4地址，结果与 count_ipv4_addresses 相同
+
+    每块在最后一个换行处切分，不完整的行并入下一块；非UTF-8内容按替换字符处理。
+    """
+    counts = {}
+
+    def merge(chunk: bytes):
+        for address, count in count_ipv4_addresses(chunk.decode('utf-8', errors='replace')).items():
+            counts[address] = counts.get(address, 0) + count
+
+    remainder = b''
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(FILE_CHUNK_SIZE)
+            if not chunk:
+                break
+            chunk = remainder + chunk
+            end = chunk.rfind(b'\n') + 1
+            remainder = chunk[end:]
+            if end:
+                merge(chunk[:end])
+    if remainder:
+        merge(remainder)
+    return counts
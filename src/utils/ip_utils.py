@@ -4,6 +4,8 @@ import re
 from netaddr import IPRange, IPNetwork, IPAddress
 from netaddr.core import AddrFormatError
 
+from .route_summary import IPV4_BITS, IPV6_BITS, interval_to_cidrs
+
 class IPUtils:
     @staticmethod
     def get_binary_netmask(netmask: str) -> str:
@@ -117,8 +119,15 @@ class IPUtils:
                 try:
                     if '-' in line:  # IP范围格式
                         start, end = map(str.strip, line.split('-', 1))  # 限制只分割一次
+                        if ':' in start:
+                            # IPv6简写格式 (如 2001:db8::1-ff)，替换最后一段
+                            if ':' not in end:
+                                end_num = int(end, 16)
+                                if end_num > 0xFFFF:
+                                    return None, f"IPv6地址最后一段必须在0-ffff之间\n出错的行: {line}"
+                                end = str(IPAddress((int(IPAddress(start, 6)) & ~0xFFFF) | end_num, 6))
                         # 处理简写格式 (如 192.168.0.0-25 或 192.168.1.1-25)
-                        if '.' not in end:
+                        elif '.' not in end:
                             # 从起始IP中获取网络前缀
                             prefix = '.'.join(start.split('.')[:-1])
                             # 如果end只包含最后一个数字，添加前缀
@@ -128,21 +137,26 @@ class IPUtils:
                         start_ip = IPAddress(start)
                         end_ip = IPAddress(end)
                         
+                        if start_ip.version != end_ip.version:
+                            return None, f"IP范围错误: 起始IP与结束IP的版本不同\n出错的行: {line}"
                         if start_ip > end_ip:
                             return None, f"IP范围错误: 起始IP大于结束IP\n出错的行: {line}"
                         
                         # 为非精确汇总保存IP范围
                         ip_ranges.append(IPRange(start, end))
                         
-                        # 为精确汇总保存单个/32地址
-                        for ip in range(int(start_ip), int(end_ip) + 1):
-                            networks.append(IPNetwork(f"{IPAddress(ip)}/32"))
+                        # 为精确汇总保存覆盖该范围的最少CIDR块，不逐个展开地址
+                        bits = IPV6_BITS if start_ip.version == 6 else IPV4_BITS
+                        networks.extend(
+                            IPNetwork((cidr.first, cidr.prefixlen), version=start_ip.version)
+                            for cidr in interval_to_cidrs(int(start_ip), int(end_ip), bits)
+                        )
                         
                     else:  # CIDR或掩码格式
                         if '/' in line:  # CIDR格式
                             network = IPNetwork(line)
                             networks.append(network)
-                            ip_ranges.append(IPRange(network.first, network.last))
+                            ip_ranges.append(IPRange(network[0], network[-1]))
                         else:  # 掩码格式
                             parts = line.split()
                             if len(parts) == 2:  # IP和掩码格式
@@ -151,12 +165,12 @@ class IPUtils:
                                 prefix_len = sum(bin(int(x)).count('1') for x in mask.split('.'))
                                 network = IPNetwork(f"{ip}/{prefix_len}")
                                 networks.append(network)
-                                ip_ranges.append(IPRange(network.first, network.last))
+                                ip_ranges.append(IPRange(network[0], network[-1]))
                             else:
-                                # 单个IP地址，默认使用/32
-                                network = IPNetwork(f"{line}/32")
+                                # 单个IP地址，默认使用/32（IPv6为/128）
+                                network = IPNetwork(f"{line}/128" if ':' in line else f"{line}/32")
                                 networks.append(network)
-                                ip_ranges.append(IPRange(network.first, network.last))
+                                ip_ranges.append(IPRange(network[0], network[-1]))
                     
                 except AddrFormatError as e:
                     return None, f"IP地址格式错误\n出错的行: {line}\n错误信息: {str(e)}"
@@ -167,4 +181,23 @@ class IPUtils:
             return {"networks": networks, "ip_ranges": ip_ranges}, None
             
         except Exception as e:
-            return None, f"处理错误: {str(e)}"
\ No newline at end of file
+            return None, f"处理错误: {str(e)}"
+
+    @staticmethod
+    def iter_addresses(ip_ranges):
+        """
+        逐个生成IP范围内的地址
+        
+        按需生成，内存占用与范围大小无关，供需要逐个地址处理的调用方使用。
+        
+        Args:
+            ip_ranges: IPRange/IPNetwork 序列，如 parse_input_text 返回的 ip_ranges
+            
+        Yields:
+            IPAddress: 范围内的每个地址
+        """
+        for ip_range in ip_ranges:
+            # 须指定版本，否则数值在32位以内的IPv6地址（如 ::1）会被当作IPv4
+            version = ip_range.version
+            for value in range(ip_range.first, ip_range.last + 1):
+                yield IPAddress(value, version)
@@ -0,0 +1,223 @@
+"""
+NAT冲突检查模块
+对NATParser的解析结果按 (设备, 全局IP, 协议) 建立端口区间索引，排序后一次扫描
+找出重复映射与端口重叠，并按 (设备, 内部IP, 协议) 找出被多次映射的内部服务
+"""
+import socket
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+# 冲突类型，按显示顺序排列
+DUPLICATE = 'duplicate'
+OVERLAP = 'overlap'
+INSIDE = 'inside'
+CONFLICT_KINDS = {
+    DUPLICATE: '重复映射',
+    OVERLAP: '端口重叠',
+    INSIDE: '内部服务多次映射',
+}
+
+ANY_PROTOCOL = 'any'
+_FULL_RANGE = (0, 65535)
+_PROTOCOL_NUMBERS = {'1': 'icmp', '6': 'tcp', '17': 'udp'}
+
+# 配置中可以用名称代替的常用端口
+_SERVICE_PORTS = {
+    'ftp': 21, 'ftp-data': 20, 'ssh': 22, 'telnet': 23, 'smtp': 25, 'domain': 53,
+    'dns': 53, 'bootps': 67, 'bootpc': 68, 'tftp': 69, 'www': 80, 'http': 80,
+    'pop3': 110, 'ntp': 123, 'imap': 143, 'snmp': 161, 'snmptrap': 162, 'bgp': 179,
+    'ldap': 389, 'https': 443, 'syslog': 514, 'rtsp': 554,
+}
+
+
+class Conflict(NamedTuple):
+    """一组互相冲突的规则"""
+
+    kind: str
+    device: str
+    ip: str
+    protocol: str
+    start: int
+    end: int
+    rules: Tuple[int, ...]
+
+    @property
+    def kind_name(self) -> str:
+        """冲突类型的中文名称"""
+        return CONFLICT_KINDS[self.kind]
+
+    @property
+    def ports(self) -> str:
+        """冲突涉及的端口范围文本"""
+        if (self.start, self.end) == _FULL_RANGE:
+            return 'any'
+        return str(self.start) if self.start == self.end else f"{self.start}-{self.end}"
+
+
+def parse_port_range(port: str) -> Optional[Tuple[int, int]]:
+    """
+    将解析结果中的端口转为闭区间
+
+    支持 any、单个端口、a-b 形式的端口范围以及 www 等常用服务名称，
+    无法识别时返回None
+    """
+    port = port.lower()
+    if port == 'any':
+        return _FULL_RANGE
+    low, sep, high = port.partition('-')
+    if low.isdecimal() and (not sep or high.isdecimal()):
+        start = int(low)
+        end = int(high) if sep else start
+        if start <= end <= 65535:
+            return start, end
+        return None
+    if port in _SERVICE_PORTS:
+        return _SERVICE_PORTS[port], _SERVICE_PORTS[port]
+    return None
+
+
+def _normalize_protocol(protocol: str) -> str:
+    protocol = protocol.lower()
+    return _PROTOCOL_NUMBERS.get(protocol, protocol)
+
+
+def _ip_key(ip: str) -> Tuple[int, bytes, str]:
+    """IP地址的排序键，IPv4在IPv6之前，无法识别的按文本排在最后"""
+    for order, family in enumerate((socket.AF_INET, socket.AF_INET6)):
+        try:
+            return order, socket.inet_pton(family, ip), ''
+        except OSError:
+            continue
+    return 2, b'', ip
+
+
+def _overlap_groups(intervals: List[Tuple[int, int, int]]) -> List[List[Tuple[int, int, int]]]:
+    """
+    将端口区间按重叠关系分组
+
+    区间按起点排序后扫描，记录当前组的最远终点，下一个区间的起点不超过该终点
+    时并入当前组。只返回包含两个及以上区间的组。
+
+    Args:
+        intervals: (起点, 终点, 规则下标) 列表
+
+    Returns:
+        各组的区间列表
+    """
+    intervals.sort()
+    groups = []
+    current = []
+    reach = -1
+    for interval in intervals:
+        if interval[0] > reach:
+            if len(current) > 1:
+                groups.append(current)
+            current = []
+        current.append(interval)
+        reach = max(reach, interval[1])
+    if len(current) > 1:
+        groups.append(current)
+    return groups
+
+
+def _index(records: Sequence[Dict], ip_field: str, port_field: str) -> Dict[Tuple[str, str], Dict[str, List]]:
+    """按 (设备, IP) 与协议建立端口区间索引，端口无法识别的规则不参与检查"""
+    # 端口与协议的取值重复较多，缓存转换结果
+    port_ranges = {}
+    protocols = {}
+    index = {}
+    for rule, record in enumerate(records):
+        ip = record.get(ip_field)
+        port = record.get(port_field, 'any')
+        if port not in port_ranges:
+            port_ranges[port] = parse_port_range(str(port))
+        ports = port_ranges[port]
+        if ports is None or not ip:
+            continue
+
+        protocol = record.get('protocol', ANY_PROTOCOL)
+        if protocol not in protocols:
+            protocols[protocol] = _normalize_protocol(str(protocol))
+        protocol = protocols[protocol]
+
+        key = (record.get('device', '-'), ip)
+        by_protocol = index.get(key)
+        if by_protocol is None:
+            index[key] = {protocol: [(ports[0], ports[1], rule)]}
+        elif protocol in by_protocol:
+            by_protocol[protocol].append((ports[0], ports[1], rule))
+        else:
+            by_protocol[protocol] = [(ports[0], ports[1], rule)]
+    return index
+
+
+def _sweep(index: Dict[Tuple[str, str], Dict[str, List]]):
+    """
+    逐个 (设备, IP, 协议) 生成端口重叠的区间组
+
+    协议为 any 的规则与同一IP的每种协议都可能冲突，并入各协议一起检查；
+    只由 any 规则组成的组单独检查一次，避免重复报告。
+
+    Yields:
+        (设备, IP, 协议, 区间组)
+    """
+    for (device, ip), by_protocol in index.items():
+        if len(by_protocol) == 1 and len(next(iter(by_protocol.values()))) == 1:
+            # 只有一条规则的IP无需检查
+            continue
+        any_intervals = by_protocol.get(ANY_PROTOCOL, [])
+        for protocol, intervals in by_protocol.items():
+            if protocol == ANY_PROTOCOL:
+                continue
+            any_rules = {rule for _, _, rule in any_intervals}
+            for group in _overlap_groups(intervals + any_intervals):
+                if all(rule in any_rules for _, _, rule in group):
+                    continue
+                yield device, ip, protocol, group
+        for group in _overlap_groups(list(any_intervals)):
+            yield device, ip, ANY_PROTOCOL, group
+
+
+def find_conflicts(records: Sequence[Dict]) -> List[Conflict]:
+    """
+    检查NAT规则之间的冲突
+
+    - 重复映射：同一设备上全局IP、协议、端口范围完全相同的规则
+    - 端口重叠：同一设备上全局IP和协议相同、端口范围相交但不完全相同的规则，
+      相交关系可传递，如 80-90、90-100、100-110 归为一组
+    - 内部服务多次映射：同一内部IP、协议下端口范围相交，却映射到不同全局地址或端口的规则
+
+    各索引键下的区间排序后线性扫描，总复杂度为 O(n log n)。
+
+    Args:
+        records: NATParser 的解析结果，批量解析的结果按 device 字段区分设备
+
+    Returns:
+        List[Conflict]: 按类型、设备、IP、端口排序的冲突列表，rules 为规则在 records 中的下标
+    """
+    conflicts = []
+    for device, ip, protocol, group in _sweep(_index(records, 'global_ip', 'global_port')):
+        ranges = {(start, end) for start, end, _ in group}
+        kind = DUPLICATE if len(ranges) == 1 else OVERLAP
+        conflicts.append(Conflict(kind, device, ip, protocol, group[0][0],
+                                  max(end for _, end, _ in group),
+                                  tuple(sorted(rule for _, _, rule in group))))
+
+    for device, ip, protocol, group in _sweep(_index(records, 'inside_ip', 'inside_port')):
+        rules = tuple(sorted(rule for _, _, rule in group))
+        endpoints = {(records[rule].get('global_ip'), records[rule].get('global_port')) for rule in rules}
+        if len(endpoints) < 2:
+            continue
+        conflicts.append(Conflict(INSIDE, device, ip, protocol, group[0][0],
+                                  max(end for _, end, _ in group), rules))
+
+    kind_order = list(CONFLICT_KINDS)
+    conflicts.sort(key=lambda c: (kind_order.index(c.kind), c.device, _ip_key(c.ip),
+                                  c.protocol, c.start, c.rules))
+    return conflicts
+
+
+def describe_rule(record: Dict) -> str:
+    """冲突列表中显示的规则摘要：名称 全局IP:端口 -> 内部IP:端口"""
+    name = record.get('name', record.get('rule', '-'))
+    return (f"{name} {record.get('global_ip')}:{record.get('global_port')}"
+            f" -> {record.get('inside_ip')}:{record.get('inside_port')}")
@@ -0,0 +1,289 @@
+"""
+NAT配置多进程解析模块
+批量解析目录中的华为/H3C配置文件：逐个识别厂商和设备名称，较大的文件按行边界
+切分为字节范围，在进程池中并行解析后按文件顺序合并，每条记录标注来源设备
+"""
+import mmap
+import os
+import re
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import islice, repeat
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .nat_parser import NATParser, _decode_line
+
+# 每个分片的字节数，小于该大小的配置文件作为一个分片解析
+CHUNK_SIZE = 4 * 1024 * 1024
+# 识别厂商时检查的 nat server 命令数
+DETECT_SAMPLE = 200
+# 在文件开头查找厂商特征的字节数
+HEADER_SIZE = 64 * 1024
+
+_SYSNAME = re.compile(rb'^[ \t]*sysname[ \t]+([^\r\n]+)', re.M)
+# nat server 之后的第一个单元：H3C为 protocol/global，华为为服务器名称
+_NAT_SERVER = re.compile(rb'^[ \t]*nat server[ \t]+(\S+)', re.M)
+_H3C_HINT = re.compile(rb'Comware|H3C|^[ \t]*version \d+\.\d+\.\d+, (?:Release|ESS)', re.M)
+_HUAWEI_HINT = re.compile(rb'HUAWEI|Huawei|VRP|^!Software Version V\d', re.M)
+
+
+def list_config_files(directory: str) -> List[str]:
+    """递归列出目录中的所有文件，按路径排序"""
+    paths = []
+    for root, _, files in os.walk(directory):
+        paths.extend(os.path.join(root, name) for name in files)
+    return sorted(paths)
+
+
+def detect_config(path: str) -> Tuple[Optional[str], str]:
+    """
+    识别配置文件的厂商和设备名称（在工作进程中运行）
+
+    厂商按 nat server 之后的第一个单元投票：H3C命令直接跟 protocol/global，
+    华为命令先跟服务器名称；票数相同时按文件开头的版本信息判断。
+
+    Returns:
+        Tuple[Optional[str], str]: (huawei/h3c，没有 nat server 命令时为None, 设备名称)，
+                                   设备名称取 sysname，没有时取文件名
+    """
+    device = os.path.splitext(os.path.basename(path))[0]
+    if os.path.getsize(path) == 0:
+        return None, device
+
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        match = _SYSNAME.search(data)
+        if match:
+            device = _decode_line(match.group(1)).strip() or device
+
+        huawei_votes = h3c_votes = 0
+        for match in islice(_NAT_SERVER.finditer(data), DETECT_SAMPLE):
+            if match.group(1) in (b'protocol', b'global'):
+                h3c_votes += 1
+            else:
+                huawei_votes += 1
+        if not huawei_votes and not h3c_votes:
+            return None, device
+        if huawei_votes != h3c_votes:
+            return ("h3c" if h3c_votes > huawei_votes else "huawei"), device
+
+        header = data[:HEADER_SIZE]
+        if _H3C_HINT.search(header) and not _HUAWEI_HINT.search(header):
+            return "h3c", device
+        return "huawei", device
+
+
+def split_config(path: str, chunk_size: int = CHUNK_SIZE) -> List[Tuple[int, int]]:
+    """
+    按行边界将文件切分为字节范围
+
+    Returns:
+        List[Tuple[int, int]]: (起始偏移, 结束偏移) 列表，首尾相接覆盖整个文件
+    """
+    file_size = os.path.getsize(path)
+    boundaries = [0]
+    with open(path, 'rb') as f:
+        position = chunk_size
+        while position < file_size:
+            f.seek(position)
+            f.readline()
+            boundary = f.tell()
+            if boundary >= file_size:
+                break
+            boundaries.append(boundary)
+            position = boundary + chunk_size
+    boundaries.append(file_size)
+    return list(zip(boundaries, boundaries[1:]))
+
+
+def _iter_range(path: str, start: int, stop: int, device_type: str):
+    """逐条生成文件 [start, stop) 范围内的解析结果，与 NATParser.iter_config 相同"""
+    with open(path, 'rb') as f:
+        f.seek(start)
+        lines = f.read(stop - start).split(b'\n')
+    return NATParser.iter_config(lines, device_type)
+
+
+def parse_config_range(path: str, start: int, stop: int, device_type: str,
+                       device: str) -> Tuple[List[Tuple[Tuple[str, ...], List[tuple]]], List[str]]:
+    """
+    解析文件 [start, stop) 范围内的NAT配置（在工作进程中运行）
+
+    解析结果按字段相同的连续记录分段，以 (字段名, 字段值元组列表) 返回，
+    字段名每段只传递一次，减少结果在进程间传递的数据量；
+    字段包含 device/device_type，主进程可直接还原为字典。
+
+    Returns:
+        Tuple: ([(字段名元组, 字段值元组列表), ...], 解析失败的命令列表)
+    """
+    runs = []
+    failed_entries = []
+    previous = None
+    values = None
+    tag = (device, device_type)
+    for parsed, line in _iter_range(path, start, stop, device_type):
+        if parsed:
+            keys = tuple(parsed)
+            if keys != previous:
+                previous = keys
+                values = []
+                runs.append((keys + ('device', 'device_type'), values))
+            values.append(tuple(parsed.values()) + tag)
+        else:
+            failed_entries.append(line)
+    return runs, failed_entries
+
+
+def _merge_chunk(chunk, device: str, data: List[Dict], failed_entries: List[Tuple[str, str]]) -> None:
+    """将 parse_config_range 的结果还原为字典"""
+    runs, failed = chunk
+    for keys, values in runs:
+        data.extend(map(dict, map(zip, repeat(keys), values)))
+    failed_entries.extend((device, line) for line in failed)
+
+
+def parse_config_dir(directory: str, workers: int,
+                     progress_callback: Optional[Callable[[Dict], None]] = None,
+                     is_cancelled: Optional[Callable[[], bool]] = None,
+                     poll_interval: float = 0.2) -> Dict:
+    """
+    解析目录中的所有配置文件，workers 大于1时使用多个进程
+
+    每个文件先识别厂商和设备名称，识别完成后立即按行边界切分并提交解析任务。
+    各分片的结果按文件顺序、文件内偏移顺序合并，与逐个文件顺序解析的结果一致。
+    无法读取或解析出错的文件（如失效的符号链接、解析期间被删除的文件）跳过，
+    不影响其他文件。取消时停止调度，只返回已完成的部分。
+
+    只有一个工作进程时在当前进程中逐个解析，省去进程间传递结果的开销。
+
+    Args:
+        directory: 配置文件目录
+        workers: 工作进程数
+        progress_callback: 进度回调，参数为包含 offset/total 的字典，
+                           offset 为已解析完成的字节数
+        is_cancelled: 返回True时停止解析
+        poll_interval: 检查取消请求的间隔（秒）
+
+    Returns:
+        Dict: data 为合并后的解析结果，failed_entries 为 (设备名称, 命令) 列表，
+              files 为各文件的 (路径, 厂商, 设备名称)，errors 为跳过的 (路径, 错误信息)，
+              cancelled 表示是否被取消
+    """
+    paths = []
+    sizes = []
+    errors = {}
+    for path in list_config_files(directory):
+        try:
+            sizes.append(os.path.getsize(path))
+            paths.append(path)
+        except OSError as e:
+            errors[path] = str(e)
+    total = sum(sizes)
+    files: List[Optional[Tuple[str, Optional[str], str]]] = [None] * len(paths)
+    data = []
+    failed_entries = []
+
+    if workers <= 1:
+        cancelled = _parse_files_inline(paths, files, data, failed_entries, errors,
+                                        progress_callback, is_cancelled, total)
+    else:
+        # (文件序号, 分片序号) -> parse_config_range 的结果
+        results = {}
+        cancelled = _parse_files_pooled(paths, sizes, files, results, errors, workers,
+                                        progress_callback, is_cancelled, poll_interval, total)
+        for index, chunk in sorted(results):
+            if paths[index] in errors:
+                # 部分分片出错的文件整体跳过
+                continue
+            _merge_chunk(results[index, chunk], files[index][2], data, failed_entries)
+
+    return {
+        'data': data,
+        'failed_entries': failed_entries,
+        'files': [info for info in files if info is not None and info[0] not in errors],
+        'errors': sorted(errors.items()),
+        'cancelled': cancelled,
+    }
+
+
+def _parse_files_inline(paths, files, data, failed_entries, errors, progress_callback,
+                        is_cancelled, total) -> bool:
+    """在当前进程中逐个文件解析，结果直接写入 data/failed_entries，返回是否被取消"""
+    done_bytes = 0
+    for index, path in enumerate(paths):
+        file_data = []
+        file_failed = []
+        try:
+            device_type, device = detect_config(path)
+            ranges = split_config(path) if device_type is not None else []
+            for start, stop in ranges:
+                for parsed, line in _iter_range(path, start, stop, device_type):
+                    if parsed:
+                        parsed['device'] = device
+                        parsed['device_type'] = device_type
+                        file_data.append(parsed)
+                    else:
+                        file_failed.append((device, line))
+                done_bytes += stop - start
+                if is_cancelled is not None and is_cancelled():
+                    return True
+                if progress_callback is not None:
+                    progress_callback({'offset': done_bytes, 'total': total})
+        except Exception as e:
+            errors[path] = str(e)
+            continue
+        files[index] = (path, device_type, device)
+        data.extend(file_data)
+        failed_entries.extend(file_failed)
+    return False
+
+
+def _parse_files_pooled(paths, sizes, files, results, errors, workers, progress_callback,
+                        is_cancelled, poll_interval, total) -> bool:
+    """在进程池中识别并解析各文件，返回是否被取消"""
+    done_bytes = 0
+    cancelled = False
+    executor = ProcessPoolExecutor(max_workers=workers)
+    try:
+        # 任务键：('detect', 文件序号) 或 ('parse', 文件序号, 分片序号)
+        futures = {executor.submit(detect_config, path): ('detect', index)
+                   for index, path in enumerate(paths)}
+        chunk_sizes = {}
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, timeout=poll_interval, return_when=FIRST_COMPLETED)
+            for future in done:
+                key = futures.pop(future)
+                index = key[1]
+                path = paths[index]
+                if key[0] == 'parse':
+                    done_bytes += chunk_sizes.pop(key)
+                    try:
+                        results[key[1:]] = future.result()
+                    except Exception as e:
+                        errors.setdefault(path, str(e))
+                    continue
+
+                try:
+                    device_type, device = future.result()
+                    files[index] = (path, device_type, device)
+                    ranges = split_config(path) if device_type is not None else []
+                except Exception as e:
+                    errors[path] = str(e)
+                    ranges = []
+                if not ranges:
+                    done_bytes += sizes[index]
+                for chunk, (start, stop) in enumerate(ranges):
+                    parse_key = ('parse', index, chunk)
+                    parse_future = executor.submit(parse_config_range, path, start, stop,
+                                                   device_type, device)
+                    futures[parse_future] = parse_key
+                    chunk_sizes[parse_key] = stop - start
+                    pending.add(parse_future)
+
+            if is_cancelled is not None and is_cancelled():
+                cancelled = True
+                break
+            if done and progress_callback is not None:
+                progress_callback({'offset': done_bytes, 'total': total})
+    finally:
+        executor.shutdown(wait=not cancelled, cancel_futures=True)
+    return cancelled
@@ -1,202 +1,307 @@
+import os
 import re
-from typing import Optional, Dict, List
+from typing import Optional, Dict, Iterable, Iterator, List, Tuple, Union
+
+# 带引号的标识符，如 "web server"
+_QUOTED_NAME = re.compile(r'"([^"]+)"')
+_QUOTED_PLACEHOLDER = 'QUOTED_NAME_'
+
+# H3C命令中提取取值的关键字
+_H3C_KEYWORDS = frozenset(('protocol', 'global', 'inside', 'rule', 'description', 'vrrp'))
+# description 文本在这些单元之前结束
+_H3C_DESCRIPTION_END = ('counting', 'reversible')
+_LEADING_DIGITS = re.compile(r'\d+')
+
+
+def _token_text(command: str, tokens: List[str], first: int, stop: int) -> str:
+    """
+    原命令中从 tokens[first] 开始、到 tokens[stop-1] 结束的文本，保留其中的空白
+
+    逐个查找之前的单元得到字符位置；stop 为单元总数时取到命令末尾。
+    """
+    position = 0
+    for token in tokens[:first]:
+        position = command.find(token, position) + len(token)
+    start = end = command.find(tokens[first], position)
+    if stop >= len(tokens):
+        return command[start:]
+    for token in tokens[first:stop]:
+        end = command.find(token, end) + len(token)
+    return command[start:end]
+
+
+def _leading_digits(token: str) -> str:
+    """单元开头的数字，没有时返回空字符串"""
+    if token.isdecimal():
+        return token
+    match = _LEADING_DIGITS.match(token)
+    return match.group() if match else ''
+
+
+def _decode_line(line: bytes) -> str:
+    """解码配置文件中的一行，UTF-8失败时按GB18030（兼容GBK）解码"""
+    try:
+        return line.decode('utf-8')
+    except UnicodeDecodeError:
+        return line.decode('gb18030', errors='replace')
+
 
 class NATParser:
     @staticmethod
     def parse_huawei_command(command: str) -> Optional[Dict]:
-        """解析华为NAT Server命令"""
-        # 预处理命令，处理带引号的标识符
-        processed_command = command
-        quoted_names = re.findall(r'"([^"]+)"', command)
+        """
+        解析华为NAT Server命令
+
+        命令先拆分为词法单元，再依次按以下格式匹配，取第一个匹配的格式：
+        1. 两个标识符：nat server id1 id2 [zone z] protocol p global ip [port] inside ip [port]
+        2. 单个标识符：nat server id [zone z] protocol p global ip [port] inside ip [port]
+        3. 两个标识符且没有protocol：nat server id1 id2 global ip inside ip
+        4. 简化格式：nat server id global ip inside ip
+        inside之后的no-reverse、acl等后缀忽略。
+        """
+        if command[:10] != 'nat server' or not command[10:11].isspace():
+            return None
+
+        tokens, quoted_names = NATParser._tokenize_huawei(command)
+        # 去掉 nat server 两个单元
+        fields = NATParser._match_huawei(tokens[2:])
+        if fields is None:
+            return None
 
-        # 临时替换带引号的标识符，以便正则表达式处理
+        name, protocol, global_ip, global_port, inside_ip, inside_port = fields
+        # 还原带引号的标识符
         for i, quoted_name in enumerate(quoted_names):
-            placeholder = f"QUOTED_NAME_{i}"
-            processed_command = processed_command.replace(f'"{quoted_name}"', placeholder)
-
-        # 尝试多种模式匹配
-        result = None
-
-        # 模式1: 两个标识符格式 - nat server id1 id2 protocol ...
-        pattern1 = r'nat server\s+(\S+)\s+(\S+)(?:\s+zone\s+\S+)?\s+protocol\s+(\S+)\s+global\s+(\S+)(?:\s+(\S+))?\s+inside\s+(\S+)(?:\s+(\S+))?(?:\s+no-reverse|\s+acl\s+\d+|\s+reversible)*'
-        match = re.match(pattern1, processed_command)
-        if match:
-            id1 = match.group(1)
-            id2 = match.group(2)
-            protocol = match.group(3)
-            global_ip = match.group(4)
-            global_port = match.group(5).strip() if match.group(5) else 'any'
-            inside_ip = match.group(6)
-            inside_port = match.group(7).strip() if match.group(7) else 'any'
-
-            # 还原带引号的标识符
-            for i, quoted_name in enumerate(quoted_names):
-                placeholder = f"QUOTED_NAME_{i}"
-                if id1 == placeholder:
-                    id1 = quoted_name
-
-            # 将第一个标识符作为名称
-            name = id1
-
-            result = {
-                'name': name,
-                'protocol': protocol,
-                'global_ip': global_ip,
-                'global_port': global_port,
-                'inside_ip': inside_ip,
-                'inside_port': inside_port,
-                'command': command
-            }
-
-        # 模式2: 单个标识符 + protocol 格式 - nat server id protocol ...
-        if not result:
-            pattern2 = r'nat server\s+(\S+)(?:\s+zone\s+\S+)?\s+protocol\s+(\S+)\s+global\s+(\S+)(?:\s+(\S+))?\s+inside\s+(\S+)(?:\s+(\S+))?(?:\s+no-reverse|\s+acl\s+\d+|\s+reversible)*'
-            match = re.match(pattern2, processed_command)
-            if match:
-                name = match.group(1)
-                protocol = match.group(2)
-                global_ip = match.group(3)
-                global_port = match.group(4).strip() if match.group(4) else 'any'
-                inside_ip = match.group(5)
-                inside_port = match.group(6).strip() if match.group(6) else 'any'
-
-                # 还原带引号的标识符
-                for i, quoted_name in enumerate(quoted_names):
-                    placeholder = f"QUOTED_NAME_{i}"
-                    if name == placeholder:
-                        name = quoted_name
-
-                result = {
-                    'name': name,
-                    'protocol': protocol,
-                    'global_ip': global_ip,
-                    'global_port': global_port,
-                    'inside_ip': inside_ip,
-                    'inside_port': inside_port,
-                    'command': command
-                }
-
-        # 模式3: 两个标识符但没有protocol关键字 - nat server id1 id2 global ... inside ...
-        if not result:
-            pattern3 = r'nat server\s+(\S+)\s+(\S+)\s+global\s+(\S+)\s+inside\s+(\S+)(?:\s+no-reverse|\s+acl\s+\d+|\s+reversible)*'
-            match = re.match(pattern3, processed_command)
-            if match:
-                id1 = match.group(1)
-                global_ip = match.group(3)
-                inside_ip = match.group(4)
-
-                # 还原带引号的标识符
-                for i, quoted_name in enumerate(quoted_names):
-                    placeholder = f"QUOTED_NAME_{i}"
-                    if id1 == placeholder:
-                        id1 = quoted_name
-
-                # 将第一个标识符作为名称
-                name = id1
-
-                result = {
-                    'name': name,
-                    'protocol': 'any',
-                    'global_ip': global_ip,
-                    'global_port': 'any',
-                    'inside_ip': inside_ip,
-                    'inside_port': 'any',
-                    'command': command
-                }
-
-        # 模式4: 简化格式 - nat server id global ... inside ...
-        if not result:
-            pattern4 = r'nat server\s+(\S+)\s+global\s+(\S+)\s+inside\s+(\S+)(?:\s+no-reverse|\s+acl\s+\d+|\s+reversible)*'
-            match = re.match(pattern4, processed_command)
-            if match:
-                name = match.group(1)
-                global_ip = match.group(2)
-                inside_ip = match.group(3)
-
-                # 还原带引号的标识符
-                for i, quoted_name in enumerate(quoted_names):
-                    placeholder = f"QUOTED_NAME_{i}"
-                    if name == placeholder:
-                        name = quoted_name
-
-                result = {
-                    'name': name,
-                    'protocol': 'any',
-                    'global_ip': global_ip,
-                    'global_port': 'any',
-                    'inside_ip': inside_ip,
-                    'inside_port': 'any',
-                    'command': command
-                }
-
-        return result
+            if name == f"{_QUOTED_PLACEHOLDER}{i}":
+                name = quoted_name
+
+        return {
+            'name': name,
+            'protocol': protocol,
+            'global_ip': global_ip,
+            'global_port': global_port,
+            'inside_ip': inside_ip,
+            'inside_port': inside_port,
+            'command': command
+        }
 
     @staticmethod
-    def parse_h3c_command(command: str) -> Optional[Dict]:
-        """解析H3C NAT Server命令"""
-        # 尝试多种模式匹配
-        result = None
+    def _tokenize_huawei(command: str) -> Tuple[List[str], List[str]]:
+        """
+        按空白拆分命令，带引号的标识符作为一个单元
+
+        带引号的单元以占位符 QUOTED_NAME_<序号> 表示，序号为该标识符在
+        quoted_names 中首次出现的位置。引号与其他字符相连、引号不成对等
+        特殊写法按原有的占位符替换规则处理，保持解析结果不变。
+
+        Returns:
+            (tokens, quoted_names): 词法单元列表，以及按出现顺序排列的带引号标识符
+        """
+        if '"' not in command:
+            return command.split(), []
+
+        # 拆分结果为 [引号外, 引号内, 引号外, ...]
+        parts = _QUOTED_NAME.split(command)
+        quoted_names = parts[1::2]
+        if command.count('"') == 2 * len(quoted_names) and _QUOTED_PLACEHOLDER not in command:
+            tokens = parts[0].split()
+            first_index = {}
+            for i in range(1, len(parts), 2):
+                quoted_name, before, after = parts[i], parts[i - 1], parts[i + 1]
+                # 引号必须与前后的内容以空白分隔，且引号内首尾不含空白
+                if (not before[-1:].isspace() or (after and not after[0].isspace())
+                        or quoted_name[0].isspace() or quoted_name[-1].isspace()):
+                    break
+                index = first_index.setdefault(quoted_name, i // 2)
+                tokens.append(f"{_QUOTED_PLACEHOLDER}{index}")
+                tokens.extend(after.split())
+            else:
+                return tokens, quoted_names
+
+        # 临时替换带引号的标识符
+        processed_command = command
+        for i, quoted_name in enumerate(quoted_names):
+            processed_command = processed_command.replace(f'"{quoted_name}"', f"{_QUOTED_PLACEHOLDER}{i}")
+        return processed_command.split(), quoted_names
 
-        # 提取命令中的关键参数
-        protocol_match = re.search(r'protocol\s+(\S+)', command)
-        protocol = protocol_match.group(1) if protocol_match else 'any'
+    @staticmethod
+    def _match_huawei(tokens: List[str]) -> Optional[Tuple[str, str, str, str, str, str]]:
+        """
+        按 parse_huawei_command 说明的四种格式依次匹配 nat server 之后的词法单元
+
+        Returns:
+            (名称, 协议, 全局IP, 全局端口, 内部IP, 内部端口)，都不匹配时返回None
+        """
+        count = len(tokens)
+
+        # 格式1、2：标识符之后为可选的 zone 与 protocol ... global ... inside ...
+        for start in (2, 1):
+            position = start + 2 if start < count and tokens[start] == 'zone' else start
+            if (position + 3 >= count or tokens[position] != 'protocol'
+                    or tokens[position + 2] != 'global'):
+                continue
+            # global之后优先把下一个单元作为端口
+            if position + 6 < count and tokens[position + 5] == 'inside':
+                global_port = tokens[position + 4]
+                inside = position + 6
+            elif position + 5 < count and tokens[position + 4] == 'inside':
+                global_port = 'any'
+                inside = position + 5
+            else:
+                continue
+            inside_port = tokens[inside + 1] if inside + 1 < count else 'any'
+            return (tokens[0], tokens[position + 1], tokens[position + 3], global_port,
+                    tokens[inside], inside_port)
 
-        global_ip_match = re.search(r'global\s+(\S+)', command)
-        global_ip = global_ip_match.group(1) if global_ip_match else None
+        # 格式3：两个标识符但没有protocol
+        if count >= 6 and tokens[2] == 'global' and tokens[4] == 'inside':
+            return tokens[0], 'any', tokens[3], 'any', tokens[5], 'any'
 
-        inside_ip_match = re.search(r'inside\s+(\S+)', command)
-        inside_ip = inside_ip_match.group(1) if inside_ip_match else None
+        # 格式4：简化格式
+        if count >= 5 and tokens[1] == 'global' and tokens[3] == 'inside':
+            return tokens[0], 'any', tokens[2], 'any', tokens[4], 'any'
 
-        rule_match = re.search(r'rule\s+(\S+)', command)
-        rule = rule_match.group(1) if rule_match else '-'
+        return None
 
-        description_match = re.search(r'description\s+(.+?)(?:\s+counting|\s+reversible|$)', command)
-        description = description_match.group(1) if description_match else '-'
+    @staticmethod
+    def parse_h3c_command(command: str) -> Optional[Dict]:
+        """
+        解析H3C NAT Server命令
+
+        一次遍历词法单元找出关键字的位置，每个关键字取第一次出现的位置：
+        protocol、global、inside、rule、vrrp 取下一个单元，
+        description 取到 counting/reversible 或行尾为止的原始文本。
+        指定了协议时，global/inside 之后的一个或两个数字为端口或端口范围。
+        """
+        tokens = command.split()
+        last = len(tokens) - 1
+        positions = [i for i, token in enumerate(tokens) if token in _H3C_KEYWORDS and i < last]
+
+        values = {}
+        global_positions = []
+        for i in positions:
+            keyword = tokens[i]
+            if keyword == 'global':
+                global_positions.append(i)
+            if keyword in values:
+                continue
+            if keyword == 'description':
+                end = i + 2
+                while end <= last and not tokens[end].startswith(_H3C_DESCRIPTION_END):
+                    end += 1
+                values[keyword] = _token_text(command, tokens, i + 1, end)
+            elif keyword == 'vrrp':
+                # vrrp 之后须为数字
+                vrrp = _leading_digits(tokens[i + 1])
+                if vrrp:
+                    values[keyword] = vrrp
+            else:
+                values[keyword] = tokens[i + 1]
 
-        vrrp_match = re.search(r'vrrp\s+(\d+)', command)
-        vrrp = vrrp_match.group(1) if vrrp_match else '-'
+        if 'description' not in values and last >= 0 and tokens[last] == 'description':
+            # 行尾的 description 之后只有空白时，与原正则一致取最后一个空白字符
+            trailing = command[command.rfind('description') + len('description'):]
+            if len(trailing) > 1:
+                values['description'] = trailing[-1]
 
+        global_ip = values.get('global')
+        inside_ip = values.get('inside')
         # 如果缺少必要的参数，返回None
         if not global_ip or not inside_ip:
             return None
 
-        # 提取端口信息
-        # 模式1: 单端口
+        protocol = values.get('protocol', 'any')
         global_port = 'any'
         inside_port = 'any'
 
         # 检查是否有端口信息
         if protocol != 'any':
-            # 尝试匹配双端口格式
-            double_port_match = re.search(r'global\s+\S+\s+(\d+)\s+(\d+)\s+inside\s+\S+\s+(\d+)\s+(\d+)', command)
-            if double_port_match:
-                global_port_start = double_port_match.group(1)
-                global_port_end = double_port_match.group(2)
-                inside_port_start = double_port_match.group(3)
-                inside_port_end = double_port_match.group(4)
-                global_port = f"{global_port_start}-{global_port_end}"
-                inside_port = f"{inside_port_start}-{inside_port_end}"
-            else:
-                # 尝试匹配单端口格式
-                single_port_match = re.search(r'global\s+\S+\s+(\d+)\s+inside\s+\S+\s+(\d+)', command)
-                if single_port_match:
-                    global_port = single_port_match.group(1)
-                    inside_port = single_port_match.group(2)
-
-        # 构建结果
-        result = {
+            ports = NATParser._match_h3c_ports(tokens, global_positions)
+            if ports:
+                global_port, inside_port = ports
+
+        return {
             'protocol': protocol,
             'global_ip': global_ip,
             'global_port': global_port,
             'inside_ip': inside_ip,
             'inside_port': inside_port,
-            'vrrp': vrrp,
-            'rule': rule,
-            'description': description,
+            'vrrp': values.get('vrrp', '-'),
+            'rule': values.get('rule', '-'),
+            'description': values.get('description', '-'),
             'command': command
         }
 
-        return result
+    @staticmethod
+    def _match_h3c_ports(tokens: List[str], global_positions: List[int]) -> Optional[Tuple[str, str]]:
+        """
+        匹配 global 地址 端口 [端口] inside 地址 端口 [端口] 格式的端口
+
+        优先匹配两侧各两个端口的端口范围，其次为单端口。inside 一侧的
+        最后一个端口只取开头的数字，其余端口须为完整的数字。
+
+        Returns:
+            Optional[Tuple[str, str]]: (全局端口, 内部端口)，不匹配时返回None
+        """
+        count = len(tokens)
+        # 端口范围：global ip p1 p2 inside ip p3 p4
+        for i in global_positions:
+            if (i + 7 < count and tokens[i + 4] == 'inside' and tokens[i + 2].isdecimal()
+                    and tokens[i + 3].isdecimal() and tokens[i + 6].isdecimal()):
+                last_port = _leading_digits(tokens[i + 7])
+                if last_port:
+                    return (f"{tokens[i + 2]}-{tokens[i + 3]}",
+                            f"{tokens[i + 6]}-{last_port}")
+        # 单端口：global ip p1 inside ip p2
+        for i in global_positions:
+            if i + 5 < count and tokens[i + 3] == 'inside' and tokens[i + 2].isdecimal():
+                last_port = _leading_digits(tokens[i + 5])
+                if last_port:
+                    return tokens[i + 2], last_port
+        return None
+
+    @staticmethod
+    def iter_config(source: Union[str, os.PathLike, Iterable[Union[str, bytes]]],
+                    device_type: str) -> Iterator[Tuple[Optional[Dict], str]]:
+        """
+        逐行解析NAT配置，边读取边生成结果
+
+        Args:
+            source: 配置文件路径，或逐行产生文本的可迭代对象（如打开的文件）。
+                    行可以是 str 或 bytes，bytes 行只在包含 nat server 时才解码，
+                    优先按UTF-8解码，失败时按GB18030解码
+            device_type: 设备类型，huawei 或 h3c
+
+        Yields:
+            Tuple[Optional[Dict], str]: (解析结果, 去除首尾空白的命令)，解析失败时结果为None
+        """
+        if isinstance(source, (str, os.PathLike)):
+            with open(source, 'rb') as f:
+                yield from NATParser.iter_config(f, device_type)
+            return
+
+        if device_type == "huawei":
+            parse_command = NATParser.parse_huawei_command
+        else:  # h3c
+            parse_command = NATParser.parse_h3c_command
+
+        for line in source:
+            # 大多数配置行与NAT无关，先用子串判断跳过
+            if isinstance(line, bytes):
+                if b'nat server' not in line:
+                    continue
+                line = _decode_line(line)
+            elif 'nat server' not in line:
+                continue
+            line = line.strip()
+            if not line.startswith('nat server'):
+                continue
+            try:
+                parsed = parse_command(line)
+            except Exception as e:
+                # 记录异常信息以便调试
+                print(f"解析错误: {line}, 异常: {str(e)}")
+                parsed = None
+            yield parsed, line
 
     @staticmethod
     def parse_config(text: str, device_type: str) -> tuple[list, list]:
@@ -204,26 +309,10 @@ class NATParser:
         data = []
         failed_entries = []
 
-        for line in text.split('\n'):
-            line = line.strip()
-            if line.startswith('nat server'):
-                try:
-                    if device_type == "huawei":
-                        # 保存原始命令
-                        original_command = line
-                        # 直接使用原始命令进行解析，不再移除后缀
-                        # 因为parse_huawei_command已经能处理这些情况
-                        parsed = NATParser.parse_huawei_command(original_command)
-                    else:  # h3c
-                        parsed = NATParser.parse_h3c_command(line)
-
-                    if parsed:
-                        data.append(parsed)
-                    else:
-                        failed_entries.append(line)
-                except Exception as e:
-                    # 记录异常信息以便调试
-                    print(f"解析错误: {line}, 异常: {str(e)}")
-                    failed_entries.append(line)
-
-        return data, failed_entries
\ No newline at end of file
+        for parsed, line in NATParser.iter_config(text.split('\n'), device_type):
+            if parsed:
+                data.append(parsed)
+            else:
+                failed_entries.append(line)
+
+        return data, failed_entries
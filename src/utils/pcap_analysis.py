@@ -0,0 +1,131 @@
+"""
+PCAP分析模块
+将抓包文件汇总为流量表，支持进度报告和协作式取消
+"""
+import os
+import time
+from typing import Callable, Dict, Optional
+
+from .flow_table import FlowTable
+from .logger import logger
+from .pcap_parallel import analyze_pcap_parallel
+from .pcap_reader import PcapReader, iter_scapy_packets
+
+# 每处理多少个数据包检查一次取消和进度
+CHECK_INTERVAL = 0x4000
+
+# 启用多进程分析的最小文件大小
+PARALLEL_MIN_SIZE = 64 * 1024 * 1024
+
+
+def analyze_pcap_file(path: str,
+                      progress_callback: Optional[Callable[[Dict], None]] = None,
+                      is_cancelled: Optional[Callable[[], bool]] = None,
+                      progress_interval: float = 0.2,
+                      snapshot_interval: float = 2.0,
+                      workers: int = 1) -> Dict:
+    """
+    读取pcap文件并逐包汇总到流量表
+
+    Args:
+        path: 文件路径
+        progress_callback: 进度回调，参数为包含 offset/total/packets 的字典，
+                           每隔 snapshot_interval 秒附带 columns（当前流量表的列式快照）
+        is_cancelled: 返回True时停止读取，保留已汇总的结果
+        progress_interval: 进度回调的最小间隔（秒）
+        snapshot_interval: 附带部分结果的最小间隔（秒）
+        workers: 工作进程数，大于1且文件为较大的经典pcap时按分片多进程分析
+
+    Returns:
+        Dict: 包含 flow_table、decoder、cancelled、packets、elapsed、file_size 的结果，
+              多进程分析时 packets 为None
+    """
+    start_time = time.perf_counter()
+    file_size = os.path.getsize(path)
+    flow_table = FlowTable()
+
+    try:
+        reader = PcapReader(path)
+    except ValueError as e:
+        # 内置解析器不支持的格式或链路类型，交给scapy逐包解析
+        logger.info(f"内置解析器无法处理 {path}: {str(e)}，使用scapy解析")
+        reader = None
+        decoder = 'scapy'
+        packets = iter_scapy_packets(path)
+    else:
+        if workers > 1 and not reader.is_pcapng and file_size >= PARALLEL_MIN_SIZE:
+            reader.close()
+            return _analyze_parallel(path, workers, progress_callback, is_cancelled, start_time)
+        decoder = 'mmap'
+        packets = iter(reader)
+
+    cancelled = False
+    count = 0
+    last_progress = last_snapshot = start_time
+    add = flow_table.add
+    try:
+        for count, (protocol, src, dst, flags, size) in enumerate(packets, 1):
+            add(protocol, src, dst, flags, size)
+            if count % CHECK_INTERVAL:
+                continue
+            if is_cancelled is not None and is_cancelled():
+                cancelled = True
+                break
+            if progress_callback is None:
+                continue
+            now = time.perf_counter()
+            if now - last_progress < progress_interval:
+                continue
+            last_progress = now
+            progress = {
+                'offset': reader.offset if reader is not None else None,
+                'total': file_size,
+                'packets': count,
+            }
+            if now - last_snapshot >= snapshot_interval:
+                last_snapshot = now
+                progress['columns'] = flow_table.to_columns()
+            progress_callback(progress)
+    finally:
+        if reader is not None:
+            reader.close()
+
+    elapsed = time.perf_counter() - start_time
+    logger.info(
+        f"pcap解析{'已取消' if cancelled else '完成'}({decoder}): {path}，"
+        f"{file_size / 1024 / 1024:.1f}MB，{count} 个数据包，{len(flow_table)} 条流，"
+        f"耗时 {elapsed:.2f}s ({file_size / 1024 / 1024 / max(elapsed, 1e-6):.1f}MB/s)"
+    )
+    return {
+        'flow_table': flow_table,
+        'decoder': decoder,
+        'cancelled': cancelled,
+        'packets': count,
+        'elapsed': elapsed,
+        'file_size': file_size,
+    }
+
+
+def _analyze_parallel(path: str, workers: int,
+                      progress_callback: Optional[Callable[[Dict], None]],
+                      is_cancelled: Optional[Callable[[], bool]],
+                      start_time: float) -> Dict:
+    """多进程分析经典pcap文件"""
+    file_size = os.path.getsize(path)
+    flow_table, cancelled = analyze_pcap_parallel(
+        path, workers, progress_callback=progress_callback, is_cancelled=is_cancelled
+    )
+    elapsed = time.perf_counter() - start_time
+    logger.info(
+        f"pcap解析{'已取消' if cancelled else '完成'}(mmap x{workers}): {path}，"
+        f"{file_size / 1024 / 1024:.1f}MB，{len(flow_table)} 条流，"
+        f"耗时 {elapsed:.2f}s ({file_size / 1024 / 1024 / max(elapsed, 1e-6):.1f}MB/s)"
+    )
+    return {
+        'flow_table': flow_table,
+        'decoder': f'mmap x{workers}',
+        'cancelled': cancelled,
+        'packets': None,
+        'elapsed': elapsed,
+        'file_size': file_size,
+    }
@@ -0,0 +1,127 @@
+"""
+PCAP多进程分析模块
+按记录边界将经典pcap文件切分为字节范围，在进程池中并行汇总后按文件顺序合并
+"""
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .flow_table import FlowTable
+from .pcap_reader import PcapReader
+
+# 每个工作进程分配的分片数，分片越多负载越均衡、进度越平滑
+SHARDS_PER_WORKER = 4
+
+
+def split_pcap(path: str, shards: int) -> List[Tuple[int, int]]:
+    """
+    按记录边界将经典pcap文件切分为字节范围
+
+    Args:
+        path: 文件路径
+        shards: 期望的分片数
+
+    Returns:
+        List[Tuple[int, int]]: (起始偏移, 结束偏移) 列表，首尾相接覆盖全部记录
+
+    Raises:
+        ValueError: 文件不是经典pcap格式时抛出
+    """
+    with PcapReader(path) as reader:
+        if reader.is_pcapng:
+            raise ValueError("仅支持按字节范围切分经典pcap文件")
+        file_size = reader.file_size
+        step = max((file_size - 24) // max(shards, 1), 1)
+
+        boundaries = [24]
+        for i in range(1, shards):
+            boundary = reader.find_record_boundary(24 + step * i)
+            if boundary > boundaries[-1]:
+                boundaries.append(boundary)
+        if boundaries[-1] < file_size:
+            boundaries.append(file_size)
+
+    return list(zip(boundaries, boundaries[1:]))
+
+
+def analyze_pcap_range(path: str, start: int, stop: int) -> FlowTable:
+    """
+    汇总起始位置位于 [start, stop) 内的记录（在工作进程中运行）
+
+    Args:
+        path: 文件路径
+        start: 起始偏移（记录边界）
+        stop: 结束偏移
+
+    Returns:
+        FlowTable: 该分片的流量表
+    """
+    flow_table = FlowTable()
+    with PcapReader(path) as reader:
+        add = flow_table.add
+        for protocol, src, dst, flags, size in reader.iter_range(start, stop):
+            add(protocol, src, dst, flags, size)
+    return flow_table
+
+
+def analyze_pcap_parallel(path: str, workers: int,
+                          progress_callback: Optional[Callable[[Dict], None]] = None,
+                          is_cancelled: Optional[Callable[[], bool]] = None,
+                          poll_interval: float = 0.2) -> Tuple[FlowTable, bool]:
+    """
+    多进程汇总经典pcap文件
+
+    各分片完成后按文件顺序合并，合并结果与单进程顺序汇总一致。取消时
+    停止调度未开始的分片，并返回已按顺序连续完成的分片的合并结果。
+
+    Args:
+        path: 文件路径
+        workers: 工作进程数
+        progress_callback: 进度回调，参数为包含 offset/total/columns 的字典，
+                           offset 为已完成分片的字节总数
+        is_cancelled: 返回True时停止分析
+        poll_interval: 检查取消请求的间隔（秒）
+
+    Returns:
+        Tuple[FlowTable, bool]: 合并后的流量表，以及是否被取消
+    """
+    ranges = split_pcap(path, workers * SHARDS_PER_WORKER)
+    total = ranges[-1][1] if ranges else 0
+    merged = FlowTable()
+    results = {}
+    next_index = 0
+    done_bytes = 0
+    cancelled = False
+
+    executor = ProcessPoolExecutor(max_workers=workers)
+    try:
+        futures = {
+            executor.submit(analyze_pcap_range, path, start, stop): index
+            for index, (start, stop) in enumerate(ranges)
+        }
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, timeout=poll_interval, return_when=FIRST_COMPLETED)
+            for future in done:
+                index = futures[future]
+                results[index] = future.result()
+                done_bytes += ranges[index][1] - ranges[index][0]
+
+            # 按文件顺序合并已连续完成的分片
+            merged_any = False
+            while next_index in results:
+                merged.merge(results.pop(next_index))
+                next_index += 1
+                merged_any = True
+
+            if is_cancelled is not None and is_cancelled():
+                cancelled = True
+                break
+            if done and progress_callback is not None:
+                progress = {'offset': done_bytes, 'total': total, 'packets': None}
+                if merged_any:
+                    progress['columns'] = merged.to_columns()
+                progress_callback(progress)
+    finally:
+        executor.shutdown(wait=not cancelled, cancel_futures=True)
+
+    return merged, cancelled
@@ -0,0 +1,434 @@
+"""
+PCAP流式读取模块
+通过mmap零拷贝读取pcap/pcapng文件，直接从原始字节解析IPv4/TCP/UDP头部
+"""
+import mmap
+import socket
+import struct
+from typing import Iterator, Optional, Tuple
+
+# 文件格式魔数
+PCAP_MAGIC = 0xA1B2C3D4
+PCAP_MAGIC_NSEC = 0xA1B23C4D
+PCAPNG_SHB = 0x0A0D0D0A
+PCAPNG_BYTE_ORDER_MAGIC = 0x1A2B3C4D
+
+# pcapng块类型
+PCAPNG_IDB = 0x00000001
+PCAPNG_PB = 0x00000002
+PCAPNG_SPB = 0x00000003
+PCAPNG_EPB = 0x00000006
+
+# 链路类型
+LINKTYPE_NULL = 0
+LINKTYPE_ETHERNET = 1
+LINKTYPE_RAW = (12, 14, 101, 228)
+LINKTYPE_LOOP = 108
+LINKTYPE_LINUX_SLL = 113
+LINKTYPE_LINUX_SLL2 = 276
+
+# 以太网类型
+ETHERTYPE_IPV4 = 0x0800
+ETHERTYPE_VLAN = (0x8100, 0x88A8, 0x9100)
+
+# IP协议号
+IPPROTO_TCP = 6
+IPPROTO_UDP = 17
+
+# TCP标志位名称，按位从低到高排列（与scapy的显示顺序一致）
+TCP_FLAG_NAMES = 'FSRPAUEC'
+TCP_FLAG_STRINGS = tuple(
+    ''.join(name for bit, name in enumerate(TCP_FLAG_NAMES) if value & (1 << bit))
+    for value in range(256)
+)
+
+# 数据包解析结果: (协议, 源端点, 目标端点, 标志位, IP总长度)
+# 端点为 (IP整数 << 16) | 端口 的打包整数，按数值排序即为IP、端口顺序
+PacketInfo = Tuple[str, int, int, str, int]
+
+_unpack_ipv4_header = struct.Struct('!BxHxxHxBxxII').unpack_from
+_unpack_ports = struct.Struct('!HH').unpack_from
+_unpack_u16 = struct.Struct('!H').unpack_from
+
+
+def format_endpoint(endpoint: int) -> str:
+    """将打包的端点整数格式化为 ip:port 字符串"""
+    return f"{socket.inet_ntoa((endpoint >> 16).to_bytes(4, 'big'))}:{endpoint & 0xFFFF}"
+
+
+def decode_ipv4(buf, offset: int, end: int) -> Optional[PacketInfo]:
+    """
+    解析IPv4及TCP/UDP头部
+
+    Args:
+        buf: 原始数据缓冲区（bytes/mmap/memoryview）
+        offset: IPv4头部在缓冲区中的偏移
+        end: 当前数据包在缓冲区中的结束位置
+
+    Returns:
+        Optional[PacketInfo]: 非TCP/UDP或数据不完整时返回None
+    """
+    if end < offset + 20:
+        return None
+    ver_ihl, total_len, frag, proto, src, dst = _unpack_ipv4_header(buf, offset)
+    if ver_ihl >> 4 != 4 or frag & 0x1FFF:
+        # 非IPv4，或非首个分片（不含传输层头部）
+        return None
+
+    l4 = offset + (ver_ihl & 0x0F) * 4
+    if proto == IPPROTO_TCP:
+        if end < l4 + 14:
+            return None
+        sport, dport = _unpack_ports(buf, l4)
+        return ('TCP', src << 16 | sport, dst << 16 | dport,
+                TCP_FLAG_STRINGS[buf[l4 + 13]], total_len)
+    if proto == IPPROTO_UDP:
+        if end < l4 + 8:
+            return None
+        sport, dport = _unpack_ports(buf, l4)
+        return ('UDP', src << 16 | sport, dst << 16 | dport, '--', total_len)
+    return None
+
+
+def decode_ethernet(buf, offset: int, end: int) -> Optional[PacketInfo]:
+    """解析以太网帧（支持VLAN标签）"""
+    if end < offset + 14:
+        return None
+    eth_type = _unpack_u16(buf, offset + 12)[0]
+    offset += 14
+    while eth_type in ETHERTYPE_VLAN and end >= offset + 4:
+        eth_type = _unpack_u16(buf, offset + 2)[0]
+        offset += 4
+    if eth_type != ETHERTYPE_IPV4:
+        return None
+    return decode_ipv4(buf, offset, end)
+
+
+def decode_null(buf, offset: int, end: int) -> Optional[PacketInfo]:
+    """解析BSD环回封装（4字节主机字节序协议族）"""
+    if end < offset + 4 or (buf[offset] != socket.AF_INET and buf[offset + 3] != socket.AF_INET):
+        return None
+    return decode_ipv4(buf, offset + 4, end)
+
+
+def decode_loop(buf, offset: int, end: int) -> Optional[PacketInfo]:
+    """解析OpenBSD环回封装（4字节网络字节序协议族）"""
+    if end < offset + 4 or buf[offset + 3] != socket.AF_INET:
+        return None
+    return decode_ipv4(buf, offset + 4, end)
+
+
+def decode_raw(buf, offset: int, end: int) -> Optional[PacketInfo]:
+    """解析裸IP数据包"""
+    return decode_ipv4(buf, offset, end)
+
+
+def decode_linux_sll(buf, offset: int, end: int) -> Optional[PacketInfo]:
+    """解析Linux cooked capture v1"""
+    if end < offset + 16 or _unpack_u16(buf, offset + 14)[0] != ETHERTYPE_IPV4:
+        return None
+    return decode_ipv4(buf, offset + 16, end)
+
+
+def decode_linux_sll2(buf, offset: int, end: int) -> Optional[PacketInfo]:
+    """解析Linux cooked capture v2"""
+    if end < offset + 20 or _unpack_u16(buf, offset)[0] != ETHERTYPE_IPV4:
+        return None
+    return decode_ipv4(buf, offset + 20, end)
+
+
+# 链路类型到解析函数的映射
+DECODERS = {
+    LINKTYPE_NULL: decode_null,
+    LINKTYPE_ETHERNET: decode_ethernet,
+    LINKTYPE_LOOP: decode_loop,
+    LINKTYPE_LINUX_SLL: decode_linux_sll,
+    LINKTYPE_LINUX_SLL2: decode_linux_sll2,
+}
+DECODERS.update((linktype, decode_raw) for linktype in LINKTYPE_RAW)
+
+
+def get_decoder(linktype: int):
+    """
+    获取链路类型对应的解析函数
+
+    Raises:
+        ValueError: 链路类型不受支持时抛出
+    """
+    decoder = DECODERS.get(linktype)
+    if decoder is None:
+        raise ValueError(f"不支持的链路类型: {linktype}")
+    return decoder
+
+
+class PcapReader:
+    """
+    零拷贝PCAP读取器
+
+    将文件映射到内存后按偏移逐条解析记录，不复制数据包内容，
+    内存占用与文件大小无关。支持经典pcap（两种字节序、微秒/纳秒时间戳）
+    以及pcapng的EPB/SPB/PB块。迭代产生 PacketInfo，非TCP/UDP的数据包被跳过。
+    offset 属性记录当前已解析的字节偏移，packet_count 记录已读取的记录数。
+    """
+
+    def __init__(self, path: str):
+        """
+        打开pcap/pcapng文件
+
+        Args:
+            path: 文件路径
+
+        Raises:
+            ValueError: 文件格式无法识别或包含不支持的链路类型时抛出
+        """
+        self.path = path
+        self.offset = 0
+        self.packet_count = 0
+        self._file = open(path, 'rb')
+        try:
+            self.file_size = self._file.seek(0, 2)
+            if self.file_size < 24:
+                raise ValueError("文件过小，不是有效的PCAP文件")
+            self._buf = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._detect_format()
+        except Exception:
+            self.close()
+            raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self) -> None:
+        """关闭文件映射"""
+        buf = getattr(self, '_buf', None)
+        if buf is not None:
+            buf.close()
+            self._buf = None
+        self._file.close()
+
+    def _detect_format(self) -> None:
+        """识别文件格式并解析文件头"""
+        buf = self._buf
+        magic_le = struct.unpack_from('<I', buf)[0]
+        magic_be = struct.unpack_from('>I', buf)[0]
+
+        if magic_le == PCAPNG_SHB:
+            self.is_pcapng = True
+            self._interfaces = []
+            self._scan_pcapng_interfaces()
+            return
+
+        if magic_le in (PCAP_MAGIC, PCAP_MAGIC_NSEC):
+            self._endian = '<'
+            magic = magic_le
+        elif magic_be in (PCAP_MAGIC, PCAP_MAGIC_NSEC):
+            self._endian = '>'
+            magic = magic_be
+        else:
+            raise ValueError(f"无法识别的PCAP文件格式 (magic: {magic_le:#010x})")
+
+        self.is_pcapng = False
+        self._ts_frac_limit = 1000000000 if magic == PCAP_MAGIC_NSEC else 1000000
+        self.snaplen, linktype = struct.unpack_from(self._endian + 'II', buf, 16)
+        self.linktype = linktype & 0xFFFF
+        self._decoder = get_decoder(self.linktype)
+        self._unpack_record = struct.Struct(self._endian + 'IIII').unpack_from
+        self._first_ts = self._unpack_record(buf, 24)[0] if self.file_size >= 40 else 0
+        self.offset = 24
+
+    def _parse_shb(self, offset: int) -> int:
+        """解析节头块，返回块长度"""
+        byte_order = self._buf[offset + 8:offset + 12]
+        if struct.unpack('<I', byte_order)[0] == PCAPNG_BYTE_ORDER_MAGIC:
+            self._endian = '<'
+        elif struct.unpack('>I', byte_order)[0] == PCAPNG_BYTE_ORDER_MAGIC:
+            self._endian = '>'
+        else:
+            raise ValueError("无效的pcapng字节序标记")
+        self._interfaces = []
+        return struct.unpack_from(self._endian + 'I', self._buf, offset + 4)[0]
+
+    def _scan_pcapng_interfaces(self) -> None:
+        """
+        预扫描第一个数据包之前的接口描述块
+
+        若存在不支持的链路类型则抛出ValueError，由调用方回退到scapy。
+        """
+        offset = 0
+        while offset + 12 <= self.file_size:
+            block_type = struct.unpack_from('<I', self._buf, offset)[0]
+            if block_type == PCAPNG_SHB:
+                block_len = self._parse_shb(offset)
+            else:
+                block_type, block_len = struct.unpack_from(self._endian + 'II', self._buf, offset)
+                if block_type in (PCAPNG_EPB, PCAPNG_SPB, PCAPNG_PB):
+                    break
+                if block_type == PCAPNG_IDB:
+                    linktype = struct.unpack_from(self._endian + 'H', self._buf, offset + 8)[0]
+                    get_decoder(linktype)
+                    self._interfaces.append(linktype)
+            if block_len < 12:
+                raise ValueError(f"无效的pcapng块长度: {block_len}")
+            offset += block_len
+
+    def __iter__(self) -> Iterator[PacketInfo]:
+        if self.is_pcapng:
+            return self._iter_pcapng()
+        return self._iter_pcap(self.offset, self.file_size)
+
+    def iter_range(self, start: int, stop: int) -> Iterator[PacketInfo]:
+        """
+        解析起始位置位于 [start, stop) 内的记录（仅支持经典pcap）
+
+        Args:
+            start: 记录边界偏移，通常由 find_record_boundary 得到
+            stop: 结束偏移，跨越该位置的最后一条记录会被完整读取
+        """
+        if self.is_pcapng:
+            raise ValueError("pcapng文件不支持按字节范围读取")
+        return self._iter_pcap(max(start, 24), stop)
+
+    def _is_record_header(self, offset: int) -> bool:
+        """
+        粗略判断偏移处是否是一条合法的记录头
+
+        误判为合法会导致分片错位，因此条件从严：时间戳需与首条记录相差一年以内。
+        """
+        ts_sec, ts_frac, incl_len, orig_len = self._unpack_record(self._buf, offset)
+        return (0 < incl_len <= orig_len <= 0x40000
+                and incl_len <= max(self.snaplen, 0x40000)
+                and ts_frac < self._ts_frac_limit
+                and abs(ts_sec - self._first_ts) <= 366 * 86400
+                and offset + 16 + incl_len <= self.file_size)
+
+    def find_record_boundary(self, offset: int, chain: int = 8) -> int:
+        """
+        从指定偏移开始向后查找记录边界（仅支持经典pcap）
+
+        以连续 chain 条记录头都合法作为判断依据。
+
+        Args:
+            offset: 起始搜索偏移
+            chain: 需要连续校验的记录数
+
+        Returns:
+            int: 记录边界偏移，找不到时返回文件大小
+        """
+        if self.is_pcapng:
+            raise ValueError("pcapng文件不支持按字节范围读取")
+        limit = self.file_size
+        offset = max(offset, 24)
+        while offset + 16 <= limit:
+            position = offset
+            for _ in range(chain):
+                if position == limit:
+                    return offset
+                if position + 16 > limit or not self._is_record_header(position):
+                    break
+                position += 16 + self._unpack_record(self._buf, position)[2]
+            else:
+                return offset
+            offset += 1
+        return limit
+
+    def _iter_pcap(self, offset: int, stop: int) -> Iterator[PacketInfo]:
+        buf = self._buf
+        decoder = self._decoder
+        limit = self.file_size
+        unpack_incl_len = struct.Struct(self._endian + 'I').unpack_from
+        while offset < stop and offset + 16 <= limit:
+            incl_len = unpack_incl_len(buf, offset + 8)[0]
+            start = offset + 16
+            end = start + incl_len
+            if end > limit:
+                break
+            offset = end
+            self.offset = end
+            self.packet_count += 1
+            packet = decoder(buf, start, end)
+            if packet is not None:
+                yield packet
+
+    def _iter_pcapng(self) -> Iterator[PacketInfo]:
+        buf = self._buf
+        limit = self.file_size
+        offset = 0
+        while offset + 12 <= limit:
+            block_type = struct.unpack_from('<I', buf, offset)[0]
+            if block_type == PCAPNG_SHB:
+                # 新的节头块，可能改变字节序并重置接口列表
+                block_len = self._parse_shb(offset)
+                endian = self._endian
+                unpack_block = struct.Struct(endian + 'II').unpack_from
+                unpack_epb = struct.Struct(endian + 'IIII').unpack_from
+                unpack_pb = struct.Struct(endian + 'HHIII').unpack_from
+                unpack_u32 = struct.Struct(endian + 'I').unpack_from
+                interfaces = self._interfaces
+                decoders = []
+                offset += block_len
+                continue
+
+            block_type, block_len = unpack_block(buf, offset)
+            if block_len < 12 or offset + block_len > limit:
+                break
+            body = offset + 8
+            next_offset = offset + block_len
+
+            if block_type == PCAPNG_EPB:
+                interface_id, _, _, cap_len = unpack_epb(buf, body)
+                start = body + 20
+            elif block_type == PCAPNG_SPB:
+                interface_id = 0
+                start = body + 4
+                cap_len = min(unpack_u32(buf, body)[0], next_offset - 4 - start)
+            elif block_type == PCAPNG_PB:
+                interface_id, _, _, _, cap_len = unpack_pb(buf, body)
+                start = body + 20
+            else:
+                if block_type == PCAPNG_IDB:
+                    linktype = struct.unpack_from(endian + 'H', buf, body)[0]
+                    interfaces.append(linktype)
+                    decoders.append(DECODERS.get(linktype))
+                offset = next_offset
+                continue
+
+            offset = next_offset
+            self.offset = next_offset
+            self.packet_count += 1
+            if interface_id >= len(decoders) or decoders[interface_id] is None:
+                continue
+            packet = decoders[interface_id](buf, start, min(start + cap_len, next_offset))
+            if packet is not None:
+                yield packet
+
+
+def iter_scapy_packets(path: str) -> Iterator[PacketInfo]:
+    """
+    使用scapy逐包读取（用于内置解析器不支持的链路类型）
+
+    Args:
+        path: 文件路径
+
+    Returns:
+        Iterator[PacketInfo]: 与 PcapReader 相同格式的解析结果
+    """
+    from scapy.layers.inet import IP, TCP, UDP
+    from scapy.utils import PcapReader as ScapyPcapReader
+
+    with ScapyPcapReader(path) as reader:
+        for packet in reader:
+            if not packet.haslayer(IP):
+                continue
+            ip = packet[IP]
+            src = int.from_bytes(socket.inet_aton(ip.src), 'big') << 16
+            dst = int.from_bytes(socket.inet_aton(ip.dst), 'big') << 16
+            if packet.haslayer(TCP):
+                tcp = packet[TCP]
+                yield ('TCP', src | tcp.sport, dst | tcp.dport,
+                       TCP_FLAG_STRINGS[int(tcp.flags) & 0xFF], ip.len)
+            elif packet.haslayer(UDP):
+                udp = packet[UDP]
+                yield ('UDP', src | udp.sport, dst | udp.dport, '--', ip.len)
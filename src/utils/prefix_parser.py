@@ -0,0 +1,343 @@
+"""
+批量前缀解析模块
+将大量路由条目一次性解析为起始/结束地址数组，常见的 a.b.c.d 与 a.b.c.d/n
+格式使用NumPy按列向量化解析，IPv6前缀用 inet_pton 转换后按位批量掩码，
+其余条目逐条交给 TextUtils.parse_ip_range，以保持相同的解析规则和错误信息。
+"""
+import socket
+from typing import List, Sequence, Tuple
+
+from .route_summary import IPV4_BITS, IPV6_BITS, split_words
+from .text_utils import TextUtils
+
+try:
+    import numpy as np
+except ImportError:  # 未安装NumPy时逐条解析
+    np = None
+
+# 向量化解析的最大条目长度，即 "255.255.255.255/32"
+FAST_PATH_WIDTH = 18
+
+
+class ParsedPrefixes:
+    """
+    批量解析结果
+
+    starts/ends 为IPv4闭区间的起始与结束地址，安装了NumPy时为uint32数组，否则为列表；
+    starts6/ends6 为IPv6的起始与结束地址，安装了NumPy时为 (n, 2) 的uint64数组
+    （每行依次为高64位和低64位），否则为整数列表；
+    failed 为 (条目, 错误信息) 列表，顺序与输入一致。
+    """
+
+    __slots__ = ('starts', 'ends', 'starts6', 'ends6', 'failed')
+
+    def __init__(self, starts, ends, failed: List[Tuple[str, str]], starts6=None, ends6=None):
+        self.starts = starts
+        self.ends = ends
+        self.starts6 = [] if starts6 is None else starts6
+        self.ends6 = [] if ends6 is None else ends6
+        self.failed = failed
+
+    def __len__(self) -> int:
+        return len(self.starts) + len(self.starts6)
+
+    def families(self) -> List[Tuple[int, Sequence[int], Sequence[int]]]:
+        """
+        按地址族拆分的区间，只包含有条目的地址族
+
+        Returns:
+            List[Tuple[int, Sequence, Sequence]]: (地址位数, 起始地址, 结束地址)，IPv4在前
+        """
+        families = []
+        if len(self.starts):
+            families.append((IPV4_BITS, self.starts, self.ends))
+        if len(self.starts6):
+            families.append((IPV6_BITS, self.starts6, self.ends6))
+        return families
+
+    def total_addresses(self, version: int = None) -> int:
+        """
+        各条目包含的地址数量之和（重叠部分重复计算）
+
+        Args:
+            version: 只统计指定IP版本，为None时统计全部
+        """
+        total = 0
+        if version != 6:
+            if np is not None and isinstance(self.starts, np.ndarray):
+                total += int((self.ends.astype(np.int64) - self.starts.astype(np.int64) + 1).sum())
+            else:
+                total += sum(end - start + 1 for start, end in zip(self.starts, self.ends))
+        if version != 4:
+            if np is not None and isinstance(self.starts6, np.ndarray):
+                total += _word_sum(self.ends6) - _word_sum(self.starts6) + len(self.starts6)
+            else:
+                total += sum(end - start + 1 for start, end in zip(self.starts6, self.ends6))
+        return total
+
+    def bounds(self) -> Tuple[int, int]:
+        """IPv4条目中最小的起始地址与最大的结束地址"""
+        if np is not None and isinstance(self.starts, np.ndarray):
+            return int(self.starts.min()), int(self.ends.max())
+        return min(self.starts), max(self.ends)
+
+
+def _word_sum(words) -> int:
+    """(n, 2) uint64数组表示的128位整数之和，按32位分段求和避免溢出"""
+    total = 0
+    for column, shift in ((0, 64), (1, 0)):
+        word = words[:, column]
+        total += int((word >> np.uint64(32)).sum()) << (shift + 32)
+        total += int((word & np.uint64(0xFFFFFFFF)).sum()) << shift
+    return total
+
+
+def parse_prefixes(entries: Sequence[str]) -> ParsedPrefixes:
+    """
+    批量解析路由条目
+
+    Args:
+        entries: TextUtils.split_text 拆分后的条目
+
+    Returns:
+        ParsedPrefixes: 解析成功的地址区间与解析失败的条目
+    """
+    if np is None:
+        return _parse_slow(entries)
+
+    count = len(entries)
+    starts = np.zeros(count, dtype=np.uint32)
+    ends = np.zeros(count, dtype=np.uint32)
+    parsed = np.zeros(count, dtype=bool)
+
+    if count:
+        lengths = np.fromiter(map(len, entries), dtype=np.int64, count=count)
+        candidates = np.flatnonzero(lengths <= FAST_PATH_WIDTH)
+        if len(candidates):
+            texts = entries if len(candidates) == count else [entries[i] for i in candidates]
+            fast_ok, fast_starts, fast_ends, _ = _parse_fast(texts)
+            index = candidates[fast_ok]
+            starts[index] = fast_starts[fast_ok]
+            ends[index] = fast_ends[fast_ok]
+            parsed[index] = True
+
+    # IPv6前缀批量解析
+    remaining = np.flatnonzero(~parsed).tolist()
+    candidates6 = [i for i in remaining if ':' in entries[i] and '-' not in entries[i]]
+    parsed6 = np.zeros(count, dtype=bool)
+    starts6 = ends6 = np.zeros((0, 2), dtype=np.uint64)
+    if candidates6:
+        fast_ok, starts6, ends6 = _parse_fast6([entries[i] for i in candidates6])
+        parsed6[np.asarray(candidates6)[fast_ok]] = True
+        remaining = np.flatnonzero(~(parsed | parsed6)).tolist()
+
+    # 向量化路径无法处理的条目（范围、掩码、错误格式等）逐条解析
+    failed = []
+    slow_starts6, slow_ends6 = [], []
+    for i in remaining:
+        entry = entries[i]
+        try:
+            network = TextUtils.parse_ip_range(entry)
+        except ValueError as e:
+            failed.append((entry, str(e)))
+            continue
+        if not network:
+            continue
+        if network.version == 6:
+            slow_starts6.append(network.first)
+            slow_ends6.append(network.last)
+        else:
+            starts[i] = network.first
+            ends[i] = network.last
+            parsed[i] = True
+
+    if slow_starts6:
+        starts6 = np.concatenate((starts6, split_words(slow_starts6)))
+        ends6 = np.concatenate((ends6, split_words(slow_ends6)))
+    return ParsedPrefixes(starts[parsed], ends[parsed], failed, starts6, ends6)
+
+
+def parse_addresses(entries: Sequence[str]):
+    """
+    批量解析单个IP地址
+
+    Args:
+        entries: TextUtils.split_text 拆分后的条目
+
+    Returns:
+        (addresses, failed): 解析成功的地址（安装NumPy时为uint32数组，否则为列表），
+                             以及 (条目, 错误信息) 列表
+    """
+    if np is None:
+        addresses, failed = [], []
+        for entry in entries:
+            address = _parse_address(entry)
+            if address is None:
+                failed.append((entry, f"无效的IP地址: {entry}"))
+            else:
+                addresses.append(address)
+        return addresses, failed
+
+    count = len(entries)
+    addresses = np.zeros(count, dtype=np.uint32)
+    parsed = np.zeros(count, dtype=bool)
+    if count:
+        lengths = np.fromiter(map(len, entries), dtype=np.int64, count=count)
+        candidates = np.flatnonzero(lengths <= FAST_PATH_WIDTH)
+        if len(candidates):
+            texts = entries if len(candidates) == count else [entries[i] for i in candidates]
+            fast_ok, fast_starts, _, has_prefix = _parse_fast(texts)
+            fast_ok &= ~has_prefix
+            addresses[candidates[fast_ok]] = fast_starts[fast_ok]
+            parsed[candidates[fast_ok]] = True
+
+    failed = [(entries[i], f"无效的IP地址: {entries[i]}") for i in np.flatnonzero(~parsed).tolist()]
+    return addresses[parsed], failed
+
+
+def _parse_address(entry: str):
+    """解析不含前导零的点分十进制IPv4地址，与向量化路径规则一致，无效时返回None"""
+    parts = entry.split('.')
+    if len(parts) != 4:
+        return None
+    address = 0
+    for part in parts:
+        if not part.isdigit() or len(part) > 3 or (len(part) > 1 and part[0] == '0'):
+            return None
+        value = int(part)
+        if value > 255:
+            return None
+        address = (address << 8) | value
+    return address
+
+
+def _parse_slow(entries: Sequence[str]) -> ParsedPrefixes:
+    """逐条解析"""
+    starts, ends, starts6, ends6, failed = [], [], [], [], []
+    for entry in entries:
+        try:
+            network = TextUtils.parse_ip_range(entry)
+        except ValueError as e:
+            failed.append((entry, str(e)))
+            continue
+        if not network:
+            continue
+        if network.version == 6:
+            starts6.append(network.first)
+            ends6.append(network.last)
+        else:
+            starts.append(network.first)
+            ends.append(network.last)
+    return ParsedPrefixes(starts, ends, failed, starts6, ends6)
+
+
+def _parse_fast(texts: Sequence[str]):
+    """
+    向量化解析 a.b.c.d 与 a.b.c.d/n
+
+    按字符列依次累加各段的数值，只接受不含前导零的规范写法，
+    其余条目标记为未解析，由调用方逐条处理。
+
+    Returns:
+        (ok, starts, ends, has_prefix): 是否解析成功的布尔数组，起始/结束地址数组，
+                                        以及是否带有前缀长度
+    """
+    count = len(texts)
+    chars = np.array(texts, dtype=f'<U{FAST_PATH_WIDTH}').view(np.uint32)
+    # 末尾补一列结束符，保证每个条目的最后一段都会被写入
+    chars = np.hstack((chars.reshape(count, FAST_PATH_WIDTH), np.zeros((count, 1), dtype=np.uint32)))
+
+    values = np.zeros((5, count), dtype=np.int64)
+    digits = np.zeros((5, count), dtype=np.int64)
+    current = np.zeros(count, dtype=np.int64)
+    current_digits = np.zeros(count, dtype=np.int64)
+    leading_zero = np.zeros(count, dtype=bool)
+    segment = np.zeros(count, dtype=np.int64)
+    has_prefix = np.zeros(count, dtype=bool)
+    ended = np.zeros(count, dtype=bool)
+    bad = np.zeros(count, dtype=bool)
+
+    for column in range(FAST_PATH_WIDTH + 1):
+        char = chars[:, column].astype(np.int64)
+        is_digit = (char >= 48) & (char <= 57)
+        is_dot = char == 46
+        is_slash = char == 47
+        is_end = char == 0
+
+        bad |= ended & ~is_end
+        bad |= ~(is_digit | is_dot | is_slash | is_end)
+        bad |= is_dot & (has_prefix | (segment >= 3))
+        bad |= is_slash & (segment != 3)
+
+        # 累加当前段的数值
+        leading_zero |= is_digit & (current_digits == 1) & (current == 0)
+        current = np.where(is_digit, current * 10 + (char - 48), current)
+        current_digits += is_digit
+
+        # 遇到分隔符或结束符时写入当前段
+        finish = np.flatnonzero(~bad & (is_dot | is_slash | (is_end & ~ended)))
+        values[segment[finish], finish] = current[finish]
+        digits[segment[finish], finish] = current_digits[finish]
+        current[finish] = 0
+        current_digits[finish] = 0
+
+        has_prefix |= is_slash
+        segment += (is_dot | is_slash) & ~bad
+        ended |= is_end
+
+    octet_digits = digits[:4]
+    ok = ~bad & (segment == np.where(has_prefix, 4, 3))
+    ok &= ((octet_digits >= 1) & (octet_digits <= 3)).all(axis=0)
+    ok &= (values[:4] <= 255).all(axis=0)
+    ok &= ~leading_zero
+    ok &= ~has_prefix | ((digits[4] >= 1) & (digits[4] <= 2) & (values[4] <= 32))
+
+    address = (values[0] << 24) | (values[1] << 16) | (values[2] << 8) | values[3]
+    prefixlen = np.where(has_prefix, values[4], 32)
+    prefixlen = np.where(ok, prefixlen, 32)
+    host_mask = (np.int64(1) << (32 - prefixlen)) - 1
+    starts = address & ~host_mask & 0xFFFFFFFF
+    ends = starts | host_mask
+    return ok, starts, ends, has_prefix
+
+
+def _parse_fast6(texts: Sequence[str]):
+    """
+    批量解析IPv6地址与前缀
+
+    地址部分交给 inet_pton 转换为16字节，再拼接为 (n, 2) 的uint64数组一次性清除主机位；
+    前缀长度只接受不含前导零的写法，其余条目标记为未解析，由调用方逐条处理。
+
+    Returns:
+        (ok, starts, ends): 是否解析成功的布尔数组，以及解析成功条目的起始/结束地址数组
+    """
+    pton, family = socket.inet_pton, socket.AF_INET6
+    ok = np.zeros(len(texts), dtype=bool)
+    packed, prefixlens = [], []
+    for index, text in enumerate(texts):
+        address, slash, prefixlen = text.partition('/')
+        if slash:
+            if (not prefixlen.isdigit() or len(prefixlen) > 3
+                    or (len(prefixlen) > 1 and prefixlen[0] == '0') or int(prefixlen) > 128):
+                continue
+            prefixlen = int(prefixlen)
+        else:
+            prefixlen = 128
+        try:
+            packed.append(pton(family, address))
+        except (OSError, ValueError):
+            continue
+        prefixlens.append(prefixlen)
+        ok[index] = True
+
+    words = np.frombuffer(b''.join(packed), dtype='>u8').reshape(-1, 2).astype(np.uint64)
+    prefixlens = np.array(prefixlens, dtype=np.int64)
+    # 高、低64位各自的主机位数，64位全为主机位时单独处理以避免移位溢出
+    host_masks = np.empty_like(words)
+    for column, host_bits in enumerate((np.clip(64 - prefixlens, 0, 64),
+                                        np.clip(128 - prefixlens, 0, 64))):
+        shift = np.minimum(host_bits, 63).astype(np.uint64)
+        host_masks[:, column] = np.where(host_bits >= 64, np.uint64(0xFFFFFFFFFFFFFFFF),
+                                         (np.uint64(1) << shift) - np.uint64(1))
+    starts = words & ~host_masks
+    return ok, starts, starts | host_masks
@@ -0,0 +1,298 @@
+"""
+前缀树模块
+基于扁平数组的路径压缩二叉前缀树（radix trie），支持IPv4/IPv6前缀的插入、删除、
+最长前缀匹配、覆盖/被覆盖查询以及聚合后的前缀遍历
+"""
+from array import array
+from typing import Any, Iterator, List, Optional, Tuple
+
+from .route_summary import interval_to_cidrs
+
+# 非路由节点（仅用于分叉）的取值标记
+_EMPTY = object()
+
+
+class PrefixTrie:
+    """
+    路径压缩二叉前缀树
+
+    节点以下标表示，属性存放在平行数组中：前缀地址、前缀长度、左右子节点下标
+    （-1表示无）以及取值。每个节点的前缀长度严格大于其父节点，只有两个子节点的
+    分叉节点才会作为非路由节点存在，因此节点数不超过前缀数的两倍。
+    删除的节点下标放入空闲列表复用。
+
+    前缀以 (网络地址整数, 前缀长度) 表示，插入时自动清除主机位。
+    """
+
+    __slots__ = ('bits', '_keys', '_lengths', '_left', '_right', '_values', '_free', '_size')
+
+    def __init__(self, version: int = 4):
+        """
+        Args:
+            version: IP版本，4 或 6
+        """
+        if version not in (4, 6):
+            raise ValueError(f"不支持的IP版本: {version}")
+        self.bits = 32 if version == 4 else 128
+        # IPv4地址存入uint32数组，IPv6地址超出数组类型范围，使用列表
+        self._keys = array('I', [0]) if version == 4 else [0]
+        self._lengths = array('B', [0])
+        self._left = array('i', [-1])
+        self._right = array('i', [-1])
+        self._values: List[Any] = [_EMPTY]
+        self._free: List[int] = []
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, prefix: Tuple[int, int]) -> bool:
+        return self._find(*prefix) >= 0
+
+    def __iter__(self) -> Iterator[Tuple[int, int, Any]]:
+        """按地址顺序遍历 (网络地址, 前缀长度, 取值)，包含关系中较短的前缀在前"""
+        return self._walk(0)
+
+    def _mask(self, network: int, prefixlen: int) -> int:
+        if not 0 <= prefixlen <= self.bits:
+            raise ValueError(f"无效的前缀长度: {prefixlen}")
+        host_bits = self.bits - prefixlen
+        return network >> host_bits << host_bits
+
+    def _bit(self, key: int, position: int) -> int:
+        """第 position 位（从最高位0开始）"""
+        return (key >> (self.bits - 1 - position)) & 1
+
+    def _new_node(self, key: int, length: int, value: Any) -> int:
+        if self._free:
+            node = self._free.pop()
+            self._keys[node] = key
+            self._lengths[node] = length
+            self._left[node] = self._right[node] = -1
+            self._values[node] = value
+            return node
+        self._keys.append(key)
+        self._lengths.append(length)
+        self._left.append(-1)
+        self._right.append(-1)
+        self._values.append(value)
+        return len(self._values) - 1
+
+    def _child(self, node: int, bit: int) -> int:
+        return self._right[node] if bit else self._left[node]
+
+    def _set_child(self, node: int, bit: int, child: int) -> None:
+        if bit:
+            self._right[node] = child
+        else:
+            self._left[node] = child
+
+    def _common_length(self, a: int, b: int, limit: int) -> int:
+        """两个地址从最高位起相同的位数，不超过 limit"""
+        return min(limit, self.bits - (a ^ b).bit_length())
+
+    def insert(self, network: int, prefixlen: int, value: Any = True) -> None:
+        """
+        插入前缀，已存在时更新取值
+
+        Args:
+            network: 网络地址
+            prefixlen: 前缀长度
+            value: 前缀关联的取值，如下一跳信息
+        """
+        key = self._mask(network, prefixlen)
+        bits = self.bits
+        keys, lengths, left, right, values = (self._keys, self._lengths, self._left,
+                                              self._right, self._values)
+        node = 0
+        while True:
+            length = lengths[node]
+            if length == prefixlen:
+                if values[node] is _EMPTY:
+                    self._size += 1
+                values[node] = value
+                return
+
+            bit = (key >> (bits - 1 - length)) & 1
+            child = right[node] if bit else left[node]
+            if child < 0:
+                self._set_child(node, bit, self._new_node(key, prefixlen, value))
+                self._size += 1
+                return
+
+            child_key, child_length = keys[child], lengths[child]
+            common = min(prefixlen, child_length, bits - (key ^ child_key).bit_length())
+            if common == child_length:
+                node = child
+                continue
+
+            if common == prefixlen:
+                # 新前缀位于父节点与子节点之间
+                inserted = self._new_node(key, prefixlen, value)
+                self._set_child(inserted, self._bit(child_key, prefixlen), child)
+            else:
+                # 新建分叉节点，两侧分别为原子节点和新前缀
+                inserted = self._new_node(self._mask(key, common), common, _EMPTY)
+                self._set_child(inserted, self._bit(child_key, common), child)
+                self._set_child(inserted, self._bit(key, common),
+                                self._new_node(key, prefixlen, value))
+            self._set_child(node, bit, inserted)
+            self._size += 1
+            return
+
+    def _find(self, network: int, prefixlen: int) -> int:
+        """查找精确匹配的路由节点下标，不存在时返回-1"""
+        key = self._mask(network, prefixlen)
+        node = 0
+        while node >= 0:
+            length = self._lengths[node]
+            if length == prefixlen:
+                return node if self._keys[node] == key and self._values[node] is not _EMPTY else -1
+            if length > prefixlen or self._common_length(key, self._keys[node], length) < length:
+                return -1
+            node = self._child(node, self._bit(key, length))
+        return -1
+
+    def get(self, network: int, prefixlen: int, default: Any = None) -> Any:
+        """获取前缀的取值"""
+        node = self._find(network, prefixlen)
+        return self._values[node] if node >= 0 else default
+
+    def delete(self, network: int, prefixlen: int) -> bool:
+        """
+        删除前缀
+
+        Returns:
+            bool: 前缀存在并已删除时返回True
+        """
+        key = self._mask(network, prefixlen)
+        grandparent, parent, node = -1, -1, 0
+        while node >= 0 and self._lengths[node] < prefixlen:
+            length = self._lengths[node]
+            if self._common_length(key, self._keys[node], length) < length:
+                return False
+            grandparent, parent, node = parent, node, self._child(node, self._bit(key, length))
+        if (node < 0 or self._lengths[node] != prefixlen or self._keys[node] != key
+                or self._values[node] is _EMPTY):
+            return False
+
+        self._values[node] = _EMPTY
+        self._size -= 1
+        if node == 0:
+            return True
+
+        # 移除不再需要的节点：无子节点的直接删除，只有一个子节点的由子节点顶替；
+        # 删除后父节点若为只剩一个子节点的分叉节点，同样摘除
+        if self._prune(parent, node) and parent != 0:
+            self._prune(grandparent, parent)
+        return True
+
+    def _prune(self, parent: int, node: int) -> bool:
+        """节点为非路由节点且子节点少于两个时从树中摘除，返回是否已摘除"""
+        left, right = self._left[node], self._right[node]
+        if self._values[node] is not _EMPTY or (left >= 0 and right >= 0):
+            return False
+        replacement = left if left >= 0 else right
+        bit = self._bit(self._keys[node], self._lengths[parent])
+        self._set_child(parent, bit, replacement)
+        self._values[node] = None
+        self._free.append(node)
+        return True
+
+    def longest_match(self, address: int) -> Optional[Tuple[int, int, Any]]:
+        """
+        最长前缀匹配
+
+        Args:
+            address: IP地址整数
+
+        Returns:
+            Optional[Tuple[int, int, Any]]: 匹配的 (网络地址, 前缀长度, 取值)，无匹配时返回None
+        """
+        best = None
+        node = 0
+        keys, lengths, values = self._keys, self._lengths, self._values
+        bits = self.bits
+        while node >= 0:
+            length = lengths[node]
+            if length and (address ^ keys[node]) >> (bits - length):
+                break
+            if values[node] is not _EMPTY:
+                best = node
+            if length == bits:
+                break
+            node = self._right[node] if (address >> (bits - 1 - length)) & 1 else self._left[node]
+        if best is None:
+            return None
+        return self._keys[best], self._lengths[best], self._values[best]
+
+    def covering(self, network: int, prefixlen: int) -> List[Tuple[int, int, Any]]:
+        """
+        包含指定前缀的所有前缀（含自身），按前缀长度从短到长排列
+        """
+        key = self._mask(network, prefixlen)
+        result = []
+        node = 0
+        while node >= 0:
+            length = self._lengths[node]
+            if length > prefixlen or self._common_length(key, self._keys[node], length) < length:
+                break
+            if self._values[node] is not _EMPTY:
+                result.append((self._keys[node], length, self._values[node]))
+            if length == prefixlen:
+                break
+            node = self._child(node, self._bit(key, length))
+        return result
+
+    def covered(self, network: int, prefixlen: int) -> Iterator[Tuple[int, int, Any]]:
+        """
+        被指定前缀包含的所有前缀（含自身），按地址顺序遍历
+        """
+        key = self._mask(network, prefixlen)
+        node = 0
+        while node >= 0:
+            length = self._lengths[node]
+            common = self._common_length(key, self._keys[node], min(length, prefixlen))
+            if length >= prefixlen:
+                if common == prefixlen:
+                    return self._walk(node)
+                break
+            if common < length:
+                break
+            node = self._child(node, self._bit(key, length))
+        return iter(())
+
+    def _walk(self, start: int) -> Iterator[Tuple[int, int, Any]]:
+        """前序遍历子树中的路由节点"""
+        stack = [start]
+        while stack:
+            node = stack.pop()
+            if self._values[node] is not _EMPTY:
+                yield self._keys[node], self._lengths[node], self._values[node]
+            if self._right[node] >= 0:
+                stack.append(self._right[node])
+            if self._left[node] >= 0:
+                stack.append(self._left[node])
+
+    def aggregated(self) -> Iterator[Tuple[int, int]]:
+        """
+        按地址顺序生成聚合后的前缀：合并被包含和相邻的前缀，结果为覆盖相同地址的最少CIDR块
+
+        Yields:
+            Tuple[int, int]: (网络地址, 前缀长度)
+        """
+        bits = self.bits
+        first = last = None
+        for key, length, _ in self:
+            end = key + (1 << (bits - length)) - 1
+            if last is not None and key <= last + 1:
+                if end > last:
+                    last = end
+                continue
+            if last is not None:
+                for cidr in interval_to_cidrs(first, last, bits):
+                    yield cidr.first, cidr.prefixlen
+            first, last = key, end
+        if last is not None:
+            for cidr in interval_to_cidrs(first, last, bits):
+                yield cidr.first, cidr.prefixlen
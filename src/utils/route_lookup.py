@@ -0,0 +1,191 @@
+"""
+路由查询模块
+解析 display ip routing-table 输出，建立按地址排序的区间索引，批量进行最长前缀匹配
+"""
+import re
+import socket
+from bisect import bisect_right
+from typing import List, NamedTuple, Sequence, Tuple
+
+from .prefix_trie import PrefixTrie
+
+try:
+    import numpy as np
+except ImportError:  # 未安装NumPy时使用二分查找逐个匹配
+    np = None
+
+_PREFIX_PATTERN = re.compile(r'^(\d{1,3}(?:\.\d{1,3}){3})/(\d{1,2})$')
+_IP_PATTERN = re.compile(r'^\d{1,3}(?:\.\d{1,3}){3}$')
+
+# 未匹配任何路由
+NO_ROUTE = -1
+
+
+class Route(NamedTuple):
+    """路由表中的一条路由"""
+
+    network: int
+    prefixlen: int
+    protocol: str
+    preference: str
+    cost: str
+    flags: str
+    next_hop: str
+    interface: str
+
+    @property
+    def prefix(self) -> str:
+        """目的网段文本"""
+        return f"{socket.inet_ntoa(self.network.to_bytes(4, 'big'))}/{self.prefixlen}"
+
+
+def parse_routing_table(text: str) -> List[Route]:
+    """
+    解析华为/H3C的 display ip routing-table 输出
+
+    每条路由行的格式为：目的网段/掩码 协议 优先级 开销 [标志] 下一跳 出接口；
+    等价路由的后续行省略目的网段，沿用上一行的目的网段。表头等其他行忽略。
+
+    Args:
+        text: 命令输出文本
+
+    Returns:
+        List[Route]: 按出现顺序排列的路由
+    """
+    routes = []
+    network = prefixlen = None
+    for line in text.splitlines():
+        tokens = line.split()
+        if not tokens:
+            continue
+
+        match = _PREFIX_PATTERN.match(tokens[0])
+        if match:
+            try:
+                network = int.from_bytes(socket.inet_aton(match.group(1)), 'big')
+            except OSError:
+                network = None
+                continue
+            prefixlen = int(match.group(2))
+            if prefixlen > 32:
+                network = None
+                continue
+            # 清除主机位
+            network = network >> (32 - prefixlen) << (32 - prefixlen) if prefixlen else 0
+            fields = tokens[1:]
+        elif network is not None and line[:1].isspace():
+            fields = tokens
+        else:
+            network = None
+            continue
+
+        # 协议 优先级 开销 之后的第一个IP为下一跳
+        if len(fields) < 4 or not fields[0][:1].isalpha():
+            continue
+        next_hop_index = next(
+            (i for i in range(3, len(fields)) if _IP_PATTERN.match(fields[i])), None
+        )
+        if next_hop_index is None:
+            continue
+        routes.append(Route(
+            network, prefixlen, fields[0], fields[1], fields[2],
+            ' '.join(fields[3:next_hop_index]), fields[next_hop_index],
+            ' '.join(fields[next_hop_index + 1:]),
+        ))
+    return routes
+
+
+class RouteTable:
+    """
+    路由查询索引
+
+    路由先插入前缀树，再展开为互不重叠、按起始地址排序的地址区间，
+    每个区间对应覆盖它的最长前缀。查询时对区间起点做二分查找，
+    安装NumPy时使用 searchsorted 批量完成。
+    """
+
+    def __init__(self, routes: Sequence[Route]):
+        self.routes = list(routes)
+
+        # 同一目的网段的多条路由（等价路由）归为一组
+        trie = PrefixTrie(4)
+        self.prefixes: List[Tuple[int, int, List[int]]] = []
+        for index, route in enumerate(self.routes):
+            group = trie.get(route.network, route.prefixlen)
+            if group is None:
+                group = len(self.prefixes)
+                self.prefixes.append((route.network, route.prefixlen, []))
+                trie.insert(route.network, route.prefixlen, group)
+            self.prefixes[group][2].append(index)
+
+        starts, targets = self._flatten(trie)
+        if np is not None:
+            self._starts = np.array(starts, dtype=np.uint32)
+            self._targets = np.array(targets, dtype=np.int64)
+        else:
+            self._starts = starts
+            self._targets = targets
+
+    @staticmethod
+    def _flatten(trie: PrefixTrie) -> Tuple[List[int], List[int]]:
+        """将前缀树展开为 (区间起点列表, 区间对应的前缀组下标列表)"""
+        starts, targets = [0], [NO_ROUTE]
+
+        def emit(start, target):
+            if start > 0xFFFFFFFF:
+                return
+            if starts[-1] == start:
+                starts.pop()
+                targets.pop()
+            if targets and targets[-1] == target:
+                return
+            starts.append(start)
+            targets.append(target)
+
+        # 前序遍历按起始地址排序且父前缀在前，用栈记录当前覆盖的前缀
+        stack = []
+        for network, prefixlen, group in trie:
+            while stack and stack[-1][0] < network:
+                end, _ = stack.pop()
+                emit(end + 1, stack[-1][1] if stack else NO_ROUTE)
+            emit(network, group)
+            stack.append((network + (1 << (32 - prefixlen)) - 1, group))
+        while stack:
+            end, _ = stack.pop()
+            emit(end + 1, stack[-1][1] if stack else NO_ROUTE)
+        return starts, targets
+
+    def __len__(self) -> int:
+        return len(self.prefixes)
+
+    def lookup(self, address: int) -> int:
+        """
+        查询单个地址
+
+        Returns:
+            int: 匹配的前缀组下标，未匹配时为 NO_ROUTE
+        """
+        return int(self._targets[bisect_right(self._starts, address) - 1])
+
+    def lookup_many(self, addresses):
+        """
+        批量查询
+
+        Args:
+            addresses: 地址序列，安装NumPy时可直接传入uint32数组
+
+        Returns:
+            与输入等长的前缀组下标序列（NumPy数组或列表），未匹配时为 NO_ROUTE
+        """
+        if np is not None:
+            index = np.searchsorted(self._starts, np.asarray(addresses, dtype=np.uint32),
+                                    side='right') - 1
+            return self._targets[index]
+        starts, targets = self._starts, self._targets
+        return [targets[bisect_right(starts, address) - 1] for address in addresses]
+
+    def group_routes(self, group: int) -> List[Route]:
+        """前缀组包含的路由"""
+        if group == NO_ROUTE:
+            return []
+        return [self.routes[index] for index in self.prefixes[group][2]]
@@ -0,0 +1,370 @@
+"""
+路由汇总模块
+以 (起始地址, 结束地址) 整数区间表示网段，排序合并后按位运算生成最少的CIDR块。
+IPv4与IPv6分别汇总，IPv6地址为128位整数，NumPy路径以 (高64位, 低64位) 成对的uint64数组表示。
+"""
+import gc
+import socket
+from bisect import bisect_left
+from itertools import accumulate, repeat
+from operator import add
+from typing import Iterable, List, NamedTuple, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # 未安装NumPy时使用纯Python合并
+    np = None
+
+# 地址位数
+IPV4_BITS = 32
+IPV6_BITS = 128
+
+_WORD_MASK = (1 << 64) - 1
+# 合并子树 costs 时较短一侧不超过此长度则逐条遍历该侧
+SHORT_SIDE = 8
+# 两侧长度之积超过此值且数值在int64范围内时用NumPy合并
+NUMPY_COMBINE_SIZE = 64
+
+
+class Cidr(NamedTuple):
+    """汇总结果中的一个CIDR块"""
+
+    first: int
+    prefixlen: int
+    bits: int = IPV4_BITS
+
+    @property
+    def version(self) -> int:
+        """IP版本"""
+        return 6 if self.bits == IPV6_BITS else 4
+
+    @property
+    def size(self) -> int:
+        """包含的地址数量"""
+        return 1 << (self.bits - self.prefixlen)
+
+    @property
+    def last(self) -> int:
+        """最后一个地址"""
+        return self.first + self.size - 1
+
+    def __str__(self) -> str:
+        if self.bits == IPV6_BITS:
+            address = socket.inet_ntop(socket.AF_INET6, self.first.to_bytes(16, 'big'))
+        else:
+            address = socket.inet_ntoa(self.first.to_bytes(4, 'big'))
+        return f"{address}/{self.prefixlen}"
+
+
+def merge_intervals(intervals: Iterable[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """
+    合并重叠或相邻的地址区间
+
+    Args:
+        intervals: (起始地址, 结束地址) 序列，闭区间
+
+    Returns:
+        List[Tuple[int, int]]: 按起始地址排序、互不相邻的区间列表
+    """
+    merged = []
+    current_first = current_last = None
+    for first, last in sorted(intervals):
+        if current_last is not None and first <= current_last + 1:
+            if last > current_last:
+                current_last = last
+            continue
+        if current_last is not None:
+            merged.append((current_first, current_last))
+        current_first, current_last = first, last
+    if current_last is not None:
+        merged.append((current_first, current_last))
+    return merged
+
+
+def interval_to_cidrs(first: int, last: int, bits: int = IPV4_BITS) -> List[Cidr]:
+    """
+    将地址区间拆分为最少的CIDR块
+
+    每次取起始地址对齐允许的最大块，且不超过剩余地址数量。
+
+    Args:
+        first: 起始地址
+        last: 结束地址
+        bits: 地址位数
+
+    Returns:
+        List[Cidr]: 按地址顺序排列的CIDR块
+    """
+    cidrs = []
+    while first <= last:
+        remaining = last - first + 1
+        size = 1 << (remaining.bit_length() - 1)
+        if first:
+            size = min(size, first & -first)
+        cidrs.append(Cidr(first, bits + 1 - size.bit_length(), bits))
+        first += size
+    return cidrs
+
+
+def summarize_intervals(intervals: Iterable[Tuple[int, int]],
+                        bits: int = IPV4_BITS) -> List[Cidr]:
+    """
+    精确汇总：合并区间后转换为最少的CIDR块，结果与 netaddr.cidr_merge 一致
+
+    Args:
+        intervals: (起始地址, 结束地址) 序列，同一地址族
+        bits: 地址位数
+
+    Returns:
+        List[Cidr]: 按地址顺序排列的汇总结果
+    """
+    summarized = []
+    for first, last in merge_intervals(intervals):
+        summarized.extend(interval_to_cidrs(first, last, bits))
+    return summarized
+
+
+def merge_ranges(starts: Sequence[int], ends: Sequence[int],
+                 bits: int = IPV4_BITS) -> List[Tuple[int, int]]:
+    """
+    合并起始/结束地址数组表示的区间
+
+    输入为NumPy数组时排序与合并均向量化完成，否则退回 merge_intervals。
+    IPv6的NumPy输入为 (n, 2) 的uint64数组，每行依次为高64位和低64位。
+
+    Args:
+        starts: 起始地址序列
+        ends: 结束地址序列
+        bits: 地址位数
+
+    Returns:
+        List[Tuple[int, int]]: 按起始地址排序、互不相邻的区间列表
+    """
+    if np is None or not isinstance(starts, np.ndarray):
+        return merge_intervals(zip(starts, ends))
+    if not len(starts):
+        return []
+    if bits == IPV6_BITS:
+        return _merge_word_ranges(starts, ends)
+
+    order = np.argsort(starts, kind='stable')
+    starts = starts[order].astype(np.int64)
+    reach = np.maximum.accumulate(ends[order].astype(np.int64))
+    # 起始地址超过此前所有区间的最大结束地址+1时开始新的区间
+    new_group = np.empty(len(starts), dtype=bool)
+    new_group[0] = True
+    new_group[1:] = starts[1:] > reach[:-1] + 1
+    group_starts = np.flatnonzero(new_group)
+    group_ends = np.append(group_starts[1:], len(starts)) - 1
+    return list(zip(starts[group_starts].tolist(), reach[group_ends].tolist()))
+
+
+def _merge_word_ranges(starts, ends) -> List[Tuple[int, int]]:
+    """合并 (高64位, 低64位) 成对uint64数组表示的128位区间"""
+    order = np.lexsort((starts[:, 1], starts[:, 0]))
+    starts = starts[order]
+    ends = ends[order]
+
+    # 128位数值无法直接累积取最大值：先求各结束地址的排名，
+    # 对排名做累积最大值，再映射回结束地址
+    end_order = np.lexsort((ends[:, 1], ends[:, 0]))
+    rank = np.empty(len(ends), dtype=np.int64)
+    rank[end_order] = np.arange(len(ends))
+    reach = ends[end_order[np.maximum.accumulate(rank)]]
+
+    # reach+1，低64位溢出时向高64位进位；全1地址+1溢出时其后不会再有新区间
+    next_low = reach[:-1, 1] + np.uint64(1)
+    next_high = reach[:-1, 0] + (next_low == 0)
+    overflow = (next_low == 0) & (next_high == 0)
+    high, low = starts[1:, 0], starts[1:, 1]
+    new_group = np.empty(len(starts), dtype=bool)
+    new_group[0] = True
+    new_group[1:] = ~overflow & ((high > next_high) | ((high == next_high) & (low > next_low)))
+
+    group_starts = np.flatnonzero(new_group)
+    group_ends = np.append(group_starts[1:], len(starts)) - 1
+    return list(zip(_join_words(starts[group_starts]), _join_words(reach[group_ends])))
+
+
+def split_words(values: Sequence[int]):
+    """128位整数序列转为 (n, 2) 的uint64数组，每行依次为高64位和低64位"""
+    words = np.empty((len(values), 2), dtype=np.uint64)
+    words[:, 0] = np.fromiter((value >> 64 for value in values), dtype=np.uint64, count=len(values))
+    words[:, 1] = np.fromiter((value & _WORD_MASK for value in values), dtype=np.uint64,
+                              count=len(values))
+    return words
+
+
+def _join_words(words) -> List[int]:
+    """(n, 2) 的uint64数组转为128位整数列表"""
+    return [(high << 64) | low for high, low in words.tolist()]
+
+
+def summarize_ranges(starts: Sequence[int], ends: Sequence[int],
+                     bits: int = IPV4_BITS) -> List[Cidr]:
+    """
+    精确汇总起始/结束地址数组表示的区间
+
+    Args:
+        starts: 起始地址序列
+        ends: 结束地址序列
+        bits: 地址位数
+
+    Returns:
+        List[Cidr]: 按地址顺序排列的汇总结果
+    """
+    summarized = []
+    for first, last in merge_ranges(starts, ends, bits):
+        summarized.extend(interval_to_cidrs(first, last, bits))
+    return summarized
+
+
+def _combine_costs(left_costs: List[int], right_costs: List[int], limit: int) -> List[int]:
+    """
+    左右子树分别分到 i、j 条路由时额外地址数之和的最小值
+
+    Args:
+        left_costs: 左子树的 costs
+        right_costs: 右子树的 costs
+        limit: 最多分到的路由条数，不超过两侧长度之和
+
+    Returns:
+        List[int]: 下标 k-2 为 i+j=k 时的最小值，k 为 2..limit
+    """
+    short, long = sorted((left_costs, right_costs), key=len)
+    rows, columns = len(short), len(long)
+    if np is not None and rows * columns > NUMPY_COMBINE_SIZE and short[0] + long[0] < 1 << 62:
+        # 两侧之和的表每行在展开后错开一位，同一列即为 i+j 相同的组合
+        table = np.full((rows, rows + columns), 1 << 62, dtype=np.int64)
+        table[:, :columns] = np.add.outer(np.array(short, dtype=np.int64),
+                                          np.array(long, dtype=np.int64))
+        table = table.ravel()[:rows * (rows + columns - 1)].reshape(rows, -1)
+        return table[:, :limit - 1].min(axis=0).tolist()
+    if rows <= SHORT_SIDE:
+        # 较短一侧分到 i 条时，另一侧各条数的结果依次落在下标 i-1 之后
+        combined = [short[0] + cost for cost in long[:limit - 1]]
+        for i, extra in enumerate(short[1:], 1):
+            if i >= limit - 1:
+                break
+            candidates = list(map(add, repeat(extra), long[:limit - 1 - i]))
+            overlap = len(combined) - i
+            combined[i:] = map(min, combined[i:], candidates)
+            combined.extend(candidates[overlap:])
+        return combined
+    combined = []
+    for k in range(2, limit + 1):
+        # 左子树分到 i 条、右子树分到 k-i 条，各至少1条
+        low = max(1, k - columns)
+        high = min(rows, k - 1)
+        combined.append(min(map(add, short[low - 1:high], reversed(long[k - high - 1:k - low]))))
+    return combined
+
+
+def summarize_with_budget(blocks: Sequence[Cidr], max_routes: int,
+                          bits: int = IPV4_BITS) -> List[Tuple[Cidr, int]]:
+    """
+    非精确汇总：用不超过 max_routes 条CIDR覆盖全部地址，并使额外包含的地址最少
+
+    在精确汇总结果构成的压缩前缀树上做动态规划：costs[k-1] 为用至多 k 条路由
+    覆盖节点下全部地址的最少额外地址数，取节点本身或把 k 条分给左右子树。
+    子树最多只需要与其叶子数相同的路由，也不会分到多于 max_routes 减去其深度的路由，
+    总复杂度为 O(n * max_routes)，预算较小时只访问前缀树的上层。
+
+    Args:
+        blocks: 精确汇总结果，按地址排序且互不重叠
+        max_routes: 最多输出的路由条目数
+        bits: 地址位数
+
+    Returns:
+        List[Tuple[Cidr, int]]: 按地址顺序排列的 (CIDR块, 额外包含的地址数)
+    """
+    if len(blocks) <= max_routes:
+        return [(block, 0) for block in blocks]
+    if max_routes == 1:
+        # 只允许一条路由时，首尾两个块的公共前缀即为结果
+        first = blocks[0].first
+        last = blocks[-1].first + (1 << (bits - blocks[-1].prefixlen)) - 1
+        host_bits = max((first ^ last).bit_length(), bits - blocks[0].prefixlen)
+        covered = sum(1 << (bits - block.prefixlen) for block in blocks)
+        return [(Cidr(first >> host_bits << host_bits, bits - host_bits, bits),
+                 (1 << host_bits) - covered)]
+
+    firsts = [block.first for block in blocks]
+    # covered[i] 为前 i 个块的地址总数，区间内的原始地址数为两者之差
+    covered = [0]
+    covered.extend(accumulate(1 << (bits - block.prefixlen) for block in blocks))
+
+    # 构建过程会创建大量存活的列表，暂停循环垃圾回收以免其反复遍历整棵树
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        # 节点: [起始地址, 前缀长度, costs, 左子树, 右子树, 块下标范围起点, 终点, 可分到的路由条数]
+        # 先自顶向下拆分前缀树：每层祖先的另一侧子树至少占用1条路由，深度为 d 的节点
+        # 至多分到 max_routes-d 条，只剩1条的节点不再拆分，其下的块不会单独出现在结果中
+        root = [0, 0, None, None, None, 0, len(blocks), max_routes]
+        nodes = []
+        pending = [root]
+        while pending:
+            node = pending.pop()
+            nodes.append(node)
+            low, high, routes = node[5], node[6], node[7]
+            # 区间首尾两块起始地址的公共前缀即为节点的前缀，右子树从该前缀后一位为1的地址开始
+            host_bits = (firsts[low] ^ firsts[high - 1]).bit_length()
+            node[0] = firsts[low] >> host_bits << host_bits
+            node[1] = bits - host_bits
+            if routes > 1:
+                middle = bisect_left(firsts, node[0] | (1 << (host_bits - 1)), low, high)
+                children = []
+                for start, stop in ((low, middle), (middle, high)):
+                    if stop - start == 1:
+                        # 单个块的 costs 恒为 [0]，不参与动态规划
+                        child = [firsts[start], blocks[start].prefixlen, [0], None, None, start, stop, 1]
+                    else:
+                        child = [0, 0, None, None, None, start, stop, routes - 1]
+                        pending.append(child)
+                    children.append(child)
+                node[3], node[4] = children
+
+        # 再自底向上计算 costs：取节点本身，或把 k 条分给左右子树
+        for node in reversed(nodes):
+            left, right, low, high = node[3], node[4], node[5], node[6]
+            own = (1 << (bits - node[1])) - (covered[high] - covered[low])
+            if left is None:
+                node[2] = [own]
+                continue
+            # 父节点的额外地址包含两个子节点的额外地址，拆分后不会多于取节点本身
+            left_costs, right_costs = left[2], right[2]
+            limit = min(node[7], len(left_costs) + len(right_costs))
+            costs = [own]
+            if left_costs == [0] or right_costs == [0]:
+                # 一侧为单个块（额外地址为0）时不必合并，另一侧分到 k-1 条
+                costs.extend((left_costs if right_costs == [0] else right_costs)[:limit - 1])
+            else:
+                costs.extend(_combine_costs(left_costs, right_costs, limit))
+            # 末尾额外地址数不再减少的部分分到更多路由也无益，截去后父节点不必再合并
+            while len(costs) > 1 and costs[-1] == costs[-2]:
+                costs.pop()
+            node[2] = costs
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+    # 自顶向下按分配的路由条数还原所选的CIDR块
+    result = []
+    pending = [(root, max_routes)]
+    while pending:
+        node, routes = pending.pop()
+        first, prefixlen, costs, left, right = node[:5]
+        routes = min(routes, len(costs))
+        cost = costs[routes - 1]
+        if left is None or cost == costs[0]:
+            result.append((Cidr(first, prefixlen, bits), costs[0]))
+            continue
+        left_costs, right_costs = left[2], right[2]
+        for i in range(max(1, routes - len(right_costs)), min(len(left_costs), routes - 1) + 1):
+            if left_costs[i - 1] + right_costs[routes - i - 1] == cost:
+                # 先处理左子树，结果保持地址顺序
+                pending.append((right, routes - i))
+                pending.append((left, i))
+                break
+    return result
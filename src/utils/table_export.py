@@ -0,0 +1,205 @@
+"""
+表格导出模块
+以流式方式将按列组织的表格写入Excel（openpyxl只写模式）或CSV/制表符分隔的文本文件，
+样式使用共享的命名样式，列宽在整理数据时一并计算
+"""
+import csv
+import os
+from itertools import islice
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, Font, NamedStyle, PatternFill
+from openpyxl.utils import get_column_letter
+
+# 每写入多少行报告一次进度并检查取消
+PROGRESS_ROWS = 10000
+# 自动计算的列宽上限
+MAX_COLUMN_WIDTH = 50
+
+# 支持的导出格式：扩展名 -> 文本文件的分隔符，xlsx 为 None
+EXPORT_FORMATS = {'.xlsx': None, '.csv': ',', '.txt': '\t'}
+
+
+class ExportSheet(NamedTuple):
+    """导出的一个工作表"""
+
+    title: str
+    headers: List[str]
+    # 按列组织的单元格取值，各列等长
+    columns: List[List]
+    # 自动换行的列下标
+    wrap_columns: Tuple[int, ...] = ()
+    # 指定宽度的列：列下标 -> 宽度，其余列按内容计算
+    widths: Optional[Dict[int, int]] = None
+    # 表格之后附加的单列条目（如解析失败的命令）及其标题
+    appendix_title: str = ''
+    appendix: Sequence[str] = ()
+
+    @property
+    def row_count(self) -> int:
+        return (len(self.columns[0]) if self.columns else 0) + len(self.appendix)
+
+
+def column_widths(sheet: ExportSheet) -> List[int]:
+    """按表头和各列最长的取值计算列宽，不超过 MAX_COLUMN_WIDTH"""
+    widths = []
+    for index, header in enumerate(sheet.headers):
+        if sheet.widths and index in sheet.widths:
+            widths.append(sheet.widths[index])
+            continue
+        values = sheet.columns[index] if index < len(sheet.columns) else []
+        longest = max(len(header), max(map(len, map(str, values)), default=0))
+        widths.append(min(longest + 2, MAX_COLUMN_WIDTH))
+    return widths
+
+
+class _Progress:
+    """按已写入的行数报告进度，并在报告时检查取消"""
+
+    def __init__(self, total: int, progress_callback: Optional[Callable[[int], None]],
+                 is_cancelled: Optional[Callable[[], bool]]):
+        self.total = max(total, 1)
+        self.written = 0
+        self.progress_callback = progress_callback
+        self.is_cancelled = is_cancelled
+
+    def step(self, rows: int = 1) -> bool:
+        """记录写入的行数，返回是否应继续写入"""
+        before = self.written // PROGRESS_ROWS
+        self.written += rows
+        if self.written // PROGRESS_ROWS == before:
+            return True
+        if self.is_cancelled is not None and self.is_cancelled():
+            return False
+        if self.progress_callback is not None:
+            self.progress_callback(self.written * 100 // self.total)
+        return True
+
+
+def export_tables(path: str, sheets: Sequence[ExportSheet],
+                  progress_callback: Optional[Callable[[int], None]] = None,
+                  is_cancelled: Optional[Callable[[], bool]] = None) -> bool:
+    """
+    导出表格，格式由文件扩展名决定
+
+    xlsx 文件中每个 ExportSheet 为一个工作表；csv/txt 文件只能保存一个表格，
+    第一个表格写入 path，其余表格写入同目录下以“文件名_表名”命名的文件。
+    取消时删除已写入的文件。
+
+    Args:
+        path: 导出文件路径
+        sheets: 要导出的表格
+        progress_callback: 进度回调，参数为0-100的百分比
+        is_cancelled: 返回True时停止导出
+
+    Returns:
+        bool: 导出完成返回True，被取消返回False
+
+    Raises:
+        ValueError: 不支持的文件格式
+    """
+    stem, ext = os.path.splitext(path)
+    ext = ext.lower()
+    if ext not in EXPORT_FORMATS:
+        raise ValueError(f"不支持的导出格式: {ext or '无扩展名'}")
+
+    progress = _Progress(sum(sheet.row_count for sheet in sheets), progress_callback, is_cancelled)
+    if EXPORT_FORMATS[ext] is None:
+        paths = [path]
+        completed = _write_xlsx(path, sheets, progress)
+    else:
+        paths = [path] + [f"{stem}_{sheet.title}{ext}" for sheet in sheets[1:]]
+        completed = all(_write_delimited(sheet_path, sheet, EXPORT_FORMATS[ext], progress)
+                        for sheet_path, sheet in zip(paths, sheets))
+
+    if not completed:
+        for written_path in paths:
+            if os.path.exists(written_path):
+                os.remove(written_path)
+    return completed
+
+
+def _add_named_styles(wb: Workbook) -> None:
+    """注册导出使用的命名样式，所有单元格共享同一组样式记录"""
+    wb.add_named_style(NamedStyle(
+        name='export_header',
+        font=Font(bold=True),
+        fill=PatternFill(start_color='E0E0E0', end_color='E0E0E0', fill_type='solid'),
+        alignment=Alignment(horizontal='center'),
+    ))
+    wb.add_named_style(NamedStyle(
+        name='export_wrap',
+        alignment=Alignment(horizontal='left', vertical='top', wrap_text=True),
+    ))
+    wb.add_named_style(NamedStyle(
+        name='export_appendix_title',
+        font=Font(bold=True),
+        fill=PatternFill(start_color='FFE0E0', end_color='FFE0E0', fill_type='solid'),
+    ))
+
+
+def _styled_cell(ws, value, style: str) -> WriteOnlyCell:
+    cell = WriteOnlyCell(ws, value=value)
+    cell.style = style
+    return cell
+
+
+def _write_xlsx(path: str, sheets: Sequence[ExportSheet], progress: _Progress) -> bool:
+    """以只写模式逐行写入xlsx，行数据直接写入临时文件，不在内存中保留单元格"""
+    wb = Workbook(write_only=True)
+    _add_named_styles(wb)
+
+    for sheet in sheets:
+        ws = wb.create_sheet(sheet.title)
+        # 只写模式下列宽须在写入第一行之前设置
+        for index, width in enumerate(column_widths(sheet), 1):
+            ws.column_dimensions[get_column_letter(index)].width = width
+        ws.freeze_panes = 'A2'
+
+        ws.append([_styled_cell(ws, header, 'export_header') for header in sheet.headers])
+        wrap_columns = sheet.wrap_columns
+        for row in zip(*sheet.columns):
+            if wrap_columns:
+                row = list(row)
+                for index in wrap_columns:
+                    row[index] = _styled_cell(ws, row[index], 'export_wrap')
+            ws.append(row)
+            if not progress.step():
+                return False
+
+        if sheet.appendix:
+            ws.append([])
+            ws.append([_styled_cell(ws, sheet.appendix_title, 'export_appendix_title')])
+            for entry in sheet.appendix:
+                ws.append((entry,))
+                if not progress.step():
+                    return False
+
+    wb.save(path)
+    return True
+
+
+def _write_delimited(path: str, sheet: ExportSheet, delimiter: str, progress: _Progress) -> bool:
+    """写入CSV或制表符分隔的文本文件，使用带BOM的UTF-8以便Excel直接打开中文内容"""
+    with open(path, 'w', newline='', encoding='utf-8-sig') as f:
+        writer = csv.writer(f, delimiter=delimiter)
+        writer.writerow(sheet.headers)
+        rows = zip(*sheet.columns)
+        while True:
+            batch = list(islice(rows, PROGRESS_ROWS))
+            if not batch:
+                break
+            writer.writerows(batch)
+            if not progress.step(len(batch)):
+                return False
+
+        if sheet.appendix:
+            writer.writerow([])
+            writer.writerow([sheet.appendix_title])
+            writer.writerows((entry,) for entry in sheet.appendix)
+            if not progress.step(len(sheet.appendix)):
+                return False
+    return True
+
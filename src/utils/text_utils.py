@@ -1,6 +1,6 @@
 import re
 from typing import List, Tuple, Union
-from netaddr import IPRange, IPNetwork, AddrFormatError
+from netaddr import IPAddress, IPRange, IPNetwork, AddrFormatError
 
 class TextUtils:
     # 掩码转换说明文本
@@ -21,15 +21,19 @@ class TextUtils:
    - 完整格式：192.168.1.1-192.168.1.254
    - 简化格式：1.1.1.0-255
 3. 单个IP：192.168.1.1
+4. IPv6：2001:db8::/32、2001:db8::1-2001:db8::ff、2001:db8::1-ff
 
 可以使用以下方式分隔多个条目：
 - 换行
 - 逗号 (,)
 - 分号 (;)
 
+IPv4与IPv6条目分别汇总
+
 汇总模式说明：
 - 精确汇总：保证汇总后的网段完全匹配原始网段，不会包含额外的IP地址
-- 非精确汇总：寻找包含所有输入网段的最小CIDR块，可能会包含额外的IP地址，但能得到最简单的汇总结果"""
+- 非精确汇总：在不超过“最大路由条目数”的前提下，寻找额外包含IP地址最少的CIDR块组合；
+  最大路由条目数为1时即为包含所有输入网段的最小CIDR块，IPv4与IPv6分别计算"""
 
     @staticmethod
     def split_text(text: str) -> List[str]:
@@ -72,6 +76,7 @@ class TextUtils:
         2. IP范围简化格式：1.1.1.1-25
         3. CIDR格式：1.1.1.0/24
         4. 单个IP：1.1.1.1
+        IPv6同样支持以上格式，简化格式的结尾为最后一段的十六进制值，如 2001:db8::1-ff
         
         Args:
             entry: IP范围文本
@@ -97,6 +102,21 @@ class TextUtils:
                 start = start.strip()
                 end = end.strip()
                 
+                if ':' in start:
+                    # IPv6简化格式 (如 2001:db8::1-ff)，替换最后一段
+                    if ':' not in end:
+                        try:
+                            end_num = int(end, 16)
+                        except ValueError:
+                            raise ValueError(f"无效的IP范围结尾: {end}")
+                        if end_num < 0 or end_num > 0xFFFF:
+                            raise ValueError("IPv6地址最后一段必须在0-ffff之间")
+                        end = str(IPAddress((int(IPAddress(start, 6)) & ~0xFFFF) | end_num, 6))
+                    try:
+                        return IPRange(start, end)
+                    except AddrFormatError as e:
+                        raise ValueError(f"无效的IP范围: {start}-{end}")
+                
                 # 如果起始IP不完整，报错提示
                 if start.count('.') != 3:
                     raise ValueError("起始IP地址必须是完整的IP地址，如：1.1.1.1")
@@ -120,7 +140,7 @@ class TextUtils:
             # 处理CIDR格式或单个IP
             else:
                 if '/' not in entry:
-                    entry += '/32'
+                    entry += '/128' if ':' in entry else '/32'
                 return IPNetwork(entry)
                 
         except Exception as e:
@@ -131,5 +151,6 @@ class TextUtils:
                 f"2. IP范围简化格式：1.1.1.1-25\n"
                 f"3. CIDR格式：1.1.1.0/24\n"
                 f"4. 单个IP：1.1.1.1\n"
+                f"5. IPv6：2001:db8::/32、2001:db8::1-ff\n"
                 f"错误详情：{str(e)}"
             )